@@ -1,17 +1,69 @@
 import argparse
+import hashlib
 import html
 import json
 import re
 import sys
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-from openai import OpenAI, OpenAIError
-
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from backend_modele import BACKENDS_MODELE, CARACTERES_PAR_TOKEN, DOSSIER_REJEU_PAR_DEFAUT, construire_client
+from faits_deliberations import faits_du_point, resumer_faits
+from journal_execution import avec_contexte, chemin_journal_par_defaut, configurer_journal, span
+from profilage import configurer_profilage, dossier_profil_par_defaut, ecrire_profils, profiler
+from ordonnanceur_modele import (
+    APPELS_PARALLELES_PAR_DEFAUT,
+    PRIORITE_DETAIL,
+    PRIORITE_GLOBALE,
+    afficher_resume_ordonnanceur,
+    configurer_ordonnanceur,
+    obtenir_ordonnanceur,
+)
+from routage_points import (
+    ROUTE_GABARIT,
+    ROUTE_LEGER,
+    ROUTE_PRINCIPAL,
+    composantes_score,
+    formater_repartition,
+    repartition_routes,
+    router_points,
+    score_substance,
+)
+from resume_extractif import resumer_corpus
+from sections_deliberations import (
+    MOTIF_AVERTISSEMENT_PROJET,
+    SECTION_SYNTHESE,
+    debuts_sections,
+    metadonnees_du_point,
+    texte_section,
+)
+
+if TYPE_CHECKING:
+    # Le SDK OpenAI (pydantic, httpx...) n'est importé qu'à la création du client,
+    # pour que --merge-html et --help démarrent sans lui.
+    from openai import OpenAI
 
 MODELE_PAR_DEFAUT = "gpt-4o-mini"
+MODELE_LEGER_PAR_DEFAUT = "gpt-4.1-nano"
+# Au-delà de cette taille, l'analyse détaillée résume d'abord le texte par extraits.
+TAILLE_EXTRAIT_DETAIL = 8000
+BUDGET_TOKENS_DETAIL_PAR_DEFAUT = 20000
+# Tokens que le résumé d'un extrait (150 mots) ajoute au prompt de synthèse.
+TOKENS_RESUME_EXTRAIT = 250
+# Allocation par point du résumé extractif envoyé à l'analyse globale.
+TOKENS_RESUME_PAR_POINT = 90
+# Sélection automatique des analyses détaillées (--details-auto).
+BUDGET_TOKENS_SELECTION_PAR_DEFAUT = 60000
+BONUS_NOUVEAUTE = 1.5
+# Points de chaque commune de la page multi-communes, servis à côté de la page.
+DOSSIER_FRAGMENTS_PAR_DEFAUT = "communes"
+MOTIF_DEBUT_SECTION = re.compile(
+    r"^\s*(Vu\b|Considérant|Attendu|Décide|DÉCIDE|Arrête|ARRÊTE|Art(icle)?\.?\s*\d|Chapitre|CHAPITRE|"
+    r"Section\s|TITRE\s|Note de synthèse|Projet de décision)"
+)
 MOIS_FR = {
     "janvier": 1,
     "fevrier": 2,
@@ -116,33 +168,29 @@ def _nom_commune_affichage(commune: str) -> str:
     return COMMUNES_LABELS.get(slug, slug.replace("-", " ").title())
 
 
-def construire_client_openai() -> OpenAI:
-    """Initialise le client OpenAI à partir des variables d'environnement."""
-    try:
-        return OpenAI()
-    except OpenAIError as exc:
-        raise RuntimeError(f"Erreur d'initialisation OpenAI : {exc}") from exc
+_CLIENTS: Dict[Tuple[str, str, Optional[str]], "OpenAI"] = {}
 
 
-def appeler_modele_json(client: OpenAI, prompt: str, modele: str) -> str:
-    """Envoie un prompt et exige une réponse JSON valide."""
-    try:
-        reponse = client.chat.completions.create(
-            model=modele,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "Tu es un assistant qui répond toujours avec un JSON valide respectant la demande."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
-        )
-    except OpenAIError as exc:
-        raise RuntimeError(f"Appel OpenAI échoué : {exc}") from exc
+def construire_client_openai(
+    backend: str = "openai",
+    dossier_rejeu: str = DOSSIER_REJEU_PAR_DEFAUT,
+    url_factice: Optional[str] = None,
+) -> "OpenAI":
+    """
+    Initialise le client de modèle.
+
+    Le backend "openai" utilise les variables d'environnement habituelles ;
+    "enregistrement"/"rejeu" passent par le cache disque de réponses et
+    "factice" vise le serveur local de backend_modele.py. Le client est
+    partagé entre les appels successifs (pipeline en processus unique).
+    """
+    cle = (backend, dossier_rejeu, url_factice)
+    if cle not in _CLIENTS:
+        _CLIENTS[cle] = construire_client(backend, dossier_rejeu=dossier_rejeu, url_factice=url_factice)
+    return _CLIENTS[cle]
 
+
+def _extraire_texte_reponse(reponse: Any) -> str:
     if not reponse.choices:
         raise RuntimeError("Réponse vide du modèle.")
 
@@ -152,29 +200,49 @@ def appeler_modele_json(client: OpenAI, prompt: str, modele: str) -> str:
     return texte
 
 
-def appeler_modele_text(client: OpenAI, prompt: str, modele: str) -> str:
-    """Envoie un prompt et récupère une réponse textuelle libre."""
+def appeler_modele_json(client: "OpenAI", prompt: str, modele: str, priorite: int = PRIORITE_GLOBALE) -> str:
+    """Envoie un prompt via l'ordonnanceur et exige une réponse JSON valide."""
+    parametres = {
+        "model": modele,
+        "messages": [
+            {
+                "role": "system",
+                "content": (
+                    "Tu es un assistant qui répond toujours avec un JSON valide respectant la demande."
+                ),
+            },
+            {"role": "user", "content": prompt},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+    from openai import OpenAIError
+
     try:
-        reponse = client.chat.completions.create(
-            model=modele,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Tu es un assistant journalistique qui rédige des synthèses en français.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
+        reponse = obtenir_ordonnanceur().executer(client, parametres, priorite)
     except OpenAIError as exc:
         raise RuntimeError(f"Appel OpenAI échoué : {exc}") from exc
+    return _extraire_texte_reponse(reponse)
 
-    if not reponse.choices:
-        raise RuntimeError("Réponse vide du modèle.")
 
-    texte = (reponse.choices[0].message.content or "").strip()
-    if not texte:
-        raise RuntimeError("Réponse textuelle vide du modèle.")
-    return texte
+def appeler_modele_text(client: "OpenAI", prompt: str, modele: str, priorite: int = PRIORITE_DETAIL) -> str:
+    """Envoie un prompt via l'ordonnanceur et récupère une réponse textuelle libre."""
+    parametres = {
+        "model": modele,
+        "messages": [
+            {
+                "role": "system",
+                "content": "Tu es un assistant journalistique qui rédige des synthèses en français.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+    }
+    from openai import OpenAIError
+
+    try:
+        reponse = obtenir_ordonnanceur().executer(client, parametres, priorite)
+    except OpenAIError as exc:
+        raise RuntimeError(f"Appel OpenAI échoué : {exc}") from exc
+    return _extraire_texte_reponse(reponse)
 
 
 def charger_deliberations(fichier: str) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
@@ -184,9 +252,8 @@ def charger_deliberations(fichier: str) -> Tuple[List[Dict[str, Any]], Optional[
         with open(fichier, "r", encoding="utf-8") as handle:
             donnees = json.load(handle)
     except FileNotFoundError as err:
-        print(f"ERREUR : Le fichier {fichier} est introuvable.")
         print("Lancez d'abord extraire_deliberations.py")
-        sys.exit(1)
+        raise RuntimeError(f"Le fichier {fichier} est introuvable.") from err
     except json.JSONDecodeError as err:
         raise RuntimeError(f"JSON invalide dans {fichier} : {err}") from err
 
@@ -203,30 +270,51 @@ def charger_deliberations(fichier: str) -> Tuple[List[Dict[str, Any]], Optional[
     return deliberations, meta
 
 
-def creer_resume_court(deliberations: List[Dict[str, Any]]) -> str:
-    """Crée un résumé concis de l'ensemble des délibérations."""
-    resume = "DÉLIBÉRATIONS DU CONSEIL COMMUNAL:\n\n"
-    for index, deliberation in enumerate(deliberations, 1):
-        titre = deliberation.get("titre", "Titre inconnu")
-        contenu = deliberation.get("contenu", "")
-        lignes = contenu.split("\n")
-
-        note_synthese = ""
-        capture = False
-        for ligne in lignes:
-            if "Note de synthèse" in ligne or "note de synthèse" in ligne:
-                capture = True
-                continue
-            if capture:
-                if ligne.strip() and not ligne.startswith("Projet de décision"):
-                    note_synthese += ligne + " "
-                if "Projet de décision" in ligne:
-                    break
+def textes_a_resumer(deliberations: List[Dict[str, Any]]) -> List[str]:
+    """Note de synthèse de chaque point, ou à défaut son contenu complet."""
+    return [
+        texte_section(deliberation, SECTION_SYNTHESE) or deliberation.get("contenu", "")
+        for deliberation in deliberations
+    ]
+
 
-        if not note_synthese:
-            note_synthese = contenu[:200]
+def titres_des_points(deliberations: List[Dict[str, Any]]) -> List[str]:
+    return [deliberation.get("titre", "Titre inconnu") for deliberation in deliberations]
 
-        resume += f"{index}. {titre}\n{note_synthese.strip()[:300]}\n\n"
+
+def extraits_par_seance(seances: List[List[Dict[str, Any]]]) -> List[List[str]]:
+    """
+    Extraits TF-IDF des points de plusieurs séances, avec un IDF commun à
+    toutes : chaque point n'est découpé et vectorisé qu'une fois.
+    """
+    return resumer_corpus(
+        [(textes_a_resumer(deliberations), titres_des_points(deliberations)) for deliberations in seances],
+        int(TOKENS_RESUME_PAR_POINT * CARACTERES_PAR_TOKEN),
+    )
+
+
+def creer_resume_court(
+    deliberations: List[Dict[str, Any]],
+    extraits: Optional[List[str]] = None,
+) -> str:
+    """
+    Crée un résumé concis de l'ensemble des délibérations : pour chaque point,
+    les phrases les plus informatives (TF-IDF) dans l'allocation de tokens.
+
+    Sans `extraits` (calculés par extraits_par_seance), l'IDF porte sur les
+    seuls points de cette séance.
+    """
+    titres = titres_des_points(deliberations)
+    if extraits is None:
+        extraits = extraits_par_seance([deliberations])[0]
+
+    resume = "DÉLIBÉRATIONS DU CONSEIL COMMUNAL:\n\n"
+    for index, (deliberation, titre, extrait) in enumerate(zip(deliberations, titres, extraits), 1):
+        resume += f"{index}. {titre}\n{extrait}\n"
+        faits = resumer_faits(faits_du_point(deliberation))
+        if faits:
+            resume += f"Faits : {faits}\n"
+        resume += "\n"
     return resume
 
 
@@ -274,10 +362,9 @@ def _normaliser_titre_sujet(titre: str, max_mots: int = 16) -> str:
 
 def _extraire_type_document(deliberation: Dict[str, Any], seance: Optional[Dict[str, Any]]) -> str:
     """Déduit le type du document source pour le libellé du lien."""
-    contenu = deliberation.get("contenu", "")
-    match = re.search(r"\bState\s*\n([^\n]+)", contenu)
-    if match:
-        return match.group(1).strip()
+    type_document = metadonnees_du_point(deliberation).get("type_document")
+    if type_document:
+        return type_document
 
     titre = deliberation.get("titre", "")
     if "projet de décision" in titre.casefold():
@@ -319,8 +406,44 @@ def _associer_sources_aux_sujets(
     return sujets_enrichis
 
 
-def _consigne_type_seance(seance: Optional[Dict[str, Any]]) -> str:
-    """Construit une consigne de rédaction adaptée au type de séance."""
+# Lignes qui changent avec le statut du document et non avec son fond.
+LIGNES_STATUT_IGNOREES = {"state", "projet de décision", "décision", "précédent", "suivant", "sur", "point n°"}
+
+
+def empreinte_point(deliberation: Dict[str, Any]) -> str:
+    """Empreinte du texte d'un point, identique en projet de décision et en décision."""
+    contenu = MOTIF_AVERTISSEMENT_PROJET.sub(" ", deliberation.get("contenu", "") or "")
+    lignes: List[str] = []
+    for ligne in contenu.splitlines():
+        propre = " ".join(ligne.split()).casefold()
+        if not propre or propre.startswith("http") or propre.isdigit() or propre in LIGNES_STATUT_IGNOREES:
+            continue
+        lignes.append(propre)
+    return hashlib.sha256("\n".join(lignes).encode("utf-8")).hexdigest()[:16]
+
+
+CONSIGNE_PROJETS_DE_DECISION = (
+    '- Les documents de cette séance sont des "Projets de décision". '
+    'N\'écris donc pas que le conseil "a adopté", "a approuvé", "a validé" ou '
+    '"a décidé" ; préfère des formulations comme "prévoit", "propose", "vise", '
+    '"présente", "fixe", "organise", "détaille" ou "mentionne".'
+)
+CONSIGNE_DECISIONS = (
+    '- Les documents de cette séance sont des "Décisions". '
+    'Tu peux employer des formulations au passé comme "le conseil a décidé", '
+    '"a approuvé" ou "a validé" si cela correspond bien au contenu.'
+)
+CONSIGNE_STATUT_INCERTAIN = (
+    '- Si le statut du document n\'est pas certain, évite de présenter le contenu '
+    'comme définitivement adopté et préfère des formulations neutres.'
+)
+STATUT_PROJETS_DE_DECISION = "Projets de décision"
+STATUT_DECISIONS = "Décisions"
+STATUT_INCERTAIN = "Statut incertain"
+
+
+def _statut_documents_seance(seance: Optional[Dict[str, Any]]) -> str:
+    """Classe la séance en projets de décision, décisions ou statut incertain."""
     seance_nom = (seance or {}).get("nom") or ""
     type_seance = ""
     if "—" in seance_nom:
@@ -330,22 +453,20 @@ def _consigne_type_seance(seance: Optional[Dict[str, Any]]) -> str:
 
     type_normalise = type_seance.casefold()
     if "projet" in type_normalise:
-        return (
-            '- Les documents de cette séance sont des "Projets de décision". '
-            'N\'écris donc pas que le conseil "a adopté", "a approuvé", "a validé" ou '
-            '"a décidé" ; préfère des formulations comme "prévoit", "propose", "vise", '
-            '"présente", "fixe", "organise", "détaille" ou "mentionne".'
-        )
+        return STATUT_PROJETS_DE_DECISION
     if "décision" in type_normalise or "decision" in type_normalise:
-        return (
-            '- Les documents de cette séance sont des "Décisions". '
-            'Tu peux employer des formulations au passé comme "le conseil a décidé", '
-            '"a approuvé" ou "a validé" si cela correspond bien au contenu.'
-        )
-    return (
-        '- Si le statut du document n\'est pas certain, évite de présenter le contenu '
-        'comme définitivement adopté et préfère des formulations neutres.'
-    )
+        return STATUT_DECISIONS
+    return STATUT_INCERTAIN
+
+
+def _consigne_type_seance(seance: Optional[Dict[str, Any]]) -> str:
+    """Construit une consigne de rédaction adaptée au type de séance."""
+    statut = _statut_documents_seance(seance)
+    if statut == STATUT_PROJETS_DE_DECISION:
+        return CONSIGNE_PROJETS_DE_DECISION
+    if statut == STATUT_DECISIONS:
+        return CONSIGNE_DECISIONS
+    return CONSIGNE_STATUT_INCERTAIN
 
 
 def extraire_topics_depuis_reponse(reponse: str) -> List[Dict[str, Any]]:
@@ -370,29 +491,10 @@ def extraire_topics_depuis_reponse(reponse: str) -> List[Dict[str, Any]]:
     return sujets
 
 
-def analyser_globalement(
-    client: OpenAI,
-    deliberations: List[Dict[str, Any]],
-    modele: str,
-    commune_nom: str,
-    seance: Optional[Dict[str, Any]],
-    max_sujets: int = 5,
-) -> List[Dict[str, Any]]:
-    """Interroge l'IA pour obtenir la liste des points abordés."""
-    print("=" * 80)
-    print("ANALYSE GLOBALE : Liste des points abordés")
-    print("=" * 80 + "\n")
-    print("L'IA analyse toutes les délibérations (2-3 minutes)...\n")
-
-    resume = creer_resume_court(deliberations)
-    consigne_type_seance = _consigne_type_seance(seance)
-    prompt = f"""Tu es un journaliste expérimenté qui passe en revue des délibérations d'un conseil communal.
-
-Voici les délibérations récentes du conseil communal de {commune_nom} :
-
-{resume}
-
-Objectif :
+# Les consignes fixes précèdent toujours les données propres à la commune :
+# le préfixe commun à tous les appels peut ainsi être mis en cache côté
+# fournisseur (remise sur les tokens d'entrée et latence réduite).
+_CONSIGNES_REDACTION = f"""Objectif :
 - Lister tous les points abordés, dans l'ordre du document.
 - Ne rien filtrer. Une entrée par point, même si le point semble technique ou administratif.
 - Pour chaque point, reformuler le sujet avec un titre clair et déjà informatif.
@@ -404,22 +506,22 @@ Objectif :
 - Dans "description", intégrer quand ils existent les éléments précis du dossier : montant, objet de l'achat, type de travaux, localisation, public concerné, calendrier, procédure, durée, conditions, subventions, modifications concrètes ou mesures décidées.
 - Dans "description", écrire une mini fiche journalistique directe, factuelle et exploitable, pas une phrase qui explique ce que le point ou la délibération aborde.
 - Quand l'information existe, préciser les éléments concrets du contenu lui-même plutôt que de rester général ou abstrait.
-- {consigne_type_seance}
 
-Format de réponse : renvoie UNIQUEMENT un objet JSON valide de la forme
-{{
-  "points": [
-    {{
-      "titre": "...",
-      "description": "..."
-    }}
-  ]
-}}
+Statut des documents (précisé avec les données de la séance) :
+- Statut "{STATUT_PROJETS_DE_DECISION}" :
+  {CONSIGNE_PROJETS_DE_DECISION[2:]}
+- Statut "{STATUT_DECISIONS}" :
+  {CONSIGNE_DECISIONS[2:]}
+- Statut "{STATUT_INCERTAIN}" :
+  {CONSIGNE_STATUT_INCERTAIN[2:]}
+"""
 
-Règles :
+# La règle de réponse vide dépend du format : elle s'insère entre l'en-tête et les règles communes.
+_ENTETE_REGLES = """Règles :
 - Ne renvoie aucun texte en dehors de ce JSON.
-- Si aucun sujet n'est pertinent, retourne {{ "topics": [] }}.
-- Les champs texte doivent être rédigés en français, ton professionnel.
+"""
+
+_REGLES_REDACTION = """- Les champs texte doivent être rédigés en français, ton professionnel.
 - "titre" doit être une reformulation éditoriale lisible, pas un copier-coller du point d'ordre du jour.
 - Exemple de bon niveau de détail pour "titre" : "Réfection urgente de la toiture de l'école communale".
 - "description" doit être rédigée de manière directe, sans formulations comme "le point concerne", "la délibération porte sur", "le conseil examine" ou "le dossier précise".
@@ -430,6 +532,188 @@ Règles :
 - En cas de doute, préfère des formulations neutres comme "prévoit", "vise", "organise", "présente", "propose", "fixe", "détaille" ou "mentionne".
 """
 
+CONSIGNES_ANALYSE_GLOBALE = f"""Tu es un journaliste expérimenté qui passe en revue des délibérations d'un conseil communal.
+Les délibérations à analyser sont fournies à la fin de ce message, après la ligne "DONNÉES DE LA SÉANCE".
+
+{_CONSIGNES_REDACTION}
+Format de réponse : renvoie UNIQUEMENT un objet JSON valide de la forme
+{{
+  "points": [
+    {{
+      "titre": "...",
+      "description": "..."
+    }}
+  ]
+}}
+
+{_ENTETE_REGLES}- Si aucun sujet n'est pertinent, retourne {{ "points": [] }}.
+{_REGLES_REDACTION}"""
+
+# Variante pour plusieurs petites communes traitées dans un seul appel.
+CONSIGNES_ANALYSE_GROUPEE = f"""Tu es un journaliste expérimenté qui passe en revue des délibérations de plusieurs conseils communaux.
+Les séances à analyser sont fournies à la fin de ce message, après la ligne "DONNÉES DES SÉANCES".
+Chaque séance commence par une ligne "=== COMMUNE id=... ===" et doit être traitée indépendamment des autres.
+
+{_CONSIGNES_REDACTION}
+Format de réponse : renvoie UNIQUEMENT un objet JSON valide de la forme
+{{
+  "communes": [
+    {{
+      "id": "...",
+      "points": [
+        {{
+          "titre": "...",
+          "description": "..."
+        }}
+      ]
+    }}
+  ]
+}}
+
+{_ENTETE_REGLES}- Si aucun sujet n'est pertinent pour une séance, renvoie quand même son entrée avec "points": [].
+{_REGLES_REDACTION}- Renvoie une entrée "communes" par séance fournie, avec exactement l'"id" indiqué dans son en-tête.
+- Ne mélange jamais les points de deux communes : chaque liste "points" suit l'ordre de sa propre séance.
+"""
+
+CONSIGNES_ANALYSE_DETAILLEE = """Tu es un journaliste qui analyse une délibération de conseil communal.
+La délibération est fournie à la fin de ce message, après la ligne "DÉLIBÉRATION".
+
+Fournis en français une analyse synthétique comprenant :
+1. RÉSUMÉ EN 2 PHRASES
+2. ENJEUX POUR LES CITOYENS
+3. MONTANTS BUDGÉTAIRES (s'il y en a)
+4. CONTROVERSES POTENTIELLES
+5. QUESTIONS À POSER
+6. CONTEXTE COMPLÉMENTAIRE
+"""
+
+
+CONSIGNES_RESUME_EXTRAIT = """Tu es un journaliste qui prépare l'analyse d'une longue délibération de conseil communal.
+Un extrait de la délibération est fourni à la fin de ce message, après la ligne "EXTRAIT".
+
+Résume cet extrait en français, en 150 mots maximum, en conservant :
+- tous les montants (en précisant HTVA ou TVAC), dates, durées, lieux et organismes cités ;
+- les décisions, obligations, interdictions, tarifs ou modifications concrètes ;
+- les éléments susceptibles de faire débat : hausses, suppressions, recours, avis défavorables, délais serrés.
+N'invente rien. Si l'extrait ne contient que des visas juridiques, réponds en une seule phrase.
+"""
+
+
+CONSIGNES_REECRITURE_STATUT = f"""Tu es un journaliste qui met à jour des descriptions de points d'un conseil communal.
+Le texte des points n'a pas changé : seul le statut des documents a évolué.
+
+Objectif :
+- Réécrire chaque description pour respecter le statut indiqué, sans rien ajouter ni retirer sur le fond.
+- Conserver les titres, l'ordre des points, les montants, dates, lieux et procédures.
+- Ne modifier que les temps et les formulations liés au statut.
+
+Statut des documents (précisé avec les données) :
+- Statut "{STATUT_PROJETS_DE_DECISION}" :
+  {CONSIGNE_PROJETS_DE_DECISION[2:]}
+- Statut "{STATUT_DECISIONS}" :
+  {CONSIGNE_DECISIONS[2:]}
+- Statut "{STATUT_INCERTAIN}" :
+  {CONSIGNE_STATUT_INCERTAIN[2:]}
+
+Format de réponse : renvoie UNIQUEMENT un objet JSON valide de la forme
+{{
+  "points": [
+    {{
+      "titre": "...",
+      "description": "..."
+    }}
+  ]
+}}
+avec exactement une entrée par point fourni, dans le même ordre.
+"""
+
+
+@profiler("prompt")
+def construire_prompt_analyse_globale(
+    commune_nom: str,
+    resume: str,
+    seance: Optional[Dict[str, Any]],
+) -> str:
+    """Assemble le prompt global : consignes fixes d'abord, données de la séance ensuite."""
+    return (
+        f"{CONSIGNES_ANALYSE_GLOBALE}\n"
+        "DONNÉES DE LA SÉANCE\n"
+        f"Statut des documents : {_statut_documents_seance(seance)}\n"
+        f"Voici les délibérations récentes du conseil communal de {commune_nom} :\n\n"
+        f"{resume}"
+    )
+
+
+@profiler("prompt")
+def construire_prompt_analyse_groupee(lots: List[Dict[str, Any]]) -> str:
+    """Assemble le prompt groupé : consignes fixes, puis une section identifiée par commune."""
+    sections = []
+    for lot in lots:
+        sections.append(
+            f"=== COMMUNE id={lot['slug']} ===\n"
+            f"Statut des documents : {_statut_documents_seance(lot['seance'])}\n"
+            f"Voici les délibérations récentes du conseil communal de {lot['nom']} :\n\n"
+            f"{lot['resume']}"
+        )
+    return f"{CONSIGNES_ANALYSE_GROUPEE}\nDONNÉES DES SÉANCES\n" + "\n".join(sections)
+
+
+@profiler("prompt")
+def construire_prompt_reecriture_statut(sujets: List[Dict[str, Any]], seance: Optional[Dict[str, Any]]) -> str:
+    """Prompt de mise au temps des descriptions de points inchangés."""
+    lignes = []
+    for index, sujet in enumerate(sujets, 1):
+        lignes.append(f"{index}. {sujet.get('titre', '')}")
+        lignes.append(f"   Description : {sujet.get('description', '')}")
+    return (
+        f"{CONSIGNES_REECRITURE_STATUT}\n"
+        "DONNÉES\n"
+        f"Statut des documents : {_statut_documents_seance(seance)}\n\n"
+        + "\n".join(lignes)
+    )
+
+
+@profiler("prompt")
+def construire_prompt_resume_extrait(titre: str, extrait: str, rang: int, total: int) -> str:
+    """Prompt de résumé d'un extrait d'une longue délibération (phase map)."""
+    return (
+        f"{CONSIGNES_RESUME_EXTRAIT}\n"
+        f"EXTRAIT {rang}/{total}\n"
+        f"TITRE DE LA DÉLIBÉRATION : {titre}\n\n"
+        f"{extrait}\n"
+    )
+
+
+@profiler("prompt")
+def construire_prompt_analyse_detaillee(titre: str, contenu: str, faits: str = "") -> str:
+    """Assemble le prompt détaillé : consignes fixes d'abord, délibération ensuite."""
+    ligne_faits = f"FAITS EXTRAITS : {faits}\n\n" if faits else ""
+    return (
+        f"{CONSIGNES_ANALYSE_DETAILLEE}\n"
+        "DÉLIBÉRATION\n"
+        f"TITRE : {titre}\n\n"
+        f"{ligne_faits}"
+        f"CONTENU :\n{contenu}\n"
+    )
+
+
+def analyser_globalement(
+    client: "OpenAI",
+    deliberations: List[Dict[str, Any]],
+    modele: str,
+    commune_nom: str,
+    seance: Optional[Dict[str, Any]],
+    max_sujets: int = 5,
+) -> List[Dict[str, Any]]:
+    """Interroge l'IA pour obtenir la liste des points abordés."""
+    print("=" * 80)
+    print("ANALYSE GLOBALE : Liste des points abordés")
+    print("=" * 80 + "\n")
+    print("L'IA analyse toutes les délibérations (2-3 minutes)...\n")
+
+    resume = creer_resume_court(deliberations)
+    prompt = construire_prompt_analyse_globale(commune_nom, resume, seance)
+
     reponse = appeler_modele_json(client, prompt, modele)
     sujets = extraire_topics_depuis_reponse(reponse)
 
@@ -437,33 +721,475 @@ Règles :
     return sujets
 
 
+def _aligner_sujets(sujets: List[Dict[str, Any]], deliberations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ramène la réponse d'un sous-lot à un sujet par délibération, dans l'ordre."""
+    alignes = list(sujets[: len(deliberations)])
+    for deliberation in deliberations[len(alignes):]:
+        alignes.append({"titre": _normaliser_titre_sujet(deliberation.get("titre", "")), "description": ""})
+    return alignes
+
+
+def analyser_avec_routage(
+    client: "OpenAI",
+    deliberations: List[Dict[str, Any]],
+    modele: str,
+    modele_leger: str,
+    commune_nom: str,
+    seance: Optional[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Répartit les points entre gabarit local, modèle léger et modèle principal,
+    puis recompose la liste des sujets dans l'ordre de la séance.
+    """
+    routes = router_points(deliberations)
+    repartition = repartition_routes(routes)
+    print(f"Routage des points : {formater_repartition(repartition)}\n")
+
+    sujets: List[Optional[Dict[str, Any]]] = [None] * len(deliberations)
+    for index, (route, sujet) in enumerate(routes):
+        if route == ROUTE_GABARIT:
+            sujets[index] = sujet
+
+    sous_lots = {
+        route_modele: [index for index, (route, _) in enumerate(routes) if route == route_modele]
+        for route_modele in (ROUTE_LEGER, ROUTE_PRINCIPAL)
+    }
+    modeles = {ROUTE_LEGER: modele_leger, ROUTE_PRINCIPAL: modele}
+
+    with ThreadPoolExecutor(max_workers=2) as executeur:
+        futures = {
+            route: executeur.submit(
+                analyser_globalement,
+                client,
+                [deliberations[index] for index in indices],
+                modele=modeles[route],
+                commune_nom=commune_nom,
+                seance=seance,
+            )
+            for route, indices in sous_lots.items()
+            if indices
+        }
+        for route, future in futures.items():
+            indices = sous_lots[route]
+            reponse = _aligner_sujets(future.result(), [deliberations[index] for index in indices])
+            for index, sujet in zip(indices, reponse):
+                sujets[index] = sujet
+
+    return [sujet for sujet in sujets if sujet is not None], repartition
+
+
+def reecrire_descriptions_statut(
+    client: "OpenAI",
+    sujets: List[Dict[str, Any]],
+    seance: Optional[Dict[str, Any]],
+    modele: str,
+) -> List[Dict[str, Any]]:
+    """Adapte au nouveau statut les descriptions de points dont le texte n'a pas changé."""
+    print(f"Réécriture du statut pour {len(sujets)} point(s) inchangé(s)...\n")
+    prompt = construire_prompt_reecriture_statut(sujets, seance)
+    reponse = extraire_topics_depuis_reponse(appeler_modele_json(client, prompt, modele))
+    reecrits: List[Dict[str, Any]] = []
+    for index, sujet in enumerate(sujets):
+        description = reponse[index]["description"] if index < len(reponse) else ""
+        # Le titre d'origine est conservé ; une réponse incomplète garde l'ancienne description.
+        reecrits.append({"titre": sujet["titre"], "description": description or sujet["description"]})
+    return reecrits
+
+
+def charger_analyse_precedente(chemin_fichier: str) -> Optional[Dict[str, Any]]:
+    """Charge l'analyse existante d'une commune si elle porte des empreintes de points."""
+    try:
+        donnees = charger_topics_json(chemin_fichier)
+    except RuntimeError:
+        return None
+    if not any(sujet.get("empreinte") for sujet in donnees.get("points", []) if isinstance(sujet, dict)):
+        return None
+    return donnees
+
+
+def meme_seance(seance: Optional[Dict[str, Any]], seance_precedente: Optional[Dict[str, Any]]) -> bool:
+    """Vrai si les deux séances ont la même date (projet de décision puis décision d'une même séance)."""
+    from pipeline_journalistique import decrire_seance
+
+    date_cle = decrire_seance((seance or {}).get("id"), (seance or {}).get("nom"))[0]
+    date_precedente = decrire_seance((seance_precedente or {}).get("id"), (seance_precedente or {}).get("nom"))[0]
+    return date_cle is not None and date_cle == date_precedente
+
+
+def sujets_reutilisables(
+    deliberations: List[Dict[str, Any]], seance: Optional[Dict[str, Any]], precedent: Optional[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Sujets de l'analyse précédente (même séance) dont le point est inchangé, par empreinte."""
+    if not precedent or not meme_seance(seance, precedent.get("seance")):
+        return {}
+    empreintes = {empreinte_point(deliberation) for deliberation in deliberations}
+    return {
+        sujet["empreinte"]: sujet
+        for sujet in precedent.get("points", [])
+        if isinstance(sujet, dict) and sujet.get("empreinte") in empreintes
+    }
+
+
+def analyser_incrementalement(
+    client: "OpenAI",
+    args: argparse.Namespace,
+    deliberations: List[Dict[str, Any]],
+    commune_nom: str,
+    seance: Optional[Dict[str, Any]],
+    precedent: Dict[str, Any],
+) -> Optional[Tuple[List[Dict[str, Any]], Optional[Dict[str, int]]]]:
+    """
+    Réutilise l'analyse précédente pour les points dont le texte est inchangé
+    (passage de projet de décision à décision) et n'analyse que les points amendés.
+
+    Retourne None si aucun point n'est réutilisable, notamment si l'analyse
+    précédente porte sur une autre séance : les points récurrents (procès-verbal,
+    communications, tutelle) d'une séance passée ne sont pas repris.
+    """
+    anciens = sujets_reutilisables(deliberations, seance, precedent)
+    if not anciens:
+        return None
+    empreintes = [empreinte_point(deliberation) for deliberation in deliberations]
+    inchanges = [index for index, empreinte in enumerate(empreintes) if empreinte in anciens]
+    modifies = [index for index, empreinte in enumerate(empreintes) if empreinte not in anciens]
+
+    statut = _statut_documents_seance(seance)
+    statut_precedent = precedent.get("statut_documents") or _statut_documents_seance(precedent.get("seance"))
+    print("=" * 80)
+    print("ANALYSE INCRÉMENTALE")
+    print("=" * 80)
+    print(
+        f"{len(inchanges)} point(s) inchangé(s), {len(modifies)} point(s) nouveau(x) ou amendé(s) ; "
+        f"statut {statut_precedent} → {statut}\n"
+    )
+
+    repris = []
+    for index in inchanges:
+        ancien = anciens[empreintes[index]]
+        repris.append({"titre": ancien.get("titre", ""), "description": ancien.get("description", "")})
+    sujets: List[Optional[Dict[str, Any]]] = [None] * len(deliberations)
+    routage: Optional[Dict[str, int]] = None
+
+    with ThreadPoolExecutor(max_workers=2) as executeur:
+        future_reecriture = None
+        if statut != statut_precedent:
+            future_reecriture = executeur.submit(reecrire_descriptions_statut, client, repris, seance, args.modele_leger)
+        future_analyse = None
+        if modifies:
+            future_analyse = executeur.submit(
+                analyser_commune_globalement,
+                client,
+                args,
+                [deliberations[index] for index in modifies],
+                commune_nom,
+                seance,
+            )
+
+        if future_reecriture is not None:
+            repris = future_reecriture.result()
+        for index, sujet in zip(inchanges, repris):
+            sujets[index] = sujet
+
+        if future_analyse is not None:
+            nouveaux, routage = future_analyse.result()
+            nouveaux = _aligner_sujets(nouveaux, [deliberations[index] for index in modifies])
+            for index, sujet in zip(modifies, nouveaux):
+                sujets[index] = sujet
+
+    return [sujet for sujet in sujets if sujet is not None], routage
+
+
+def estimer_tokens_texte(texte: str) -> int:
+    """Estimation grossière du nombre de tokens d'un texte français."""
+    return max(1, int(len(texte) / CARACTERES_PAR_TOKEN))
+
+
+def composer_lots_communes(
+    communes: List[Dict[str, Any]],
+    seuil_petite_commune: int,
+    budget_tokens: int,
+) -> Tuple[List[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Répartit les communes entre lots groupés et analyses individuelles.
+
+    Une commune dont le résumé dépasse `seuil_petite_commune` tokens reste
+    seule ; les autres sont empaquetées, dans l'ordre, tant que la somme des
+    résumés d'un lot ne dépasse pas `budget_tokens`.
+    """
+    lots: List[List[Dict[str, Any]]] = []
+    individuelles: List[Dict[str, Any]] = []
+    lot_courant: List[Dict[str, Any]] = []
+    tokens_lot = 0
+    for commune in communes:
+        tokens = estimer_tokens_texte(commune["resume"])
+        if tokens > seuil_petite_commune:
+            individuelles.append(commune)
+            continue
+        if lot_courant and tokens_lot + tokens > budget_tokens:
+            lots.append(lot_courant)
+            lot_courant, tokens_lot = [], 0
+        lot_courant.append(commune)
+        tokens_lot += tokens
+    if len(lot_courant) == 1:
+        individuelles.append(lot_courant[0])
+    elif lot_courant:
+        lots.append(lot_courant)
+    return lots, individuelles
+
+
+def extraire_topics_groupes_depuis_reponse(reponse: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Parse la réponse groupée et retourne les points par identifiant de commune."""
+    contenu_json = _nettoyer_sortie_json(reponse)
+    try:
+        donnees = json.loads(contenu_json)
+    except json.JSONDecodeError as err:
+        raise RuntimeError("Impossible de décoder la réponse groupée du modèle en JSON") from err
+
+    resultat: Dict[str, List[Dict[str, Any]]] = {}
+    for bloc in donnees.get("communes", []) or []:
+        if not isinstance(bloc, dict):
+            continue
+        identifiant = str(bloc.get("id") or "").strip().lower()
+        if not identifiant:
+            continue
+        resultat[identifiant] = extraire_topics_depuis_reponse(json.dumps({"points": bloc.get("points", [])}))
+    return resultat
+
+
+def analyser_lot_communes(
+    client: "OpenAI",
+    lot: List[Dict[str, Any]],
+    modele: str,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Analyse plusieurs petites communes en un seul appel au modèle."""
+    noms = ", ".join(commune["nom"] for commune in lot)
+    print("=" * 80)
+    print(f"ANALYSE GROUPÉE : {len(lot)} communes ({noms})")
+    print("=" * 80 + "\n")
+
+    prompt = construire_prompt_analyse_groupee(lot)
+    reponse = appeler_modele_json(client, prompt, modele)
+    sujets_par_commune = extraire_topics_groupes_depuis_reponse(reponse)
+    for commune in lot:
+        nombre = len(sujets_par_commune.get(commune["slug"], []))
+        print(f"✓ {commune['nom']} : {nombre} point(s) listé(s) par l'IA")
+    print("")
+    return sujets_par_commune
+
+
+def decouper_en_sections(deliberation: Dict[str, Any]) -> List[str]:
+    """Découpe une délibération en sections (visas, considérants, articles, chapitres...)."""
+    contenu = deliberation.get("contenu", "") or ""
+    stockees = deliberation.get("sections")
+    if isinstance(stockees, dict):
+        bornes = [0, *debuts_sections(contenu, stockees), len(contenu)]
+        sections = [contenu[debut:fin].rstrip("\n") for debut, fin in zip(bornes, bornes[1:])]
+        return [section for section in sections if section.strip()]
+
+    # Anciens fichiers sans sections stockées : découpage sur les débuts de section usuels.
+    sections = []
+    courante: List[str] = []
+    for ligne in contenu.splitlines():
+        if MOTIF_DEBUT_SECTION.match(ligne) and courante:
+            sections.append("\n".join(courante))
+            courante = []
+        courante.append(ligne)
+    if courante:
+        sections.append("\n".join(courante))
+    return [section for section in sections if section.strip()]
+
+
+def composer_extraits(deliberation: Dict[str, Any], taille: int = TAILLE_EXTRAIT_DETAIL) -> List[str]:
+    """Regroupe les sections consécutives en extraits d'au plus `taille` caractères."""
+    extraits: List[str] = []
+    courant = ""
+    for section in decouper_en_sections(deliberation):
+        # Une section trop longue (règlement sans articles repérables) est coupée net.
+        morceaux = [section[debut:debut + taille] for debut in range(0, len(section), taille)]
+        for morceau in morceaux:
+            if courant and len(courant) + len(morceau) + 1 > taille:
+                extraits.append(courant)
+                courant = ""
+            courant = f"{courant}\n{morceau}" if courant else morceau
+    if courant:
+        extraits.append(courant)
+    return extraits
+
+
+def selectionner_extraits(extraits: List[str], budget_tokens: int, cout_synthese: int = 0) -> List[int]:
+    """
+    Garde les extraits à résumer sans dépasser le budget de tokens du point :
+    le premier (objet du dossier), puis les plus riches en montants et en
+    vocabulaire de fond, restitués dans l'ordre du document. Le budget couvre
+    aussi l'appel de synthèse : son prompt fixe (`cout_synthese`) et le
+    résumé de chaque extrait retenu.
+    """
+    couts = [
+        estimer_tokens_texte(CONSIGNES_RESUME_EXTRAIT + extrait) + TOKENS_RESUME_EXTRAIT for extrait in extraits
+    ]
+    budget_tokens -= cout_synthese
+    if sum(couts) <= budget_tokens:
+        return list(range(len(extraits)))
+
+    retenus = [0]
+    depense = couts[0]
+    candidats = sorted(
+        range(1, len(extraits)),
+        key=lambda index: score_substance({"titre": "", "contenu": extraits[index]}),
+        reverse=True,
+    )
+    for index in candidats:
+        if depense + couts[index] <= budget_tokens:
+            retenus.append(index)
+            depense += couts[index]
+    return sorted(retenus)
+
+
+def resumer_extrait(
+    client: "OpenAI",
+    titre: str,
+    extrait: str,
+    rang: int,
+    total: int,
+    modele: str,
+    dossier_cache: Optional[str] = None,
+) -> str:
+    """
+    Résumé d'un extrait (phase map), conservé dans `dossier_cache` sous
+    l'empreinte du texte quel que soit le backend : un extrait inchangé n'est
+    pas résumé deux fois, même si les extraits retenus autour de lui changent.
+    """
+    cle = hashlib.sha256(
+        json.dumps([modele, CONSIGNES_RESUME_EXTRAIT, titre, extrait], ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    chemin = Path(dossier_cache) / "extraits" / cle[:2] / f"{cle}.json" if dossier_cache else None
+    if chemin and chemin.exists():
+        try:
+            return json.loads(chemin.read_text(encoding="utf-8"))["resume"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    prompt = construire_prompt_resume_extrait(titre, extrait, rang, total)
+    resume = appeler_modele_text(client, prompt, modele, priorite=PRIORITE_DETAIL)
+    if chemin:
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        chemin.write_text(json.dumps({"resume": resume}, ensure_ascii=False), encoding="utf-8")
+    return resume
+
+
+def analyser_document_long(
+    client: "OpenAI",
+    deliberation: Dict[str, Any],
+    modele: str,
+    budget_tokens: int,
+    numero: int,
+    faits: str = "",
+    dossier_cache: Optional[str] = None,
+) -> str:
+    """Analyse détaillée en deux temps : résumé concurrent des extraits, puis synthèse en six rubriques."""
+    titre = deliberation.get("titre", "Titre inconnu")
+    contenu = deliberation.get("contenu", "")
+    extraits = composer_extraits(deliberation)
+    cout_synthese = estimer_tokens_texte(construire_prompt_analyse_detaillee(titre, "", faits))
+    retenus = selectionner_extraits(extraits, budget_tokens, cout_synthese)
+    print(
+        f"  Point {numero}, document long ({len(contenu)} caractères) : {len(retenus)}/{len(extraits)} extrait(s) "
+        f"résumé(s) dans un budget de {budget_tokens} tokens"
+    )
+
+    with ThreadPoolExecutor(max_workers=min(8, len(retenus))) as executeur:
+        resumes = list(
+            executeur.map(
+                lambda rang, index: resumer_extrait(
+                    client, titre, extraits[index], rang, len(retenus), modele, dossier_cache
+                ),
+                range(1, len(retenus) + 1),
+                retenus,
+            )
+        )
+
+    contenu_reduit = "\n\n".join(
+        f"[Résumé de l'extrait {rang}/{len(resumes)}]\n{resume}" for rang, resume in enumerate(resumes, 1)
+    )
+    if len(retenus) < len(extraits):
+        contenu_reduit += f"\n\n({len(extraits) - len(retenus)} extrait(s) de moindre importance non résumé(s).)"
+    prompt = construire_prompt_analyse_detaillee(titre, contenu_reduit, faits)
+    return appeler_modele_text(client, prompt, modele, priorite=PRIORITE_DETAIL)
+
+
 def analyser_sujet_specifique(
-    client: OpenAI,
+    client: "OpenAI",
     deliberation: Dict[str, Any],
     numero: int,
     modele: str,
+    budget_tokens: int = BUDGET_TOKENS_DETAIL_PAR_DEFAUT,
+    dossier_cache: Optional[str] = None,
 ) -> str:
     """Analyse détaillée d'une délibération spécifique."""
     print(f"\nAnalyse détaillée du point {numero}...")
 
+    titre = deliberation.get("titre", "Titre inconnu")
     contenu = deliberation.get("contenu", "")
-    prompt = f"""Tu es un journaliste qui analyse une délibération de conseil communal.
+    # Les faits sont relevés sur le texte complet : ils survivent au découpage en extraits.
+    faits = resumer_faits(faits_du_point(deliberation), max_elements=8)
+    if len(contenu) > TAILLE_EXTRAIT_DETAIL:
+        return analyser_document_long(client, deliberation, modele, budget_tokens, numero, faits, dossier_cache)
 
-TITRE : {deliberation.get('titre', 'Titre inconnu')}
+    prompt = construire_prompt_analyse_detaillee(titre, contenu, faits)
+    return appeler_modele_text(client, prompt, modele, priorite=PRIORITE_DETAIL)
 
-CONTENU :
-{contenu[:3000]}
 
-Fournis en français une analyse synthétique comprenant :
-1. RÉSUMÉ EN 2 PHRASES
-2. ENJEUX POUR LES CITOYENS
-3. MONTANTS BUDGÉTAIRES (s'il y en a)
-4. CONTROVERSES POTENTIELLES
-5. QUESTIONS À POSER
-6. CONTEXTE COMPLÉMENTAIRE
-"""
+def estimer_cout_detail(deliberation: Dict[str, Any], budget_tokens_point: int) -> int:
+    """Tokens d'entrée estimés pour l'analyse détaillée d'un point."""
+    contenu = deliberation.get("contenu", "") or ""
+    return min(estimer_tokens_texte(contenu), budget_tokens_point) + estimer_tokens_texte(CONSIGNES_ANALYSE_DETAILLEE)
 
-    return appeler_modele_text(client, prompt, modele)
+
+def selectionner_points_detail(
+    deliberations: List[Dict[str, Any]],
+    nombre: int,
+    budget_tokens: int,
+    budget_tokens_point: int,
+    precedent: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[int], int]:
+    """
+    Choisit jusqu'à `nombre` points à analyser en détail, par score local
+    décroissant, sans dépasser `budget_tokens`. Un point absent de l'analyse
+    précédente reçoit un bonus de nouveauté.
+
+    Retourne les numéros retenus (base 1) et les tokens estimés consommés.
+    """
+    empreintes_connues = {
+        sujet.get("empreinte") for sujet in (precedent or {}).get("points", []) if isinstance(sujet, dict)
+    }
+    candidats = []
+    for numero, deliberation in enumerate(deliberations, 1):
+        composantes = composantes_score(deliberation)
+        composantes["nouveaute"] = (
+            BONUS_NOUVEAUTE if precedent and empreinte_point(deliberation) not in empreintes_connues else 0.0
+        )
+        candidats.append((sum(composantes.values()), numero, composantes))
+    candidats.sort(key=lambda candidat: (-candidat[0], candidat[1]))
+
+    print("=" * 80)
+    print(f"SÉLECTION AUTOMATIQUE DES ANALYSES DÉTAILLÉES ({nombre} max, budget {budget_tokens} tokens)")
+    print("=" * 80)
+    retenus: List[int] = []
+    depense = 0
+    for score, numero, composantes in candidats:
+        cout = estimer_cout_detail(deliberations[numero - 1], budget_tokens_point)
+        if len(retenus) < nombre and depense + cout <= budget_tokens:
+            retenus.append(numero)
+            depense += cout
+            decision = "✓ retenu"
+        elif len(retenus) < nombre:
+            decision = "budget dépassé"
+        else:
+            decision = "-"
+        detail = ", ".join(f"{cle} {valeur:.2f}" for cle, valeur in composantes.items())
+        print(f"  #{numero:<3} score {score:5.2f} ({detail}) ~{cout} tokens {decision}")
+    print(f"\n✓ {len(retenus)} point(s) retenu(s), ~{depense} tokens estimés\n")
+    return sorted(retenus), depense
 
 
 def sauvegarder_analyse_textuelle(
@@ -521,18 +1247,23 @@ def sauvegarder_topics_json(
     chemin_fichier: str,
     seance: Optional[Dict[str, Any]],
     commune_nom: str,
+    routage: Optional[Dict[str, int]] = None,
 ) -> None:
     """Sauvegarde les sujets dans un fichier JSON structuré."""
     payload = {
         "generated_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
         "commune": commune_nom,
         "seance": seance,
+        "statut_documents": _statut_documents_seance(seance),
         "points": sujets,
     }
+    if routage:
+        payload["routage"] = routage
     Path(chemin_fichier).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"✓ Résultats structurés sauvegardés dans {chemin_fichier}")
 
 
+@profiler("rendu_html")
 def generer_html(
     sujets: List[Dict[str, Any]],
     chemin_fichier: str,
@@ -831,10 +1562,27 @@ def _horodatage_affichage() -> str:
     return datetime.now().strftime("%d/%m/%Y à %H:%M")
 
 
-def _table_row_html(commune_nom: str, seance_nom: Optional[str], sujets: List[Dict[str, Any]]) -> str:
+def _points_differes_html(url_fragment: str, nombre_points: int) -> str:
+    """Emplacement des points d'une commune, chargés depuis leur fragment JSON à l'affichage de la ligne."""
+    if not nombre_points:
+        return "<p>Aucun point n'a été identifié.</p>"
+    libelle = f"Afficher les {nombre_points} points" if nombre_points > 1 else "Afficher le point"
+    return (
+        f"<div class=\"points\" data-fragment=\"{html.escape(url_fragment, quote=True)}\">"
+        f"<button type=\"button\" class=\"points-load\">{libelle}</button>"
+        "</div>"
+    )
+
+
+def _table_row_html(
+    commune_nom: str,
+    seance_nom: Optional[str],
+    sujets: List[Dict[str, Any]],
+    url_fragment: Optional[str] = None,
+) -> str:
     date_seance, type_seance = _extraire_date_et_type_seance(seance_nom)
     date_sort = _cle_tri_date(date_seance)
-    points_html = _points_html(sujets)
+    points_html = _points_differes_html(url_fragment, len(sujets)) if url_fragment else _points_html(sujets)
     return (
         f"<tr data-commune=\"{html.escape(commune_nom)}\" data-date-sort=\"{date_sort}\">"
         f"<td>{html.escape(commune_nom)}</td>"
@@ -904,14 +1652,143 @@ def _all_table_html(rows: List[Dict[str, str]]) -> str:
     )
 
 
+def ecrire_fragment_commune(
+    dossier: Path, slug: str, commune_nom: str, seance_nom: Optional[str], sujets: List[Dict[str, Any]]
+) -> str:
+    """
+    Écrit les points d'une commune dans `dossier/<slug>.json` (réécrit
+    seulement s'il change) et retourne le nom du fichier suivi d'une version
+    tirée de son contenu, pour que les navigateurs ne gardent pas un fragment périmé.
+    """
+    points = []
+    for sujet in sujets:
+        point = {"titre": sujet.get("titre", "")}
+        for cle in ("description", "source_url", "source_label"):
+            if sujet.get(cle):
+                point[cle] = sujet[cle]
+        points.append(point)
+    contenu = json.dumps(
+        {"commune": commune_nom, "seance": seance_nom, "points": points}, ensure_ascii=False, separators=(",", ":")
+    )
+    chemin = dossier / f"{slug}.json"
+    if not chemin.exists() or chemin.read_text(encoding="utf-8") != contenu:
+        chemin.write_text(contenu, encoding="utf-8")
+    return f"{chemin.name}?v={hashlib.sha256(contenu.encode('utf-8')).hexdigest()[:10]}"
+
+
+# Chargement des points à l'approche de la ligne (ou au clic), avec le même
+# balisage que les points intégrés à la page ; un fragment est demandé une
+# seule fois même si la commune apparaît dans plusieurs tableaux.
+SCRIPT_FRAGMENTS = """
+    const fragmentRequests = new Map();
+    const fetchFragment = (url) => {
+      if (!fragmentRequests.has(url)) {
+        fragmentRequests.set(
+          url,
+          fetch(url).then((response) => {
+            if (!response.ok) {
+              throw new Error(String(response.status));
+            }
+            return response.json();
+          })
+        );
+      }
+      return fragmentRequests.get(url);
+    };
+
+    const renderPoints = (container, points) => {
+      container.textContent = "";
+      points.forEach((point, index) => {
+        const details = document.createElement("details");
+        const summary = document.createElement("summary");
+        summary.textContent = `${index + 1}. ${point.titre || ""}`;
+        details.appendChild(summary);
+        if (point.description) {
+          const description = document.createElement("p");
+          description.className = "point-description";
+          description.textContent = point.description;
+          details.appendChild(description);
+        }
+        if (point.source_url) {
+          const paragraph = document.createElement("p");
+          paragraph.className = "point-link";
+          const link = document.createElement("a");
+          link.className = "decision-link";
+          link.href = point.source_url;
+          link.target = "_blank";
+          link.rel = "noopener noreferrer";
+          link.textContent = point.source_label || "Lien vers la décision";
+          paragraph.appendChild(link);
+          details.appendChild(paragraph);
+        }
+        container.appendChild(details);
+      });
+    };
+
+    const loadPoints = (container) => {
+      if (container.dataset.state) {
+        return;
+      }
+      container.dataset.state = "loading";
+      fetchFragment(container.dataset.fragment)
+        .then((fragment) => {
+          renderPoints(container, fragment.points || []);
+          container.dataset.state = "loaded";
+        })
+        .catch(() => {
+          fragmentRequests.delete(container.dataset.fragment);
+          container.dataset.state = "";
+          const button = container.querySelector(".points-load");
+          if (button) {
+            button.textContent = "Points indisponibles, réessayer";
+          }
+        });
+    };
+
+    const pointContainers = Array.from(document.querySelectorAll(".points[data-fragment]"));
+    pointContainers.forEach((container) => {
+      container.addEventListener("click", (event) => {
+        if (event.target.closest(".points-load")) {
+          loadPoints(container);
+        }
+      });
+    });
+    if ("IntersectionObserver" in window) {
+      const observer = new IntersectionObserver(
+        (entries) => {
+          entries.forEach((entry) => {
+            if (entry.isIntersecting) {
+              observer.unobserve(entry.target);
+              loadPoints(entry.target);
+            }
+          });
+        },
+        { rootMargin: "400px 0px" }
+      );
+      pointContainers.forEach((container) => observer.observe(container));
+    }
+"""
+
+
+@profiler("rendu_html")
 def generer_html_multi(
     sujets_par_commune: List[Dict[str, Any]],
     chemin_fichier: str,
     group_labels: Optional[List[str]] = None,
     group_sizes: Optional[List[int]] = None,
+    dossier_fragments: Optional[str] = None,
 ) -> None:
-    """Produit une page HTML unique regroupant plusieurs communes."""
+    """
+    Produit une page HTML unique regroupant plusieurs communes. Avec
+    `dossier_fragments` (relatif à la page), la page ne contient que l'index
+    des communes et leurs dates : les points de chaque commune sont écrits
+    dans un fragment JSON, chargé quand sa ligne est affichée.
+    """
     generated_at = _horodatage_affichage()
+    dossier = None
+    if dossier_fragments:
+        dossier = Path(chemin_fichier).parent / dossier_fragments
+        dossier.mkdir(parents=True, exist_ok=True)
 
     rows: List[Dict[str, str]] = []
     commune_options: List[str] = []
@@ -920,10 +1797,14 @@ def generer_html_multi(
         nom = _nom_commune_affichage(slug) if slug else (bloc.get("commune_nom") or "Commune")
         commune_options.append(nom)
         seance_nom = bloc.get("seance_nom")
+        url_fragment = None
+        if dossier is not None and slug:
+            fichier = ecrire_fragment_commune(dossier, slug, nom, seance_nom, bloc.get("topics", []))
+            url_fragment = f"{Path(dossier_fragments).as_posix()}/{fichier}"
         rows.append(
             {
                 "commune_nom": nom,
-                "html": _table_row_html(nom, seance_nom, bloc.get("topics", [])),
+                "html": _table_row_html(nom, seance_nom, bloc.get("topics", []), url_fragment),
             }
         )
 
@@ -934,6 +1815,7 @@ def generer_html_multi(
         for nom in commune_options
     )
     commune_options_js = json.dumps(commune_options, ensure_ascii=False)
+    script_fragments = SCRIPT_FRAGMENTS if dossier is not None else ""
 
     contenu_html = f"""<!DOCTYPE html>
 <html lang="fr">
@@ -1107,6 +1989,17 @@ def generer_html_multi(
       font-size: 0.95rem;
     }}
 
+    .points-load {{
+      border: 1px solid #cbd2d9;
+      border-radius: 8px;
+      background: #ffffff;
+      color: #0b7285;
+      padding: 0.45rem 0.8rem;
+      font: inherit;
+      font-weight: 600;
+      cursor: pointer;
+    }}
+
     @media (max-width: 600px) {{
       main {{
         padding: 2rem 1.5rem;
@@ -1322,6 +2215,7 @@ def generer_html_multi(
       updateCommuneSuggestions();
       applyFilters();
     }}
+{script_fragments}
   </script>
 </body>
 </html>
@@ -1331,14 +2225,31 @@ def generer_html_multi(
     print(f"✓ Page HTML multi-communes actualisée dans {chemin_fichier}")
 
 
-def parser_arguments() -> argparse.Namespace:
-    """Analyse les arguments de la ligne de commande."""
+def chemins_par_defaut(commune_slug: str) -> Tuple[str, str, str, str]:
+    """Chemins standards (délibérations, texte, JSON, HTML) pour une commune."""
+    if commune_slug == "wavre":
+        return (
+            "deliberations_wavre.json",
+            "analyse_conseils_communaux.txt",
+            "analyse_conseils_communaux.json",
+            "analyse_conseils_communaux.html",
+        )
+    return (
+        f"deliberations_{commune_slug}.json",
+        f"analyse_conseils_communaux_{commune_slug}.txt",
+        f"analyse_conseils_communaux_{commune_slug}.json",
+        f"analyse_conseils_communaux_{commune_slug}.html",
+    )
+
+
+def parser_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande (ou `argv`)."""
     parser = argparse.ArgumentParser(description="Analyse les délibérations et génère les sujets journalistiques.")
     parser.add_argument("--commune", default="wavre", help="Slug de la commune (ex: wavre, incourt).")
     parser.add_argument(
         "--communes",
         nargs="*",
-        help="Liste des communes à compiler (utilisé avec --merge-html).",
+        help="Liste des communes à compiler (--merge-html) ou à analyser ensemble (--regrouper).",
     )
     parser.add_argument("--deliberations", default=None, help="Fichier JSON des délibérations.")
     parser.add_argument("--texte", default=None, help="Fichier texte de sortie.")
@@ -1350,6 +2261,46 @@ def parser_arguments() -> argparse.Namespace:
         default=MODELE_PAR_DEFAUT,
         help="Identifiant du modèle OpenAI à utiliser (ex: gpt-4o-mini).",
     )
+    parser.add_argument(
+        "--routage",
+        action="store_true",
+        help="Envoie les points routiniers vers un gabarit local ou le modèle léger.",
+    )
+    parser.add_argument(
+        "--modele-leger",
+        default=MODELE_LEGER_PAR_DEFAUT,
+        help="Modèle utilisé pour les points routiniers (--routage) et la réécriture du statut des points inchangés.",
+    )
+    parser.add_argument(
+        "--analyse-complete",
+        action="store_true",
+        help="Réanalyse tous les points sans réutiliser l'analyse précédente de la séance.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS_MODELE,
+        default="openai",
+        help="Backend du modèle : openai, enregistrement, rejeu (cache disque) ou factice (serveur local).",
+    )
+    parser.add_argument(
+        "--dossier-rejeu",
+        default=DOSSIER_REJEU_PAR_DEFAUT,
+        help=(
+            "Dossier du cache de réponses pour les backends enregistrement/rejeu ; "
+            "les résumés d'extraits des longs documents y sont gardés quel que soit le backend."
+        ),
+    )
+    parser.add_argument(
+        "--url-factice",
+        default=None,
+        help="URL du serveur factice compatible OpenAI (ex: http://127.0.0.1:8765/v1).",
+    )
+    parser.add_argument(
+        "--appels-paralleles",
+        type=int,
+        default=APPELS_PARALLELES_PAR_DEFAUT,
+        help="Nombre maximal d'appels simultanés au modèle (ordonnanceur).",
+    )
     parser.add_argument("--skip-html", action="store_true", help="Ne pas générer la page HTML.")
     parser.add_argument("--skip-json", action="store_true", help="Ne pas générer le fichier JSON.")
     parser.add_argument(
@@ -1357,6 +2308,33 @@ def parser_arguments() -> argparse.Namespace:
         action="store_true",
         help="Génère une seule page HTML regroupant plusieurs communes.",
     )
+    parser.add_argument(
+        "--fragments-html",
+        default=DOSSIER_FRAGMENTS_PAR_DEFAUT,
+        help="--merge-html : dossier (relatif à la page) des fragments JSON de points chargés à la demande.",
+    )
+    parser.add_argument(
+        "--html-autonome",
+        action="store_true",
+        help="--merge-html : intègre tous les points dans la page au lieu de fragments chargés à la demande.",
+    )
+    parser.add_argument(
+        "--regrouper",
+        action="store_true",
+        help="Analyse les communes de --communes en regroupant les petites séances dans des appels partagés.",
+    )
+    parser.add_argument(
+        "--seuil-petite-commune",
+        type=int,
+        default=1500,
+        help="Taille maximale (tokens estimés du résumé) d'une séance pouvant être regroupée.",
+    )
+    parser.add_argument(
+        "--budget-regroupement",
+        type=int,
+        default=6000,
+        help="Nombre maximal de tokens estimés de données par appel groupé.",
+    )
     parser.add_argument(
         "--group-labels",
         nargs="*",
@@ -1368,18 +2346,61 @@ def parser_arguments() -> argparse.Namespace:
         type=int,
         help="Nombre de communes par groupe, dans l'ordre des libellés.",
     )
+    parser.add_argument(
+        "--details-auto",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Sélectionne automatiquement jusqu'à N points par commune à analyser en détail.",
+    )
+    parser.add_argument(
+        "--budget-tokens-selection",
+        type=int,
+        default=BUDGET_TOKENS_SELECTION_PAR_DEFAUT,
+        help="Budget global de tokens estimés pour les analyses détaillées choisies par --details-auto.",
+    )
+    parser.add_argument(
+        "--budget-tokens-detail",
+        type=int,
+        default=BUDGET_TOKENS_DETAIL_PAR_DEFAUT,
+        help="Plafond de tokens estimés envoyés pour résumer une longue délibération analysée en détail.",
+    )
     parser.add_argument(
         "--details",
         nargs="*",
         type=int,
         help="Numéros des délibérations à analyser en détail (utile en mode auto).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--journal",
+        default=chemin_journal_par_defaut("analyse"),
+        help="Journal JSON-lines des durées (appels au modèle, écriture des sorties) ; vide pour désactiver.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=dossier_profil_par_defaut("analyse"),
+        default="",
+        help="Profile chaque étape (cProfile, tracemalloc) et écrit les profils dans ce dossier.",
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> None:
-    args = parser_arguments()
+def main(argv: Optional[List[str]] = None) -> None:
+    """Point d'entrée ; `argv` permet à la pipeline de l'appeler dans son propre processus."""
+    args = parser_arguments(argv)
+    configurer_journal(args.journal)
+    configurer_profilage(args.profile)
+    attributs = {} if args.merge_html or args.regrouper else {"commune": args.commune.strip().lower()}
+    try:
+        with span("script", script="analyser_sujets", **attributs):
+            executer_analyse(args)
+    finally:
+        ecrire_profils()
+
 
+def executer_analyse(args: argparse.Namespace) -> None:
+    """Compilation HTML, analyse groupée ou analyse d'une commune selon les options."""
     if args.merge_html:
         communes = [commune.strip().lower() for commune in (args.communes or []) if commune.strip()]
         if not communes:
@@ -1409,45 +2430,125 @@ def main() -> None:
                     "topics": donnees.get("points", []),
                 }
             )
-        generer_html_multi(
-            blocs,
-            html_path,
-            group_labels=args.group_labels,
-            group_sizes=args.group_sizes,
-        )
+        with span("etape", etape="compilation_html"):
+            generer_html_multi(
+                blocs,
+                html_path,
+                group_labels=args.group_labels,
+                group_sizes=args.group_sizes,
+                dossier_fragments=None if args.html_autonome else args.fragments_html,
+            )
+        return
+
+    configurer_ordonnanceur(reutiliser=True, appels_paralleles=args.appels_paralleles)
+
+    if args.regrouper:
+        analyser_communes_regroupees(args)
         return
 
     commune_slug = args.commune.strip().lower()
     commune_nom = _nom_commune_affichage(commune_slug)
+    chemins = chemins_par_defaut(commune_slug)
+    deliberations_path = args.deliberations or chemins[0]
+    texte_path = args.texte or chemins[1]
+    json_path = args.json_path or chemins[2]
+    html_path = args.html or chemins[3]
 
-    deliberations_path = args.deliberations
-    if deliberations_path is None:
-        deliberations_path = "deliberations_wavre.json" if commune_slug == "wavre" else f"deliberations_{commune_slug}.json"
-    texte_path = args.texte
-    if texte_path is None:
-        texte_path = "analyse_conseils_communaux.txt" if commune_slug == "wavre" else f"analyse_conseils_communaux_{commune_slug}.txt"
-    json_path = args.json_path
-    if json_path is None:
-        json_path = "analyse_conseils_communaux.json" if commune_slug == "wavre" else f"analyse_conseils_communaux_{commune_slug}.json"
-    html_path = args.html
-    if html_path is None:
-        html_path = "analyse_conseils_communaux.html" if commune_slug == "wavre" else f"analyse_conseils_communaux_{commune_slug}.html"
-
-    deliberations, seance = charger_deliberations(deliberations_path)
+    with span("etape", etape="chargement"):
+        deliberations, seance = charger_deliberations(deliberations_path)
 
-    client = construire_client_openai()
+    client = construire_client_openai(args.backend, dossier_rejeu=args.dossier_rejeu, url_factice=args.url_factice)
 
     if not deliberations:
         print("Aucune délibération à analyser. Arrêt.")
         return
 
+    precedent = None if args.analyse_complete else charger_analyse_precedente(json_path)
+    with span("etape", etape="analyse_globale", points=len(deliberations)):
+        sujets, routage = analyser_commune_globalement(client, args, deliberations, commune_nom, seance, precedent)
+    finaliser_commune(
+        client,
+        args,
+        sujets,
+        deliberations,
+        seance,
+        commune_nom,
+        texte_path,
+        json_path,
+        html_path,
+        routage=routage,
+        precedent=precedent,
+    )
+
+    afficher_resume_ordonnanceur()
+    print("=" * 80)
+    print("ANALYSE TERMINÉE !")
+    print("=" * 80)
+    print(f"\nConsultez :\n  - {texte_path}\n  - {json_path}\n  - {html_path if not args.skip_html else '(HTML non généré)'}\n")
+
+
+def analyser_commune_globalement(
+    client: "OpenAI",
+    args: argparse.Namespace,
+    deliberations: List[Dict[str, Any]],
+    commune_nom: str,
+    seance: Optional[Dict[str, Any]],
+    precedent: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, int]]]:
+    """Analyse globale d'une commune : incrémentale si possible, avec ou sans routage des points."""
+    if precedent:
+        resultat = analyser_incrementalement(client, args, deliberations, commune_nom, seance, precedent)
+        if resultat is not None:
+            return resultat
+    if args.routage:
+        return analyser_avec_routage(
+            client,
+            deliberations,
+            modele=args.modele,
+            modele_leger=args.modele_leger,
+            commune_nom=commune_nom,
+            seance=seance,
+        )
     sujets = analyser_globalement(client, deliberations, modele=args.modele, commune_nom=commune_nom, seance=seance)
+    return sujets, None
+
+
+def finaliser_commune(
+    client: "OpenAI",
+    args: argparse.Namespace,
+    sujets: List[Dict[str, Any]],
+    deliberations: List[Dict[str, Any]],
+    seance: Optional[Dict[str, Any]],
+    commune_nom: str,
+    texte_path: str,
+    json_path: str,
+    html_path: str,
+    routage: Optional[Dict[str, int]] = None,
+    precedent: Optional[Dict[str, Any]] = None,
+    budget_selection: Optional[int] = None,
+) -> int:
+    """
+    Associe les sources, réalise les analyses détaillées et écrit les sorties d'une commune.
+
+    Retourne les tokens estimés consommés par la sélection automatique des détails.
+    """
     sujets = _associer_sources_aux_sujets(sujets, deliberations, seance)
+    for sujet, deliberation in zip(sujets, deliberations):
+        sujet["empreinte"] = empreinte_point(deliberation)
 
     analyses_detaillees: Dict[int, str] = {}
+    depense_selection = 0
 
     if args.details:
         numeros = [n for n in args.details if 1 <= n <= len(deliberations)]
+    elif args.details_auto:
+        numeros, depense_selection = selectionner_points_detail(
+            deliberations,
+            args.details_auto,
+            args.budget_tokens_selection if budget_selection is None else budget_selection,
+            args.budget_tokens_detail,
+            precedent,
+        )
     elif not args.auto:
         print("=" * 80)
         reponse = input("Voulez-vous des analyses détaillées de certaines délibérations ? (o/n) : ").strip().lower()
@@ -1465,20 +2566,169 @@ def main() -> None:
     else:
         numeros = []
 
-    for numero in numeros:
-        analyse = analyser_sujet_specifique(client, deliberations[numero - 1], numero, modele=args.modele)
-        analyses_detaillees[numero] = analyse
+    if numeros:
+        with span("etape", etape="details", points=len(numeros)), ThreadPoolExecutor(
+            max_workers=len(numeros)
+        ) as executeur:
+            futures = {
+                numero: executeur.submit(
+                    avec_contexte(analyser_sujet_specifique),
+                    client,
+                    deliberations[numero - 1],
+                    numero,
+                    modele=args.modele,
+                    budget_tokens=args.budget_tokens_detail,
+                    dossier_cache=args.dossier_rejeu,
+                )
+                for numero in numeros
+            }
+            for numero, future in futures.items():
+                analyses_detaillees[numero] = future.result()
+
+    with span("etape", etape="ecriture"):
+        sauvegarder_analyse_textuelle(sujets, analyses_detaillees, texte_path, seance, commune_nom)
+        if not args.skip_json:
+            sauvegarder_topics_json(sujets, json_path, seance, commune_nom, routage=routage)
+        if not args.skip_html:
+            generer_html(sujets, html_path, seance, commune_nom)
+    return depense_selection
+
 
-    sauvegarder_analyse_textuelle(sujets, analyses_detaillees, texte_path, seance, commune_nom)
-    if not args.skip_json:
-        sauvegarder_topics_json(sujets, json_path, seance, commune_nom)
-    if not args.skip_html:
-        generer_html(sujets, html_path, seance, commune_nom)
+class EchecsAnalyseGroupee(RuntimeError):
+    """Communes en échec d'une analyse groupée, les autres ayant été analysées."""
 
+    def __init__(self, erreurs: Dict[str, str]) -> None:
+        super().__init__(f"{len(erreurs)} commune(s) en échec : {', '.join(erreurs)}")
+        self.erreurs = erreurs
+
+
+def analyser_communes_regroupees(args: argparse.Namespace) -> None:
+    """Analyse plusieurs communes en regroupant les petites séances dans des appels partagés."""
+    slugs = [commune.strip().lower() for commune in (args.communes or []) if commune.strip()]
+    if not slugs:
+        print("Aucune commune fournie pour l'analyse groupée.")
+        return
+
+    client = construire_client_openai(args.backend, dossier_rejeu=args.dossier_rejeu, url_factice=args.url_factice)
+
+    # Une commune en échec (fichier illisible, réponse du modèle inexploitable...)
+    # n'interrompt pas l'analyse des autres ; elles sont signalées à la fin.
+    erreurs: Dict[str, str] = {}
+    chargees = []
+    for slug in slugs:
+        try:
+            deliberations, seance = charger_deliberations(chemins_par_defaut(slug)[0])
+        except RuntimeError as exc:
+            print(f"⚠ {slug} : {exc}")
+            erreurs[slug] = str(exc)
+            continue
+        if not deliberations:
+            print(f"Aucune délibération à analyser pour {slug}, commune ignorée.")
+            continue
+        chargees.append((slug, deliberations, seance))
+
+    # IDF commun à toutes les communes regroupées de l'exécution pour le résumé extractif.
+    extraits = extraits_par_seance([deliberations for _, deliberations, _ in chargees])
+    communes: List[Dict[str, Any]] = []
+    for (slug, deliberations, seance), extraits_commune in zip(chargees, extraits):
+        communes.append(
+            {
+                "slug": slug,
+                "nom": _nom_commune_affichage(slug),
+                "deliberations": deliberations,
+                "seance": seance,
+                "resume": creer_resume_court(deliberations, extraits_commune),
+                "precedent": None if args.analyse_complete else charger_analyse_precedente(chemins_par_defaut(slug)[2]),
+            }
+        )
+
+    # Une commune dont l'analyse précédente a des points réutilisables passe par
+    # l'analyse incrémentale ; les autres restent candidates au regroupement.
+    reutilisables = {
+        commune["slug"]
+        for commune in communes
+        if sujets_reutilisables(commune["deliberations"], commune["seance"], commune["precedent"])
+    }
+    incrementales = [commune for commune in communes if commune["slug"] in reutilisables]
+    lots, individuelles = composer_lots_communes(
+        [commune for commune in communes if commune["slug"] not in reutilisables],
+        args.seuil_petite_commune,
+        args.budget_regroupement,
+    )
+    individuelles = incrementales + individuelles
+    print(
+        f"Regroupement : {sum(len(lot) for lot in lots)} commune(s) dans {len(lots)} appel(s) groupé(s), "
+        f"{len(individuelles)} analyse(s) individuelle(s).\n"
+    )
+
+    sujets_par_commune: Dict[str, List[Dict[str, Any]]] = {}
+    routage_par_commune: Dict[str, Optional[Dict[str, int]]] = {}
+    for lot in lots:
+        try:
+            with span("etape", etape="analyse_groupee", communes=len(lot)):
+                resultats = analyser_lot_communes(client, lot, args.modele)
+        except Exception as exc:
+            print(f"⚠ Échec de l'appel groupé ({exc}), analyse individuelle de ses {len(lot)} commune(s).")
+            individuelles.extend(lot)
+            continue
+        for commune in lot:
+            if commune["slug"] in resultats:
+                sujets_par_commune[commune["slug"]] = resultats[commune["slug"]]
+            else:
+                # Section absente de la réponse : on retombe sur l'analyse individuelle.
+                print(f"⚠ {commune['nom']} absente de la réponse groupée, analyse individuelle.")
+                individuelles.append(commune)
+
+    for commune in individuelles:
+        try:
+            with span("commune", commune=commune["slug"], etape="analyse_globale"):
+                sujets, routage = analyser_commune_globalement(
+                    client,
+                    args,
+                    commune["deliberations"],
+                    commune["nom"],
+                    commune["seance"],
+                    commune["precedent"],
+                )
+        except Exception as exc:
+            print(f"⚠ Échec de l'analyse de {commune['nom']} : {exc}")
+            erreurs[commune["slug"]] = str(exc)
+            continue
+        sujets_par_commune[commune["slug"]] = sujets
+        routage_par_commune[commune["slug"]] = routage
+
+    # Le budget de sélection automatique des détails est partagé entre toutes les communes.
+    budget_selection = args.budget_tokens_selection
+    for commune in communes:
+        if commune["slug"] not in sujets_par_commune:
+            continue
+        _, texte_path, json_path, html_path = chemins_par_defaut(commune["slug"])
+        try:
+            with span("commune", commune=commune["slug"], etape="finalisation"):
+                budget_selection -= finaliser_commune(
+                    client,
+                    args,
+                    sujets_par_commune[commune["slug"]],
+                    commune["deliberations"],
+                    commune["seance"],
+                    commune["nom"],
+                    texte_path,
+                    json_path,
+                    html_path,
+                    routage=routage_par_commune.get(commune["slug"]),
+                    precedent=commune["precedent"],
+                    budget_selection=max(0, budget_selection),
+                )
+        except Exception as exc:
+            print(f"⚠ Échec de la finalisation de {commune['nom']} : {exc}")
+            erreurs[commune["slug"]] = str(exc)
+
+    afficher_resume_ordonnanceur()
     print("=" * 80)
-    print("ANALYSE TERMINÉE !")
+    print(f"ANALYSE GROUPÉE TERMINÉE ({len(slugs) - len(erreurs)}/{len(slugs)} commune(s)) !")
     print("=" * 80)
-    print(f"\nConsultez :\n  - {texte_path}\n  - {json_path}\n  - {html_path if not args.skip_html else '(HTML non généré)'}\n")
+    if erreurs:
+        raise EchecsAnalyseGroupee(erreurs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,374 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+BACKENDS_MODELE = ("openai", "enregistrement", "rejeu", "factice")
+DOSSIER_REJEU_PAR_DEFAUT = ".cache_modele"
+HOTE_FACTICE = "127.0.0.1"
+PORT_FACTICE_PAR_DEFAUT = 8765
+MOTIF_POINT_PROMPT = re.compile(r"^(\d+)\.\s+(.+)$")
+MOTIF_SECTION_COMMUNE = re.compile(r"^=== COMMUNE id=(\S+) ===$", re.MULTILINE)
+# Approximation du découpage en tokens pour du texte français.
+CARACTERES_PAR_TOKEN = 3.5
+# Imitation du cache de préfixe OpenAI : à partir de 1024 tokens, par blocs de 128.
+TOKENS_MIN_CACHE_PREFIXE = 1024
+TOKENS_BLOC_CACHE_PREFIXE = 128
+
+
+def cle_requete(parametres: Dict[str, Any]) -> str:
+    """Calcule une clé stable pour une requête chat.completions."""
+    pertinent = {
+        "model": parametres.get("model"),
+        "messages": parametres.get("messages"),
+        "response_format": parametres.get("response_format"),
+    }
+    brut = json.dumps(pertinent, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(brut.encode("utf-8")).hexdigest()
+
+
+class _CompletionsRejeu:
+    def __init__(self, client: "ClientRejeu") -> None:
+        self._client = client
+
+    def create(self, **parametres: Any) -> Any:
+        return self._client.creer_completion(parametres)
+
+
+class _ChatRejeu:
+    def __init__(self, client: "ClientRejeu") -> None:
+        self.completions = _CompletionsRejeu(client)
+
+
+class ClientRejeu:
+    """
+    Client compatible avec `client.chat.completions.create` qui enregistre
+    les réponses réelles sur disque puis les rejoue sans réseau.
+
+    En mode "enregistrement", une réponse déjà en cache est servie telle
+    quelle ; sinon le client réel est appelé et sa réponse est stockée.
+    En mode "rejeu", une réponse absente du cache est une erreur.
+    """
+
+    def __init__(self, dossier: str, mode: str, client_reel: Optional["OpenAI"] = None) -> None:
+        if mode not in {"enregistrement", "rejeu"}:
+            raise ValueError(f"Mode de rejeu inconnu : {mode}")
+        if mode == "enregistrement" and client_reel is None:
+            raise ValueError("Le mode enregistrement nécessite un client OpenAI réel.")
+        self.dossier = Path(dossier)
+        self.mode = mode
+        self.client_reel = client_reel
+        self.chat = _ChatRejeu(self)
+        self.succes_cache = 0
+        self.echecs_cache = 0
+
+    def _chemin(self, cle: str) -> Path:
+        return self.dossier / cle[:2] / f"{cle}.json"
+
+    def creer_completion(self, parametres: Dict[str, Any]) -> Any:
+        from openai.types.chat import ChatCompletion
+
+        cle = cle_requete(parametres)
+        chemin = self._chemin(cle)
+        if chemin.exists():
+            self.succes_cache += 1
+            donnees = json.loads(chemin.read_text(encoding="utf-8"))
+            return ChatCompletion.model_validate(donnees)
+
+        self.echecs_cache += 1
+        if self.mode == "rejeu":
+            raise RuntimeError(
+                f"Réponse absente du cache de rejeu ({chemin}). "
+                "Relancez une fois avec --backend enregistrement."
+            )
+
+        reponse = self.client_reel.chat.completions.create(**parametres)
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        chemin.write_text(
+            json.dumps(reponse.model_dump(mode="json"), ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        return reponse
+
+
+def construire_client(
+    backend: str = "openai",
+    dossier_rejeu: str = DOSSIER_REJEU_PAR_DEFAUT,
+    url_factice: Optional[str] = None,
+) -> Any:
+    """
+    Construit le client de modèle correspondant au backend demandé.
+
+    Les réessais intégrés au SDK sont désactivés : ils sont gérés par
+    l'ordonnanceur, qui voit aussi les en-têtes de limites de débit.
+    """
+    if backend not in BACKENDS_MODELE:
+        raise RuntimeError(f"Backend de modèle inconnu : {backend}")
+    from openai import OpenAI, OpenAIError
+
+    try:
+        if backend == "openai":
+            return OpenAI(max_retries=0)
+        if backend == "factice":
+            base_url = url_factice or f"http://{HOTE_FACTICE}:{PORT_FACTICE_PAR_DEFAUT}/v1"
+            return OpenAI(base_url=base_url, api_key="factice", max_retries=0)
+        if backend == "rejeu":
+            return ClientRejeu(dossier_rejeu, "rejeu")
+        return ClientRejeu(dossier_rejeu, "enregistrement", client_reel=OpenAI(max_retries=0))
+    except OpenAIError as exc:
+        raise RuntimeError(f"Erreur d'initialisation OpenAI : {exc}") from exc
+
+
+# ===== SERVEUR FACTICE COMPATIBLE OPENAI =====
+def _titres_depuis_prompt(prompt: str) -> List[str]:
+    titres = []
+    for ligne in prompt.splitlines():
+        correspondance = MOTIF_POINT_PROMPT.match(ligne.strip())
+        if correspondance:
+            titres.append(correspondance.group(2).strip())
+    return titres
+
+
+def _contenu_factice(messages: List[Dict[str, Any]], format_json: bool) -> str:
+    prompt = ""
+    for message in messages:
+        if message.get("role") == "user":
+            prompt = str(message.get("content") or "")
+    if not format_json:
+        sections = [
+            "1. RÉSUMÉ EN 2 PHRASES",
+            "2. ENJEUX POUR LES CITOYENS",
+            "3. MONTANTS BUDGÉTAIRES",
+            "4. CONTROVERSES POTENTIELLES",
+            "5. QUESTIONS À POSER",
+            "6. CONTEXTE COMPLÉMENTAIRE",
+        ]
+        return "\n\n".join(f"{section}\nTexte factice généré localement." for section in sections)
+
+    def _points(texte: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "titre": titre[:120],
+                "description": "Description factice générée par le serveur local de test.",
+            }
+            for titre in _titres_depuis_prompt(texte)
+        ]
+
+    sections = MOTIF_SECTION_COMMUNE.split(prompt)
+    if len(sections) > 1:
+        # sections = [préambule, id1, texte1, id2, texte2, ...]
+        communes = [
+            {"id": identifiant, "points": _points(texte)}
+            for identifiant, texte in zip(sections[1::2], sections[2::2])
+        ]
+        return json.dumps({"communes": communes}, ensure_ascii=False)
+    return json.dumps({"points": _points(prompt)}, ensure_ascii=False)
+
+
+class ServeurModeleFactice:
+    """
+    Serveur HTTP local imitant `/v1/chat/completions` avec une latence et un
+    taux d'erreur configurables, pour mesurer l'analyse sans réseau.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latence: float = 0.5,
+        gigue: float = 0.2,
+        taux_erreur: float = 0.0,
+        graine: Optional[int] = None,
+    ) -> None:
+        self.latence = latence
+        self.gigue = gigue
+        self.taux_erreur = taux_erreur
+        self._aleatoire = random.Random(graine)
+        self._verrou = threading.Lock()
+        self.requetes = 0
+        self.erreurs_injectees = 0
+        self._prefixes_vus: set = set()
+        # http.server n'est importé que pour les benchmarks et tests hors ligne.
+        from http.server import ThreadingHTTPServer
+
+        self._serveur = ThreadingHTTPServer((HOTE_FACTICE, port), self._construire_handler())
+        self._serveur.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        hote, port = self._serveur.server_address[:2]
+        return f"http://{hote}:{port}/v1"
+
+    def _tirer(self) -> Tuple[float, Optional[int]]:
+        """Tire la latence de l'appel et, éventuellement, le statut d'erreur à injecter."""
+        with self._verrou:
+            self.requetes += 1
+            delai = max(0.0, self.latence + self._aleatoire.uniform(-self.gigue, self.gigue))
+            statut_erreur = None
+            if self._aleatoire.random() < self.taux_erreur:
+                self.erreurs_injectees += 1
+                statut_erreur = self._aleatoire.choice([429, 500, 503])
+        return delai, statut_erreur
+
+    def _tokens_caches(self, texte: str) -> int:
+        """Simule le cache de préfixe : longueur du plus long préfixe déjà vu, en tokens."""
+        taille_bloc = int(TOKENS_BLOC_CACHE_PREFIXE * CARACTERES_PAR_TOKEN)
+        blocs = len(texte) // taille_bloc
+        empreintes = []
+        courant = hashlib.sha256()
+        for index in range(blocs):
+            courant.update(texte[index * taille_bloc:(index + 1) * taille_bloc].encode("utf-8"))
+            empreintes.append(courant.copy().hexdigest())
+        with self._verrou:
+            plus_long = 0
+            for index, empreinte in enumerate(empreintes, 1):
+                if empreinte not in self._prefixes_vus:
+                    break
+                plus_long = index
+            self._prefixes_vus.update(empreintes)
+        tokens = plus_long * TOKENS_BLOC_CACHE_PREFIXE
+        return tokens if tokens >= TOKENS_MIN_CACHE_PREFIXE else 0
+
+    def _construire_handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        serveur = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - signature imposée
+                return
+
+            def _repondre(self, statut: int, corps: Dict[str, Any], entetes: Optional[Dict[str, str]] = None) -> None:
+                donnees = json.dumps(corps, ensure_ascii=False).encode("utf-8")
+                self.send_response(statut)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(donnees)))
+                for nom, valeur in (entetes or {}).items():
+                    self.send_header(nom, valeur)
+                self.end_headers()
+                self.wfile.write(donnees)
+
+            def do_POST(self) -> None:  # noqa: N802 - API http.server
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._repondre(404, {"error": {"message": "Route inconnue", "type": "not_found"}})
+                    return
+                longueur = int(self.headers.get("Content-Length") or 0)
+                try:
+                    requete = json.loads(self.rfile.read(longueur) or b"{}")
+                except json.JSONDecodeError:
+                    self._repondre(400, {"error": {"message": "JSON invalide", "type": "invalid_request_error"}})
+                    return
+
+                delai, statut_erreur = serveur._tirer()
+                time.sleep(delai)
+                if statut_erreur is not None:
+                    self._repondre(
+                        statut_erreur,
+                        {"error": {"message": "Erreur injectée par le serveur factice", "type": "server_error"}},
+                        {"retry-after-ms": "200"},
+                    )
+                    return
+
+                messages = requete.get("messages") or []
+                format_json = (requete.get("response_format") or {}).get("type") == "json_object"
+                contenu = _contenu_factice(messages, format_json)
+                texte_prompt = "".join(str(message.get("content") or "") for message in messages)
+                tokens_prompt = int(len(texte_prompt) / CARACTERES_PAR_TOKEN)
+                tokens_caches = serveur._tokens_caches(texte_prompt)
+                tokens_reponse = int(len(contenu) / CARACTERES_PAR_TOKEN)
+                entetes_limites = {
+                    "x-ratelimit-limit-requests": "10000",
+                    "x-ratelimit-remaining-requests": "9999",
+                    "x-ratelimit-reset-requests": "6ms",
+                    "x-ratelimit-limit-tokens": "10000000",
+                    "x-ratelimit-remaining-tokens": str(10000000 - tokens_prompt),
+                    "x-ratelimit-reset-tokens": "0s",
+                }
+                self._repondre(
+                    200,
+                    {
+                        "id": f"chatcmpl-factice-{serveur.requetes}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": requete.get("model") or "factice",
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": contenu},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": tokens_prompt,
+                            "completion_tokens": tokens_reponse,
+                            "total_tokens": tokens_prompt + tokens_reponse,
+                            "prompt_tokens_details": {"cached_tokens": tokens_caches},
+                        },
+                    },
+                    entetes_limites,
+                )
+
+        return _Handler
+
+    def demarrer(self) -> "ServeurModeleFactice":
+        self._thread = threading.Thread(target=self._serveur.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def servir(self) -> None:
+        """Sert les requêtes dans le thread courant jusqu'à interruption."""
+        try:
+            self._serveur.serve_forever()
+        finally:
+            self._serveur.server_close()
+
+    def arreter(self) -> None:
+        self._serveur.shutdown()
+        self._serveur.server_close()
+
+    def __enter__(self) -> "ServeurModeleFactice":
+        return self.demarrer()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.arreter()
+
+
+def parser_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API OpenAI pour les tests hors ligne.")
+    parser.add_argument("--port", type=int, default=PORT_FACTICE_PAR_DEFAUT, help="Port d'écoute.")
+    parser.add_argument("--latence", type=float, default=0.5, help="Latence moyenne par appel (secondes).")
+    parser.add_argument("--gigue", type=float, default=0.2, help="Variation aléatoire de la latence (secondes).")
+    parser.add_argument("--taux-erreur", type=float, default=0.0, help="Fraction d'appels en erreur 429/5xx.")
+    parser.add_argument("--graine", type=int, default=None, help="Graine aléatoire pour des tirages reproductibles.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parser_arguments()
+    serveur = ServeurModeleFactice(
+        port=args.port,
+        latence=args.latence,
+        gigue=args.gigue,
+        taux_erreur=args.taux_erreur,
+        graine=args.graine,
+    )
+    print(f"Serveur factice à l'écoute sur {serveur.url} (Ctrl+C pour arrêter)")
+    try:
+        serveur.servir()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{serveur.requetes} requête(s) servie(s), {serveur.erreurs_injectees} erreur(s) injectée(s).")
+
+
+if __name__ == "__main__":
+    main()
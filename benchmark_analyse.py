@@ -0,0 +1,203 @@
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from analyser_sujets import (
+    MODELE_PAR_DEFAUT,
+    _nom_commune_affichage,
+    analyser_globalement,
+    charger_deliberations,
+    construire_client_openai,
+)
+from backend_modele import BACKENDS_MODELE, DOSSIER_REJEU_PAR_DEFAUT, ServeurModeleFactice
+from ordonnanceur_modele import configurer_ordonnanceur
+
+
+RACINE = Path(__file__).resolve().parent
+
+
+def communes_disponibles() -> List[str]:
+    """Liste les communes pour lesquelles un fichier de délibérations existe."""
+    communes = []
+    for chemin in sorted(RACINE.glob("deliberations_*.json")):
+        communes.append(chemin.stem[len("deliberations_"):])
+    return communes
+
+
+def _percentile(valeurs: List[float], rang: float) -> float:
+    if not valeurs:
+        return 0.0
+    triees = sorted(valeurs)
+    index = min(len(triees) - 1, max(0, round(rang * (len(triees) - 1))))
+    return triees[index]
+
+
+def _analyser_commune(client: Any, commune: str, modele: str) -> Dict[str, Any]:
+    debut = time.perf_counter()
+    deliberations, seance = charger_deliberations(str(RACINE / f"deliberations_{commune}.json"))
+    try:
+        sujets = analyser_globalement(
+            client,
+            deliberations,
+            modele=modele,
+            commune_nom=_nom_commune_affichage(commune),
+            seance=seance,
+        )
+        erreur = None
+    except RuntimeError as exc:
+        sujets = []
+        erreur = str(exc)
+    return {
+        "commune": commune,
+        "points_entree": len(deliberations),
+        "points_sortie": len(sujets),
+        "duree": time.perf_counter() - debut,
+        "erreur": erreur,
+    }
+
+
+def executer_benchmark(
+    client: Any,
+    communes: List[str],
+    modele: str,
+    concurrence: int,
+) -> Dict[str, Any]:
+    """Analyse les communes en parallèle et mesure débit et latences."""
+    resultats: List[Dict[str, Any]] = []
+    debut = time.perf_counter()
+    # Les impressions de l'analyse sont masquées pour ne garder que le rapport.
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=max(1, concurrence)) as executeur:
+            futures = [executeur.submit(_analyser_commune, client, commune, modele) for commune in communes]
+            for future in as_completed(futures):
+                resultats.append(future.result())
+    duree_totale = time.perf_counter() - debut
+
+    durees = [resultat["duree"] for resultat in resultats if not resultat["erreur"]]
+    points = sum(resultat["points_entree"] for resultat in resultats if not resultat["erreur"])
+    return {
+        "communes": len(communes),
+        "concurrence": concurrence,
+        "duree_totale_s": round(duree_totale, 3),
+        "communes_par_s": round(len(resultats) / duree_totale, 3) if duree_totale else 0.0,
+        "points_par_s": round(points / duree_totale, 3) if duree_totale else 0.0,
+        "latence_p50_s": round(_percentile(durees, 0.5), 3),
+        "latence_p95_s": round(_percentile(durees, 0.95), 3),
+        "latence_moyenne_s": round(statistics.mean(durees), 3) if durees else 0.0,
+        "echecs": [
+            {"commune": resultat["commune"], "erreur": resultat["erreur"]}
+            for resultat in resultats
+            if resultat["erreur"]
+        ],
+    }
+
+
+def afficher_rapport(rapport: Dict[str, Any]) -> None:
+    print("=" * 80)
+    print("BENCHMARK DE L'ANALYSE")
+    print("=" * 80)
+    print(f"Backend            : {rapport['backend']}")
+    print(f"Communes           : {rapport['communes']} (concurrence {rapport['concurrence']})")
+    print(f"Durée totale       : {rapport['duree_totale_s']} s")
+    print(f"Débit              : {rapport['communes_par_s']} commune(s)/s, {rapport['points_par_s']} point(s)/s")
+    print(
+        f"Latence par commune: p50 {rapport['latence_p50_s']} s, "
+        f"p95 {rapport['latence_p95_s']} s, moyenne {rapport['latence_moyenne_s']} s"
+    )
+    serveur = rapport.get("serveur_factice")
+    if serveur:
+        print(
+            f"Serveur factice    : {serveur['requetes']} requête(s), "
+            f"{serveur['erreurs_injectees']} erreur(s) injectée(s)"
+        )
+    ordonnanceur = rapport.get("ordonnanceur")
+    if ordonnanceur:
+        print(
+            f"Ordonnanceur       : {int(ordonnanceur['reessais'])} réessai(s), "
+            f"attente en file {ordonnanceur['attente_file_s']:.2f} s, "
+            f"latence modèle {ordonnanceur['latence_modele_s']:.2f} s, "
+            f"cached_tokens {int(ordonnanceur['tokens_entree_caches'])}/{int(ordonnanceur['tokens_entree'])}"
+        )
+    if rapport["echecs"]:
+        print(f"Échecs             : {len(rapport['echecs'])}")
+        for echec in rapport["echecs"]:
+            print(f"  - {echec['commune']}: {echec['erreur']}")
+    print("=" * 80)
+
+
+def parser_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mesure le débit de l'analyse sans appel réseau au modèle.")
+    parser.add_argument(
+        "--communes",
+        nargs="*",
+        default=None,
+        help="Communes à analyser (par défaut : toutes celles ayant un fichier de délibérations).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=[backend for backend in BACKENDS_MODELE if backend != "openai"],
+        default="factice",
+        help="factice (serveur local démarré automatiquement), rejeu ou enregistrement.",
+    )
+    parser.add_argument("--dossier-rejeu", default=DOSSIER_REJEU_PAR_DEFAUT, help="Dossier du cache de réponses.")
+    parser.add_argument("--modele", default=MODELE_PAR_DEFAUT, help="Identifiant de modèle transmis au backend.")
+    parser.add_argument("--concurrence", type=int, default=4, help="Nombre d'analyses simultanées.")
+    parser.add_argument("--appels-paralleles", type=int, default=4, help="Appels simultanés autorisés par l'ordonnanceur.")
+    parser.add_argument("--latence", type=float, default=0.5, help="Latence moyenne du serveur factice (s).")
+    parser.add_argument("--gigue", type=float, default=0.2, help="Variation de latence du serveur factice (s).")
+    parser.add_argument("--taux-erreur", type=float, default=0.0, help="Fraction d'erreurs 429/5xx injectées.")
+    parser.add_argument("--graine", type=int, default=1, help="Graine aléatoire du serveur factice.")
+    parser.add_argument("--sortie", default=None, help="Fichier JSON où écrire le rapport.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parser_arguments()
+    communes = [commune.strip().lower() for commune in (args.communes or communes_disponibles()) if commune.strip()]
+    if not communes:
+        print("Aucune commune à analyser.")
+        return
+
+    serveur: Optional[ServeurModeleFactice] = None
+    if args.backend == "factice":
+        serveur = ServeurModeleFactice(
+            latence=args.latence,
+            gigue=args.gigue,
+            taux_erreur=args.taux_erreur,
+            graine=args.graine,
+        ).demarrer()
+
+    ordonnanceur = configurer_ordonnanceur(appels_paralleles=args.appels_paralleles, delai_base=0.2)
+    try:
+        client = construire_client_openai(
+            args.backend,
+            dossier_rejeu=args.dossier_rejeu,
+            url_factice=serveur.url if serveur else None,
+        )
+        rapport = executer_benchmark(client, communes, args.modele, args.concurrence)
+    finally:
+        if serveur:
+            serveur.arreter()
+
+    rapport["backend"] = args.backend
+    rapport["ordonnanceur"] = ordonnanceur.resume()
+    if serveur:
+        rapport["serveur_factice"] = {
+            "requetes": serveur.requetes,
+            "erreurs_injectees": serveur.erreurs_injectees,
+        }
+
+    afficher_rapport(rapport)
+    if args.sortie:
+        Path(args.sortie).write_text(json.dumps(rapport, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"✓ Rapport sauvegardé dans {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+RACINE = Path(__file__).resolve().parent
+DEPENDANCES_LOURDES = ("openai", "requests", "bs4", "pypdf")
+
+# Scénario : script, arguments, dépendances qui ne doivent pas être importées,
+# budget de démarrage en millisecondes au-delà d'un interpréteur vide.
+SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "nom": "analyser --help",
+        "script": "analyser_sujets.py",
+        "arguments": ["--help"],
+        "interdits": DEPENDANCES_LOURDES,
+        "budget_ms": 150,
+    },
+    {
+        "nom": "analyser --merge-html",
+        "script": "analyser_sujets.py",
+        "arguments": [
+            "--merge-html",
+            "--communes",
+            "commune-absente",
+            "--html",
+            "{temporaire}/compilation.html",
+            "--journal",
+            "",
+        ],
+        "interdits": DEPENDANCES_LOURDES,
+        "budget_ms": 150,
+    },
+    {
+        "nom": "extraire --help",
+        "script": "extraire_deliberations.py",
+        "arguments": ["--help"],
+        "interdits": DEPENDANCES_LOURDES,
+        "budget_ms": 150,
+    },
+    {
+        "nom": "pipeline --help",
+        "script": "pipeline_journalistique.py",
+        "arguments": ["--help"],
+        "interdits": DEPENDANCES_LOURDES,
+        "budget_ms": 100,
+    },
+    {
+        "nom": "faits_deliberations --help",
+        "script": "faits_deliberations.py",
+        "arguments": ["--help"],
+        "interdits": DEPENDANCES_LOURDES,
+        "budget_ms": 100,
+    },
+]
+
+# Exécute le script comme `python script.py ...`, puis écrit sur stderr les
+# dépendances lourdes chargées, même si le script se termine par SystemExit.
+_LANCEUR = """
+import json, runpy, sys
+script, interdits = sys.argv[1], json.loads(sys.argv[2])
+sys.argv = [script, *sys.argv[3:]]
+sys.path.insert(0, ".")
+try:
+    runpy.run_path(script, run_name="__main__")
+except SystemExit:
+    pass
+finally:
+    sys.stderr.write("\\nMODULES_CHARGES " + json.dumps([m for m in interdits if m in sys.modules]) + "\\n")
+"""
+
+
+def _executer(commande: List[str]) -> tuple:
+    debut = time.perf_counter()
+    resultat = subprocess.run(commande, cwd=RACINE, capture_output=True, text=True, check=False)
+    return time.perf_counter() - debut, resultat
+
+
+def mesurer_interpreteur_vide(repetitions: int) -> float:
+    """Durée médiane de `python -c pass`, retranchée des mesures pour les rendre comparables d'une machine à l'autre."""
+    return statistics.median(_executer([sys.executable, "-c", "pass"])[0] for _ in range(repetitions))
+
+
+def mesurer_scenario(scenario: Dict[str, Any], repetitions: int, temporaire: str) -> Dict[str, Any]:
+    """Durées de démarrage d'un scénario et dépendances lourdes importées à tort."""
+    arguments = [argument.replace("{temporaire}", temporaire) for argument in scenario["arguments"]]
+    commande = [sys.executable, "-c", _LANCEUR, scenario["script"], json.dumps(list(scenario["interdits"])), *arguments]
+    durees = []
+    charges: List[str] = []
+    for _ in range(repetitions):
+        duree, resultat = _executer(commande)
+        durees.append(duree)
+        for ligne in resultat.stderr.splitlines():
+            if ligne.startswith("MODULES_CHARGES "):
+                charges = json.loads(ligne[len("MODULES_CHARGES "):])
+    return {"nom": scenario["nom"], "durees": durees, "modules_charges": charges, "budget_ms": scenario["budget_ms"]}
+
+
+def executer_benchmark(repetitions: int, marge: float, scenarios: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Mesure chaque scénario et confronte le surcoût médian à son budget (multiplié par `marge`)."""
+    base = mesurer_interpreteur_vide(repetitions)
+    resultats = []
+    with tempfile.TemporaryDirectory() as temporaire:
+        for scenario in SCENARIOS:
+            if scenarios and scenario["nom"] not in scenarios:
+                continue
+            mesure = mesurer_scenario(scenario, repetitions, temporaire)
+            surcout_ms = max(0.0, statistics.median(mesure["durees"]) - base) * 1000
+            budget_ms = mesure["budget_ms"] * marge
+            resultats.append(
+                {
+                    "nom": mesure["nom"],
+                    "mediane_ms": round(statistics.median(mesure["durees"]) * 1000, 1),
+                    "surcout_ms": round(surcout_ms, 1),
+                    "budget_ms": round(budget_ms, 1),
+                    "modules_charges": mesure["modules_charges"],
+                    "depassement": surcout_ms > budget_ms or bool(mesure["modules_charges"]),
+                }
+            )
+    return {
+        "interpreteur_vide_ms": round(base * 1000, 1),
+        "repetitions": repetitions,
+        "marge": marge,
+        "scenarios": resultats,
+        "depassements": [resultat["nom"] for resultat in resultats if resultat["depassement"]],
+    }
+
+
+def afficher_rapport(rapport: Dict[str, Any]) -> None:
+    print("=" * 80)
+    print("BENCHMARK DU DÉMARRAGE")
+    print("=" * 80)
+    print(f"Interpréteur vide  : {rapport['interpreteur_vide_ms']} ms (médiane sur {rapport['repetitions']})")
+    for resultat in rapport["scenarios"]:
+        symbole = "⚠" if resultat["depassement"] else "✓"
+        ligne = (
+            f"{symbole} {resultat['nom']:<28} {resultat['mediane_ms']:>7} ms "
+            f"(+{resultat['surcout_ms']} ms, budget +{resultat['budget_ms']} ms)"
+        )
+        if resultat["modules_charges"]:
+            ligne += f" ; importés à tort : {', '.join(resultat['modules_charges'])}"
+        print(ligne)
+    if rapport["depassements"]:
+        print(f"Budget dépassé     : {', '.join(rapport['depassements'])}")
+    print("=" * 80)
+
+
+def parser_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Mesure le temps de démarrage de chaque point d'entrée et vérifie son budget."
+    )
+    parser.add_argument("--repetitions", type=int, default=5, help="Lancements par scénario (médiane retenue).")
+    parser.add_argument(
+        "--marge",
+        type=float,
+        default=1.0,
+        help="Multiplicateur des budgets, pour une machine d'intégration plus lente.",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="*",
+        default=None,
+        help=f"Scénarios à mesurer (par défaut tous : {', '.join(s['nom'] for s in SCENARIOS)}).",
+    )
+    parser.add_argument("--sortie", default=None, help="Fichier JSON où écrire le rapport.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parser_arguments()
+    rapport = executer_benchmark(max(1, args.repetitions), args.marge, args.scenarios)
+    afficher_rapport(rapport)
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as handle:
+            json.dump(rapport, handle, ensure_ascii=False, indent=2)
+        print(f"✓ Rapport écrit dans {args.sortie}")
+    if rapport["depassements"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+import argparse
+import contextlib
+import hashlib
+import html
+import io
+import json
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import extraire_deliberations as extraction
+
+RACINE = Path(__file__).resolve().parent
+DOSSIER_FIXTURES = "fixtures_extraction"
+FICHIER_MANIFESTE = "manifeste.json"
+COMMUNES_PAR_DEFAUT = ["wavre", "andenne", "arlon", "anhee", "beauraing"]
+# Communes synthétiques dont la liste des points n'est servie que par @@faceted_query.
+COMMUNES_FACETTES = {"andenne"}
+CARTES_PAR_PAGE = 20
+LIGNES_PAR_PAGE_PDF = 66
+SCENARIOS = ["detection", "liens", "contenu", "pdf", "decoupage_pdf"]
+
+DECOUPEURS_PDF: Dict[str, Callable[[List[str], str], List[dict]]] = {
+    "anhee": extraction._anhee_decouper_points,
+    "beauraing": extraction._beauraing_decouper_points,
+}
+
+
+# ===== FIXTURES =====
+class Fixtures:
+    """
+    Réponses enregistrées d'un ou plusieurs sites : `manifeste.json` associe
+    chaque URL demandée à son fichier, son statut et son type de contenu.
+    """
+
+    def __init__(self, dossier: Path):
+        self.dossier = Path(dossier)
+        self.communes: List[Dict[str, str]] = []
+        self.reponses: Dict[str, Dict[str, Any]] = {}
+        self.origine = ""
+        self._verrou = threading.Lock()
+
+    @classmethod
+    def charger(cls, dossier: Path) -> "Fixtures":
+        fixtures = cls(dossier)
+        with open(fixtures.dossier / FICHIER_MANIFESTE, "r", encoding="utf-8") as handle:
+            manifeste = json.load(handle)
+        fixtures.communes = manifeste["communes"]
+        fixtures.reponses = manifeste["reponses"]
+        fixtures.origine = manifeste.get("origine", "")
+        return fixtures
+
+    def ajouter(self, url: str, contenu: bytes, statut: int = 200, type_contenu: str = "text/html; charset=utf-8",
+                entetes: Optional[Dict[str, str]] = None) -> None:
+        hote = urlparse(url).netloc
+        extension = ".pdf" if "pdf" in type_contenu else ".html"
+        fichier = f"{hote}/{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}{extension}"
+        chemin = self.dossier / fichier
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        chemin.write_bytes(contenu)
+        with self._verrou:
+            self.reponses[url] = {"fichier": fichier, "statut": statut, "type": type_contenu, "entetes": entetes or {}}
+
+    def ecrire(self, origine: str) -> None:
+        self.origine = origine
+        manifeste = {"origine": origine, "communes": self.communes, "reponses": self.reponses}
+        with open(self.dossier / FICHIER_MANIFESTE, "w", encoding="utf-8") as handle:
+            json.dump(manifeste, handle, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def empreinte(self) -> str:
+        """Empreinte du jeu de fixtures : deux rapports ne sont comparables que si elle est identique."""
+        condensat = hashlib.sha256()
+        for url in sorted(self.reponses):
+            condensat.update(url.encode("utf-8"))
+            condensat.update((self.dossier / self.reponses[url]["fichier"]).read_bytes())
+        return condensat.hexdigest()[:16]
+
+    def hotes(self) -> List[str]:
+        return sorted({urlparse(url).netloc for url in self.reponses})
+
+
+def _url_preparee(url: str) -> str:
+    """URL telle que requests l'envoie (même encodage que les clés enregistrées)."""
+    import requests
+
+    return requests.Request("GET", url).prepare().url
+
+
+def _pdf_texte(pages: List[List[str]]) -> bytes:
+    """PDF minimal (Helvetica, une ligne de texte par ligne fournie), lisible par pypdf."""
+    objets = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    enfants = []
+    for lignes in pages:
+        flux = [b"BT /F1 9 Tf 11 TL 40 800 Td"]
+        for ligne in lignes:
+            texte = ligne.encode("cp1252", "replace")
+            texte = texte.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+            flux.append(b"(" + texte + b") Tj T*")
+        flux.append(b"ET")
+        contenu = b"\n".join(flux)
+        objets.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(contenu), contenu))
+        objets.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objets))
+        )
+        enfants.append(len(objets))
+    objets[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % numero for numero in enfants),
+        len(enfants),
+    )
+
+    sortie = io.BytesIO()
+    sortie.write(b"%PDF-1.4\n")
+    positions = []
+    for numero, corps in enumerate(objets, start=1):
+        positions.append(sortie.tell())
+        sortie.write(b"%d 0 obj\n%s\nendobj\n" % (numero, corps))
+    debut_xref = sortie.tell()
+    sortie.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objets) + 1))
+    for position in positions:
+        sortie.write(b"%010d 00000 n \n" % position)
+    sortie.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objets) + 1, debut_xref))
+    return sortie.getvalue()
+
+
+def _paginer(lignes: List[str]) -> List[List[str]]:
+    return [lignes[i:i + LIGNES_PAR_PAGE_PDF] for i in range(0, len(lignes), LIGNES_PAR_PAGE_PDF)] or [[]]
+
+
+def _lignes_pdf(texte: str) -> List[str]:
+    lignes = []
+    for ligne in texte.splitlines():
+        lignes.extend(textwrap.wrap(ligne, 110) or [""])
+    return lignes
+
+
+def _page_html(titre: str, corps: str) -> bytes:
+    menu = "".join(f'<li><a href="/rubrique-{numero}">Rubrique {numero}</a></li>' for numero in range(40))
+    return (
+        f'<!DOCTYPE html><html lang="fr"><head><meta charset="utf-8"><title>{html.escape(titre)}</title></head>'
+        f'<body><header><nav><ul>{menu}</ul></nav></header><main>{corps}</main>'
+        f"<footer><p>Plateforme de publication des délibérations</p></footer></body></html>"
+    ).encode("utf-8")
+
+
+def _carte(point: Dict[str, Any]) -> str:
+    return (
+        f'<div class="item-card"><a class="filled-link" href="{html.escape(point["url"])}">'
+        f'{html.escape(point["titre"])}</a><span class="item-date">Projet de décision</span></div>'
+    )
+
+
+def _generer_deliberations_be(fixtures: Fixtures, commune: str, donnees: Dict[str, Any]) -> str:
+    url_base = extraction.SOURCE_PAR_DEFAUT.construire_url(commune, extraction.BASE_ROOT)
+    seance = donnees.get("seance") or {}
+    points = donnees.get("deliberations") or []
+    seance_id = seance.get("id") or "seance"
+    selecteur = (
+        '<select id="seance" name="seance">'
+        f'<option value="{html.escape(seance_id)}" selected="selected" title="{html.escape(seance.get("nom") or "")}">'
+        f'{html.escape(seance.get("nom") or "")} ({len(points)} points)</option>'
+        '<option value="seance-precedente">Séance précédente (12 points)</option></select>'
+    )
+    facettes = commune in COMMUNES_FACETTES
+    paquets = [points[i:i + CARTES_PAR_PAGE] for i in range(0, len(points), CARTES_PAR_PAGE)]
+
+    fixtures.ajouter(url_base, _page_html(commune, selecteur + "".join(_carte(p) for p in (paquets or [[]])[0])))
+    for numero, paquet in enumerate(paquets):
+        cartes = "" if facettes else "".join(_carte(point) for point in paquet)
+        suffixe = "" if numero == 0 else f"&b_start:int={numero * CARTES_PAR_PAGE}"
+        fixtures.ajouter(_url_preparee(f"{url_base}?seance={seance_id}{suffixe}"), _page_html(commune, selecteur + cartes))
+        if facettes:
+            debut = "" if numero == 0 else f"b_start={numero * CARTES_PAR_PAGE}&"
+            fragment = "".join(_carte(point) for point in paquet).encode("utf-8")
+            fixtures.ajouter(_url_preparee(f"{url_base}/@@faceted_query?{debut}seance={seance_id}"), fragment)
+
+    for point in points:
+        corps = (
+            f'<h1>{html.escape(point["titre"])}</h1><article id="content">'
+            + "".join(f"<p>{html.escape(ligne)}</p>" for ligne in (point.get("contenu") or "").split("\n"))
+            + "</article>"
+        )
+        fixtures.ajouter(_url_preparee(point["url"]), _page_html(point["titre"], corps))
+    return url_base
+
+
+def _lignes_anhee(points: List[Dict[str, Any]]) -> List[str]:
+    lignes = ["Projet de délibérations du Conseil communal"]
+    for numero, point in enumerate(points, start=1):
+        lignes.append(f"{numero}. {point['titre']}")
+        contenu = point.get("contenu") or ""
+        if contenu.startswith(point["titre"]):
+            contenu = contenu[len(point["titre"]):]
+        lignes.extend(_lignes_pdf(contenu.strip()))
+    return lignes
+
+
+def _pages_beauraing(points: List[Dict[str, Any]]) -> List[List[str]]:
+    ordre_du_jour = ["Conseil communal", "Ordre du jour", "I. Séance publique"]
+    ordre_du_jour += [f"{numero}. {point['titre']}" for numero, point in enumerate(points, start=1)]
+    ordre_du_jour.append("II. Séance à huis clos")
+    details = ["I. Séance publique"]
+    for numero, point in enumerate(points, start=1):
+        details.append(f"{numero}. {point['titre']}")
+        details.extend(_lignes_pdf(point.get("contenu") or ""))
+    return _paginer(ordre_du_jour) + _paginer(details)
+
+
+def _generer_source_pdf(fixtures: Fixtures, commune: str, donnees: Dict[str, Any]) -> str:
+    url_base = extraction.source_pour_commune(commune).construire_url(commune, extraction.BASE_ROOT)
+    points = donnees.get("deliberations") or []
+    pdf_url = ((donnees.get("seance") or {}).get("pdf") or {}).get("url") or points[0]["url"].split("#", 1)[0]
+    if commune == "beauraing":
+        pages = _pages_beauraing(points)
+    else:
+        pages = _paginer(_lignes_anhee(points))
+    fixtures.ajouter(pdf_url, _pdf_texte(pages), type_contenu="application/pdf")
+
+    liens = (
+        f'<li><a href="{html.escape(pdf_url)}/view">{html.escape(pdf_url.rsplit("/", 1)[-1])}</a></li>'
+        '<li><a href="/ma-commune/vie-politique/conseil-communal">Conseil communal</a></li>'
+    )
+    fixtures.ajouter(url_base, _page_html(commune, f'<ul class="documents">{liens}</ul>'))
+    return url_base
+
+
+def generer_fixtures(dossier: Path, communes: List[str]) -> Fixtures:
+    """
+    Jeu de fixtures synthétique et déterministe, reconstruit à partir des
+    fichiers deliberations_<commune>.json : pages de liste et de détail de
+    deliberations.be, réponses @@faceted_query et PDF d'Anhée/Beauraing.
+    """
+    shutil.rmtree(dossier, ignore_errors=True)
+    fixtures = Fixtures(dossier)
+    for commune in communes:
+        with open(RACINE / f"deliberations_{commune}.json", "r", encoding="utf-8") as handle:
+            donnees = json.load(handle)
+        if commune in DECOUPEURS_PDF:
+            url_base = _generer_source_pdf(fixtures, commune, donnees)
+            source = "pdf"
+        else:
+            url_base = _generer_deliberations_be(fixtures, commune, donnees)
+            source = "deliberations.be"
+        fixtures.communes.append({"commune": commune, "source": source, "url_base": url_base})
+    fixtures.ecrire("synthetique")
+    return fixtures
+
+
+def enregistrer_fixtures(dossier: Path, communes: List[str]) -> Fixtures:
+    """
+    Enregistre les réponses réelles des sites (réseau requis) en déroulant la
+    détection et l'extraction de chaque commune, avec la politesse habituelle.
+    """
+    shutil.rmtree(dossier, ignore_errors=True)
+    fixtures = Fixtures(dossier)
+
+    def memoriser(response, *args, **kwargs):
+        requete = response.request
+        if requete.method == "GET" and "Range" not in requete.headers:
+            entetes = {"Location": response.headers["Location"]} if "Location" in response.headers else {}
+            fixtures.ajouter(
+                requete.url,
+                response.content,
+                response.status_code,
+                response.headers.get("Content-Type", "application/octet-stream"),
+                entetes,
+            )
+        return response
+
+    session = extraction.session_http()
+    session.hooks["response"].append(memoriser)
+    for commune in communes:
+        source = extraction.source_pour_commune(commune)
+        url_base = extraction.construire_url_base(commune)
+        print(f"Enregistrement de {commune} ({url_base})...")
+        seance = source.detecter(url_base)
+        source.extraire(url_base, seance, {})
+        type_source = "pdf" if isinstance(source, extraction.SourcePdf) else "deliberations.be"
+        fixtures.communes.append({"commune": commune, "source": type_source, "url_base": url_base})
+    fixtures.ecrire("enregistrement")
+    return fixtures
+
+
+# ===== SERVEUR DE REJEU =====
+class ServeurFixtures:
+    """
+    Serveur HTTP local qui rejoue les fixtures : `/<hôte>/<chemin>` sert la
+    réponse enregistrée pour `https://<hôte>/<chemin>`, liens réécrits vers
+    le serveur. Une URL inconnue produit une page 404 sans contenu.
+    """
+
+    def __init__(self, fixtures: Fixtures, port: int = 0):
+        from http.server import ThreadingHTTPServer
+
+        self.fixtures = fixtures
+        self._serveur = ThreadingHTTPServer(("127.0.0.1", port), self._construire_handler())
+        self._serveur.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._serveur.server_address[1]}"
+        self.requetes_inconnues: List[str] = []
+        self._thread = threading.Thread(target=self._serveur.serve_forever, daemon=True)
+
+    def url_locale(self, url: str) -> str:
+        morceaux = urlparse(url)
+        return f"{self.url}/{morceaux.netloc}{url[len(morceaux.scheme) + 3 + len(morceaux.netloc):]}"
+
+    def _reecrire(self, contenu: bytes, hote: str) -> bytes:
+        texte = contenu.decode("utf-8", "replace")
+        for autre in self.fixtures.hotes():
+            texte = texte.replace(f"https://{autre}", f"{self.url}/{autre}").replace(f"http://{autre}", f"{self.url}/{autre}")
+        texte = re.sub(r"""((?:href|src|action)=["'])/(?!/)""", rf"\g<1>{self.url}/{hote}/", texte)
+        return texte.encode("utf-8")
+
+    def _construire_handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        serveur = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                hote, _, reste = self.path.lstrip("/").partition("/")
+                reponse = None
+                for schema in ("https", "http"):
+                    reponse = serveur.fixtures.reponses.get(f"{schema}://{hote}/{reste}")
+                    if reponse:
+                        break
+                if reponse is None:
+                    serveur.requetes_inconnues.append(self.path)
+                    corps, statut, type_contenu, entetes = b"<html><body>Not found</body></html>", 404, "text/html", {}
+                else:
+                    corps = (serveur.fixtures.dossier / reponse["fichier"]).read_bytes()
+                    statut, type_contenu, entetes = reponse["statut"], reponse["type"], dict(reponse["entetes"])
+                    if "html" in type_contenu or type_contenu.startswith("text/"):
+                        corps = serveur._reecrire(corps, hote)
+                    if "Location" in entetes:
+                        entetes["Location"] = serveur.url_locale(entetes["Location"])
+                self.send_response(statut)
+                self.send_header("Content-Type", type_contenu)
+                self.send_header("Content-Length", str(len(corps)))
+                for nom, valeur in entetes.items():
+                    self.send_header(nom, valeur)
+                self.end_headers()
+                self.wfile.write(corps)
+
+        return Handler
+
+    def __enter__(self) -> "ServeurFixtures":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._serveur.shutdown()
+        self._serveur.server_close()
+
+
+# ===== SCÉNARIOS (exécutés chacun dans un processus neuf) =====
+def _preparer(scenario: str, communes: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Données d'entrée d'un scénario, obtenues hors mesure (séances, liens, textes des PDF)."""
+    etat: Dict[str, Any] = {"seances": {}, "liens": [], "textes": {}}
+    if scenario in ("liens", "contenu"):
+        for commune in communes:
+            if commune["source"] == "deliberations.be":
+                etat["seances"][commune["commune"]] = extraction.detecter_seance_la_plus_recente(commune["url_base"])[0]
+    if scenario == "contenu":
+        for commune in communes:
+            if commune["source"] == "deliberations.be":
+                etat["liens"] += extraction.extraire_liens_deliberations(etat["seances"][commune["commune"]], commune["url_base"])
+    if scenario == "decoupage_pdf":
+        for commune in communes:
+            if commune["source"] == "pdf":
+                pdf_url = extraction.source_pour_commune(commune["commune"]).detecter(commune["url_base"])[3]
+                etat["textes"][commune["commune"]] = (pdf_url, extraction._telecharger_textes_pdf(pdf_url))
+    return etat
+
+
+def _derouler(scenario: str, communes: List[Dict[str, str]], etat: Dict[str, Any]) -> int:
+    """Une répétition du scénario ; retourne le nombre de points produits."""
+    points = 0
+    if scenario == "detection":
+        for commune in communes:
+            if commune["source"] == "deliberations.be":
+                extraction.detecter_seance_la_plus_recente(commune["url_base"])
+    elif scenario == "liens":
+        for commune in communes:
+            if commune["source"] == "deliberations.be":
+                seance_id = etat["seances"][commune["commune"]]
+                points += len(extraction.extraire_liens_deliberations(seance_id, commune["url_base"]))
+    elif scenario == "contenu":
+        for lien in etat["liens"]:
+            extraction.extraire_contenu_deliberation(lien)
+            points += 1
+    elif scenario == "pdf":
+        # Cache des textes vidé : chaque répétition télécharge et lit le PDF.
+        shutil.rmtree(extraction.DOSSIER_CACHE_PDF, ignore_errors=True)
+        for commune in communes:
+            if commune["source"] == "pdf":
+                source = extraction.source_pour_commune(commune["commune"])
+                points += len(source.extraire(commune["url_base"], source.detecter(commune["url_base"]), {}))
+    elif scenario == "decoupage_pdf":
+        for commune, (pdf_url, textes) in etat["textes"].items():
+            points += len(DECOUPEURS_PDF[commune](textes, pdf_url))
+    return points
+
+
+def _temps_cpu() -> float:
+    soi = resource.getrusage(resource.RUSAGE_SELF)
+    enfants = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return soi.ru_utime + soi.ru_stime + enfants.ru_utime + enfants.ru_stime
+
+
+def executer_scenario(scenario: str, url_serveur: str, communes: List[Dict[str, str]], repetitions: int) -> Dict[str, Any]:
+    """
+    Déroule un scénario contre le serveur de rejeu (politesse désactivée),
+    après une répétition d'échauffement non mesurée.
+    """
+    extraction.configurer_politesse(url_serveur, 0)
+    pages = [0]
+
+    def compter(response, *args, **kwargs):
+        pages[0] += 1
+        return response
+
+    extraction.session_http().hooks["response"].append(compter)
+    with tempfile.TemporaryDirectory() as temporaire, contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(temporaire)
+        etat = _preparer(scenario, communes)
+        _derouler(scenario, communes, etat)
+        durees, points_repetition = [], 0
+        pages[0] = 0
+        cpu_debut = _temps_cpu()
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            points_repetition = _derouler(scenario, communes, etat)
+            durees.append(time.perf_counter() - debut)
+        cpu = _temps_cpu() - cpu_debut
+        os.chdir(RACINE)
+    return {
+        "durees": durees,
+        "pages": pages[0] / repetitions,
+        "points": points_repetition,
+        "cpu_s": cpu / repetitions,
+        # ru_maxrss est en kilo-octets sous Linux.
+        "memoire_max_mo": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _commit_courant() -> Optional[str]:
+    resultat = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True, text=True)
+    if resultat.returncode != 0:
+        return None
+    return resultat.stdout.strip() or None
+
+
+def executer_benchmark(fixtures: Fixtures, repetitions: int, scenarios: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Rejoue les fixtures et mesure chaque scénario dans un processus neuf (mémoire et CPU isolés)."""
+    contexte = multiprocessing.get_context("spawn")
+    resultats = []
+    with ServeurFixtures(fixtures) as serveur:
+        communes = [dict(commune, url_base=serveur.url_locale(commune["url_base"])) for commune in fixtures.communes]
+        for scenario in scenarios or SCENARIOS:
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexte) as pool:
+                mesure = pool.submit(executer_scenario, scenario, serveur.url, communes, repetitions).result()
+            duree = statistics.median(mesure["durees"])
+            resultats.append(
+                {
+                    "nom": scenario,
+                    "mediane_s": round(duree, 4),
+                    "pages": mesure["pages"],
+                    "points": mesure["points"],
+                    "pages_par_s": round(mesure["pages"] / duree, 1) if duree and mesure["pages"] else None,
+                    "points_par_s": round(mesure["points"] / duree, 1) if duree and mesure["points"] else None,
+                    "cpu_s": round(mesure["cpu_s"], 4),
+                    "memoire_max_mo": round(mesure["memoire_max_mo"], 1),
+                }
+            )
+        inconnues = sorted(set(serveur.requetes_inconnues))
+    return {
+        "commit": _commit_courant(),
+        "python": sys.version.split()[0],
+        "fixtures": {"origine": fixtures.origine, "empreinte": fixtures.empreinte()},
+        "repetitions": repetitions,
+        "scenarios": resultats,
+        "requetes_hors_fixtures": len(inconnues),
+    }
+
+
+def afficher_rapport(rapport: Dict[str, Any], reference: Optional[Dict[str, Any]] = None) -> None:
+    print("=" * 80)
+    print("BENCHMARK DE L'EXTRACTION (FIXTURES REJOUÉES EN LOCAL)")
+    print("=" * 80)
+    print(f"Commit             : {rapport['commit'] or '-'}")
+    print(f"Fixtures           : {rapport['fixtures']['origine']} ({rapport['fixtures']['empreinte']})")
+    print(f"Répétitions        : {rapport['repetitions']} (médiane retenue)")
+    print(f"Requêtes 404       : {rapport['requetes_hors_fixtures']} URL(s) absente(s) des fixtures")
+    print(f"{'scénario':<15} {'médiane':>9} {'pages/s':>9} {'points/s':>9} {'CPU':>8} {'mémoire':>9}")
+    anciens = {resultat["nom"]: resultat for resultat in (reference or {}).get("scenarios", [])}
+    for resultat in rapport["scenarios"]:
+        print(
+            f"{resultat['nom']:<15} {resultat['mediane_s']:>8.3f}s {resultat['pages_par_s'] or '-':>9} "
+            f"{resultat['points_par_s'] or '-':>9} {resultat['cpu_s']:>7.3f}s {resultat['memoire_max_mo']:>6.1f} Mo"
+        )
+        ancien = anciens.get(resultat["nom"])
+        if ancien and ancien["mediane_s"]:
+            ecart = (resultat["mediane_s"] - ancien["mediane_s"]) / ancien["mediane_s"] * 100
+            ecart_cpu = (resultat["cpu_s"] - ancien["cpu_s"]) / ancien["cpu_s"] * 100 if ancien["cpu_s"] else 0.0
+            print(
+                f"{'':<15} vs {reference.get('commit') or 'référence'} : durée {ecart:+.1f} %, CPU {ecart_cpu:+.1f} %, "
+                f"mémoire {resultat['memoire_max_mo'] - ancien['memoire_max_mo']:+.1f} Mo"
+            )
+    print("=" * 80)
+
+
+def parser_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Mesure les performances de l'extraction en rejouant des fixtures depuis un serveur HTTP local."
+    )
+    parser.add_argument("--fixtures", default=DOSSIER_FIXTURES, help="Dossier des fixtures (manifeste.json).")
+    parser.add_argument(
+        "--generer",
+        action="store_true",
+        help="(Re)génère des fixtures synthétiques à partir des fichiers deliberations_<commune>.json.",
+    )
+    parser.add_argument(
+        "--enregistrer",
+        action="store_true",
+        help="(Ré)enregistre les fixtures depuis les sites réels (réseau requis).",
+    )
+    parser.add_argument("--communes", nargs="+", default=COMMUNES_PAR_DEFAUT, help="Communes des fixtures.")
+    parser.add_argument("--repetitions", type=int, default=3, help="Répétitions mesurées par scénario.")
+    parser.add_argument("--scenarios", nargs="*", default=None, choices=SCENARIOS, help="Scénarios à mesurer.")
+    parser.add_argument("--sortie", default=None, help="Fichier JSON où écrire le rapport.")
+    parser.add_argument("--comparer", default=None, help="Rapport JSON d'un autre commit à comparer.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parser_arguments()
+    dossier = Path(args.fixtures)
+    if args.enregistrer:
+        fixtures = enregistrer_fixtures(dossier, args.communes)
+        print(f"✓ {len(fixtures.reponses)} réponse(s) enregistrée(s) dans {dossier}")
+    elif args.generer or not (dossier / FICHIER_MANIFESTE).exists():
+        fixtures = generer_fixtures(dossier, args.communes)
+        print(f"✓ {len(fixtures.reponses)} réponse(s) synthétique(s) générée(s) dans {dossier}")
+    else:
+        fixtures = Fixtures.charger(dossier)
+
+    reference = None
+    if args.comparer:
+        with open(args.comparer, "r", encoding="utf-8") as handle:
+            reference = json.load(handle)
+    rapport = executer_benchmark(fixtures, max(1, args.repetitions), args.scenarios)
+    if reference and reference.get("fixtures", {}).get("empreinte") != rapport["fixtures"]["empreinte"]:
+        print("⚠ Les fixtures diffèrent de celles du rapport de référence : comparaison non significative.")
+    afficher_rapport(rapport, reference)
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as handle:
+            json.dump(rapport, handle, ensure_ascii=False, indent=2)
+        print(f"✓ Rapport écrit dans {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import threading
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+RACINE = Path(__file__).resolve().parent
+HISTORIQUE_SEANCES = RACINE / "historique_seances.json"
+
+# Valeurs retenues tant qu'aucune commune n'a assez d'observations : conseil
+# mensuel, projets publiés une semaine avant la séance, décisions quelques jours après.
+PERIODE_PAR_DEFAUT_J = 28.0
+AVANCE_PROJET_PAR_DEFAUT_J = 7.0
+DELAI_DECISION_PAR_DEFAUT_J = 5.0
+FENETRE_PAR_DEFAUT_J = 3.0
+FENETRE_MIN_J = 2.0
+FENETRE_MAX_J = 7.0
+# Écarts entre séances pris en compte pour la période (les vacances d'été n'en font pas partie).
+ECART_SEANCES_MIN_J = 7
+ECART_SEANCES_MAX_J = 70
+AVANCE_PROJET_MAX_J = 30
+DELAI_DECISION_MAX_J = 60
+# En deçà, la commune emprunte la valeur mesurée sur l'ensemble des communes.
+OBSERVATIONS_MIN = 2
+# Séances futures projetées au plus pour une commune restée longtemps sans publication.
+PROJECTIONS_MAX = 24
+
+_VERROU_HISTORIQUE = threading.Lock()
+_HISTORIQUE: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+
+def _maintenant() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _horodatage(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _lire_horodatage(texte: Optional[str]) -> Optional[datetime]:
+    if not texte:
+        return None
+    try:
+        moment = datetime.fromisoformat(texte.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _jour_seance(date_seance: date) -> datetime:
+    # Midi UTC : une publication de la veille au soir reste « un jour avant ».
+    return datetime.combine(date_seance, time(12), tzinfo=timezone.utc)
+
+
+def categorie_type(type_cle: Optional[str]) -> Optional[str]:
+    """"projet" ou "decision" à partir du type normalisé d'une séance."""
+    if not type_cle:
+        return None
+    return "projet" if "projet" in type_cle else "decision"
+
+
+def _revisions_git(fichier: Path) -> List[Tuple[str, str]]:
+    """Versions enregistrées dans git d'un fichier (révision, date du commit), de la plus récente à la plus ancienne."""
+    try:
+        relatif = fichier.resolve().relative_to(RACINE).as_posix()
+    except ValueError:
+        return []
+    try:
+        sortie = subprocess.run(
+            ["git", "log", "--format=%H %cI", "--", relatif],
+            cwd=RACINE,
+            capture_output=True,
+            text=True,
+            check=False,
+        ).stdout.split()
+    except OSError:
+        return []
+    return [
+        (f"{revision}:{relatif}", _horodatage(_lire_horodatage(date_commit)))
+        for revision, date_commit in zip(sortie[::2], sortie[1::2])
+    ]
+
+
+def _seance_revision(revision: str) -> Optional[Dict[str, Any]]:
+    contenu = subprocess.run(["git", "show", revision], cwd=RACINE, capture_output=True, text=True, check=False).stdout
+    try:
+        donnees = json.loads(contenu)
+    except json.JSONDecodeError:
+        return None
+    return (donnees.get("seance") or {}) if isinstance(donnees, dict) else None
+
+
+def _observation_fichier(commune: str) -> Optional[Dict[str, Any]]:
+    """
+    Séance du fichier de délibérations, vue à la date du premier commit qui la
+    contient. Sans commit, elle est datée de son export et marquée "amorce" :
+    sa date compte pour la période, pas pour l'avance ni le délai.
+    """
+    from pipeline_journalistique import chemins_sortie, decrire_seance
+
+    fichier = chemins_sortie(commune)[0]
+    try:
+        with fichier.open("r", encoding="utf-8") as handle:
+            donnees = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(donnees, dict):
+        return None
+    seance = donnees.get("seance") or {}
+    observation = _observation(seance, donnees.get("exported_at"), decrire_seance)
+    if observation is None:
+        return None
+
+    premier_commit = None
+    for revision, date_commit in _revisions_git(fichier):
+        precedente = _seance_revision(revision)
+        if precedente is None or decrire_seance(precedente.get("id"), precedente.get("nom")) != decrire_seance(
+            seance.get("id"), seance.get("nom")
+        ):
+            break
+        premier_commit = date_commit
+    if premier_commit:
+        observation["vue"] = premier_commit
+    else:
+        observation["amorce"] = True
+    return observation
+
+
+def _observation(seance: Dict[str, Any], vue: Optional[str], decrire_seance: Any) -> Optional[Dict[str, Any]]:
+    date_cle, type_cle = decrire_seance(seance.get("id"), seance.get("nom"))
+    try:
+        date.fromisoformat(date_cle or "")
+    except ValueError:
+        return None
+    if _lire_horodatage(vue) is None:
+        return None
+    return {"date": date_cle, "type": categorie_type(type_cle), "vue": vue}
+
+
+def _ajouter(historique: Dict[str, List[Dict[str, Any]]], commune: str, observation: Dict[str, Any]) -> bool:
+    """Ajoute l'observation ou avance la date de première vue ; True si l'historique change."""
+    observations = historique.setdefault(commune, [])
+    for existante in observations:
+        if existante["date"] == observation["date"] and existante["type"] == observation["type"]:
+            # Une vraie observation remplace toujours une amorce datée de l'export.
+            if existante.get("amorce") and not observation.get("amorce"):
+                existante.pop("amorce")
+                existante["vue"] = observation["vue"]
+                return True
+            if observation.get("amorce") and not existante.get("amorce"):
+                return False
+            if _lire_horodatage(observation["vue"]) < _lire_horodatage(existante["vue"]):
+                existante["vue"] = observation["vue"]
+                return True
+            return False
+    observations.append(observation)
+    observations.sort(key=lambda item: (item["date"], item["vue"]))
+    return True
+
+
+def _charger_fichier(chemin: Path) -> Dict[str, List[Dict[str, Any]]]:
+    try:
+        with chemin.open("r", encoding="utf-8") as handle:
+            donnees = json.load(handle)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as err:
+        print(f"⚠ Historique des séances illisible ({chemin}: {err}), reconstruit depuis les délibérations.")
+        return {}
+    communes = donnees.get("communes") if isinstance(donnees, dict) else None
+    return communes if isinstance(communes, dict) else {}
+
+
+def _ecrire_fichier(historique: Dict[str, List[Dict[str, Any]]], chemin: Path) -> None:
+    temporaire = chemin.with_name(chemin.name + f".{os.getpid()}.tmp")
+    with temporaire.open("w", encoding="utf-8") as handle:
+        json.dump({"communes": dict(sorted(historique.items()))}, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
+    os.replace(temporaire, chemin)
+
+
+def charger_historique(communes: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Observations de séances par commune (date, projet/décision, première vue).
+    Une commune encore absente de l'historique y entre avec la séance de son
+    fichier de délibérations (voir _observation_fichier).
+    """
+    global _HISTORIQUE
+    with _VERROU_HISTORIQUE:
+        if _HISTORIQUE is None:
+            _HISTORIQUE = _charger_fichier(HISTORIQUE_SEANCES)
+        for commune in communes:
+            if commune not in _HISTORIQUE:
+                observation = _observation_fichier(commune)
+                _HISTORIQUE[commune] = [observation] if observation else []
+        return {commune: list(_HISTORIQUE.get(commune, [])) for commune in communes}
+
+
+def enregistrer_detection(commune: str, date_cle: Optional[str], type_cle: Optional[str]) -> None:
+    """Note la première détection d'une séance ; l'historique n'est réécrit que s'il change."""
+    try:
+        date.fromisoformat(date_cle or "")
+    except ValueError:
+        return
+    charger_historique([commune])
+    observation = {"date": date_cle, "type": categorie_type(type_cle), "vue": _horodatage(_maintenant())}
+    with _VERROU_HISTORIQUE:
+        if _ajouter(_HISTORIQUE, commune, observation):
+            _ecrire_fichier(_HISTORIQUE, HISTORIQUE_SEANCES)
+
+
+def fusionner_observations(commune: str, observations: List[Dict[str, Any]]) -> int:
+    """Intègre les observations d'une autre machine (file de travail) ; retourne le nombre de changements."""
+    charger_historique([commune])
+    with _VERROU_HISTORIQUE:
+        changements = sum(_ajouter(_HISTORIQUE, commune, dict(observation)) for observation in observations)
+        if changements:
+            _ecrire_fichier(_HISTORIQUE, HISTORIQUE_SEANCES)
+    return changements
+
+
+class Echantillons:
+    """Mesures tirées des observations d'une commune (ou de toutes)."""
+
+    def __init__(self) -> None:
+        self.ecarts_seances: List[float] = []
+        self.avances_projet: List[float] = []
+        self.delais_decision: List[float] = []
+        self.jours_semaine: Counter = Counter()
+
+    def ajouter_commune(self, observations: List[Dict[str, Any]]) -> None:
+        dates = sorted({date.fromisoformat(item["date"]) for item in observations})
+        self.jours_semaine.update(jour.weekday() for jour in dates)
+        for precedente, suivante in zip(dates, dates[1:]):
+            ecart = (suivante - precedente).days
+            if ECART_SEANCES_MIN_J <= ecart <= ECART_SEANCES_MAX_J:
+                self.ecarts_seances.append(float(ecart))
+        for item in observations:
+            if item.get("amorce"):
+                continue
+            decalage = (_lire_horodatage(item["vue"]) - _jour_seance(date.fromisoformat(item["date"]))).total_seconds()
+            decalage /= 86400
+            if item["type"] == "projet" and -AVANCE_PROJET_MAX_J <= decalage <= 0:
+                self.avances_projet.append(-decalage)
+            elif item["type"] == "decision" and 0 <= decalage <= DELAI_DECISION_MAX_J:
+                self.delais_decision.append(decalage)
+
+
+def _mediane(valeurs: List[float], repli: float) -> float:
+    return statistics.median(valeurs) if len(valeurs) >= OBSERVATIONS_MIN else repli
+
+
+def _dispersion(valeurs: List[float]) -> float:
+    """Écart absolu médian, peu sensible à une publication exceptionnellement tardive."""
+    mediane = statistics.median(valeurs)
+    return statistics.median(abs(valeur - mediane) for valeur in valeurs)
+
+
+class Cadence:
+    """
+    Calendrier de publication attendu d'une commune : jour de séance habituel,
+    période entre deux séances, avance des projets et délai des décisions.
+    Les mesures trop rares pour la commune sont empruntées à `reference`.
+    """
+
+    def __init__(
+        self,
+        commune: str,
+        observations: List[Dict[str, Any]],
+        echantillons: Echantillons,
+        reference: Optional["Cadence"] = None,
+    ) -> None:
+        self.commune = commune
+        self.observations = observations
+        self.periode_j = _mediane(echantillons.ecarts_seances, reference.periode_j if reference else PERIODE_PAR_DEFAUT_J)
+        self.avance_projet_j = _mediane(
+            echantillons.avances_projet, reference.avance_projet_j if reference else AVANCE_PROJET_PAR_DEFAUT_J
+        )
+        self.delai_decision_j = _mediane(
+            echantillons.delais_decision, reference.delai_decision_j if reference else DELAI_DECISION_PAR_DEFAUT_J
+        )
+        self.fenetre_j = reference.fenetre_j if reference else FENETRE_PAR_DEFAUT_J
+        dispersions = [
+            _dispersion(decalages)
+            for decalages in (echantillons.avances_projet, echantillons.delais_decision)
+            if len(decalages) > OBSERVATIONS_MIN
+        ]
+        if dispersions:
+            self.fenetre_j = min(FENETRE_MAX_J, max(FENETRE_MIN_J, 2 * max(dispersions)))
+        self.jour_semaine: Optional[int] = None
+        if echantillons.jours_semaine:
+            jour, occurrences = echantillons.jours_semaine.most_common(1)[0]
+            if occurrences >= OBSERVATIONS_MIN and occurrences * 2 >= sum(echantillons.jours_semaine.values()):
+                self.jour_semaine = jour
+
+    def _caler_sur_jour(self, jour: date) -> date:
+        if self.jour_semaine is None:
+            return jour
+        return jour + timedelta(days=(self.jour_semaine - jour.weekday() + 3) % 7 - 3)
+
+    def publications_attendues(self, maintenant: datetime) -> List[Tuple[datetime, str]]:
+        """Prochaines publications attendues (date, "projet"/"decision") dont la fenêtre n'est pas close."""
+        if not self.observations:
+            return []
+        fenetre = timedelta(days=self.fenetre_j)
+        derniere = max(date.fromisoformat(item["date"]) for item in self.observations)
+        types_derniere = {item["type"] for item in self.observations if item["date"] == derniere.isoformat()}
+        attendues = []
+        if "decision" not in types_derniere:
+            decision = _jour_seance(derniere) + timedelta(days=self.delai_decision_j)
+            if decision + fenetre >= maintenant:
+                attendues.append((decision, "decision"))
+        seance = derniere
+        for index in range(1, PROJECTIONS_MAX + 1):
+            seance = self._caler_sur_jour(derniere + timedelta(days=round(self.periode_j * index)))
+            projet = _jour_seance(seance) - timedelta(days=self.avance_projet_j)
+            if projet + fenetre >= maintenant:
+                attendues.append((projet, "projet"))
+                break
+        return sorted(attendues)
+
+    def ecart(self, maintenant: Optional[datetime] = None) -> Optional[float]:
+        """Secondes avant l'ouverture de la prochaine fenêtre de publication (0 si elle est ouverte)."""
+        maintenant = maintenant or _maintenant()
+        attendues = self.publications_attendues(maintenant)
+        if not attendues:
+            return None
+        ouverture = attendues[0][0] - timedelta(days=self.fenetre_j)
+        return max(0.0, (ouverture - maintenant).total_seconds())
+
+    def resume(self, maintenant: Optional[datetime] = None) -> str:
+        maintenant = maintenant or _maintenant()
+        jours = ("lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche")
+        attendues = self.publications_attendues(maintenant)
+        prochaine = f"{attendues[0][1]} vers le {attendues[0][0]:%d/%m/%Y}" if attendues else "-"
+        return (
+            f"{self.commune:<28} {len(self.observations):>3} obs. | "
+            f"{jours[self.jour_semaine] if self.jour_semaine is not None else '-':<9} | "
+            f"tous les {self.periode_j:>4.0f} j | projets J-{self.avance_projet_j:.1f} | "
+            f"décisions J+{self.delai_decision_j:.1f} | ±{self.fenetre_j:.1f} j | prochaine : {prochaine}"
+        )
+
+
+def estimer_cadences(communes: List[str]) -> Dict[str, Cadence]:
+    """Cadence de chaque commune, les mesures manquantes étant celles de l'ensemble des communes."""
+    historique = charger_historique(communes)
+    ensemble = Echantillons()
+    par_commune = {}
+    for commune, observations in historique.items():
+        par_commune[commune] = Echantillons()
+        par_commune[commune].ajouter_commune(observations)
+        ensemble.ajouter_commune(observations)
+    reference = Cadence("*", [], ensemble)
+    return {commune: Cadence(commune, historique[commune], par_commune[commune], reference) for commune in communes}
+
+
+def ordonner_par_imminence(communes: List[str], cadences: Optional[Dict[str, Cadence]] = None) -> List[str]:
+    """
+    Communes dont une publication est attendue le plus tôt d'abord (fenêtre
+    ouverte en tête) ; celles sans historique exploitable en dernier, dans
+    l'ordre demandé.
+    """
+    cadences = cadences if cadences is not None else estimer_cadences(communes)
+    maintenant = _maintenant()
+    ecarts = {commune: cadences[commune].ecart(maintenant) if commune in cadences else None for commune in communes}
+    return sorted(communes, key=lambda commune: (ecarts[commune] is None, ecarts[commune] or 0.0))
+
+
+def importer_depuis_git(communes: List[str]) -> int:
+    """
+    Ajoute à l'historique les séances des versions successives des fichiers de
+    délibérations enregistrées dans git (commit quotidien de l'intégration
+    continue), vues à la date du premier commit qui les contient. Retourne le
+    nombre d'ajouts.
+    """
+    from pipeline_journalistique import chemins_sortie, decrire_seance
+
+    charger_historique(communes)
+    ajouts = 0
+    for commune in communes:
+        for revision, date_commit in _revisions_git(chemins_sortie(commune)[0]):
+            seance = _seance_revision(revision)
+            observation = _observation(seance, date_commit, decrire_seance) if seance is not None else None
+            with _VERROU_HISTORIQUE:
+                if observation and _ajouter(_HISTORIQUE, commune, observation):
+                    ajouts += 1
+    with _VERROU_HISTORIQUE:
+        _ecrire_fichier(_HISTORIQUE, HISTORIQUE_SEANCES)
+    return ajouts
+
+
+def parser_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Affiche la cadence de publication apprise pour chaque commune (jour de séance, avance, délai)."
+    )
+    parser.add_argument("--communes", nargs="*", default=None, help="Communes à afficher (par défaut toutes).")
+    parser.add_argument(
+        "--importer-git",
+        action="store_true",
+        help="Complète l'historique avec les versions des délibérations enregistrées dans git.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parser_arguments()
+    from pipeline_journalistique import GROUPES_COMMUNES
+
+    communes = args.communes or sorted({commune for groupe in GROUPES_COMMUNES.values() for commune in groupe})
+    if args.importer_git:
+        print(f"✓ {importer_depuis_git(communes)} séance(s) ajoutée(s) depuis git dans {HISTORIQUE_SEANCES.name}")
+    cadences = estimer_cadences(communes)
+    print("=" * 80)
+    print("CADENCE DE PUBLICATION PAR COMMUNE (la plus imminente d'abord)")
+    print("=" * 80)
+    for commune in ordonner_par_imminence(communes, cadences):
+        print(cadences[commune].resume())
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
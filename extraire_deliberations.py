@@ -1,15 +1,34 @@
 import argparse
+import hashlib
 import io
 import json
+import os
 import re
+import shutil
+import tempfile
+import threading
 import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import quote, unquote, urljoin, urlparse
 
-import requests
-from bs4 import BeautifulSoup
-from pypdf import PdfReader
+# requests, bs4 et pypdf sont importés dans les fonctions qui les utilisent :
+# --help reste immédiat et la pipeline n'importe que ce dont chaque étape a besoin.
+from faits_deliberations import enrichir_deliberations
+from journal_execution import avec_contexte, chemin_journal_par_defaut, configurer_journal, enregistrer_span, span
+from profilage import configurer_profilage, dossier_profil_par_defaut, ecrire_profils, profiler
+from sections_deliberations import ajouter_sections, classer_ligne
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows : pas de partage entre processus
+    fcntl = None
+
+if TYPE_CHECKING:
+    import requests
 
 # Configuration
 BASE_ROOT = "https://www.deliberations.be"
@@ -20,8 +39,19 @@ BEAURAING_PROCES_VERBAUX_URL = (
     "https://www.beauraing.be/ma-commune/vie-politique/conseil-communal/proces-verbaux"
 )
 DELAI_ENTRE_REQUETES = 3  # secondes entre chaque requête pour éviter de surcharger le serveur
+RAFALE_PAR_HOTE = 1  # requêtes autorisées d'affilée avant d'appliquer le délai
+# État des seaux à jetons par hôte, partagé par tous les processus de la machine.
+DOSSIER_POLITESSE = Path(tempfile.gettempdir()) / "deliberations_politesse"
+# Base SQLite d'une file de travail (table `hotes`) : si elle est indiquée, les
+# seaux sont partagés par tous les travailleurs du lot, sur toutes les machines.
+VARIABLE_BASE_POLITESSE = "DELIBERATIONS_BASE_POLITESSE"
 TIMEOUT_REQUETE = 30
 NB_TENTATIVES = 3
+DOSSIER_CACHE_PDF = ".cache_pdf"
+PAGES_PAR_LOT_PDF = 4
+TAILLE_BLOC_PLAGE = 32 * 1024  # octets demandés par requête Range
+# Séance détectée : identifiant, nom, nombre de points annoncé, URL du PDF (sources PDF)
+SeanceDetectee = Tuple[Optional[str], Optional[str], Optional[int], Optional[str]]
 MOIS_FR = {
     "janvier": 1,
     "fevrier": 2,
@@ -148,23 +178,163 @@ def _titre_secours_depuis_url(url: str) -> str:
     return titre[:1].upper() + titre[1:] if titre else "Titre indisponible"
 
 
+# Session partagée : connexions HTTP réutilisées entre les requêtes et, dans la
+# pipeline en processus unique, entre les communes d'un même hôte.
+_SESSION_HTTP: Optional["requests.Session"] = None
+_VERROU_SESSION = threading.Lock()
+
+
+def session_http() -> "requests.Session":
+    """Session HTTP partagée, créée (et requests importé) à la première requête."""
+    global _SESSION_HTTP
+    with _VERROU_SESSION:
+        if _SESSION_HTTP is None:
+            import requests
+
+            _SESSION_HTTP = requests.Session()
+        return _SESSION_HTTP
+
+
+def configurer_session_http(session: "requests.Session") -> None:
+    """Remplace la session partagée (par exemple pour enregistrer les réponses des sites)."""
+    global _SESSION_HTTP
+    with _VERROU_SESSION:
+        _SESSION_HTTP = session
+
+
 def _get_with_retries(url: str, timeout: int = TIMEOUT_REQUETE, retries: int = NB_TENTATIVES):
+    from requests import RequestException
+
     derniere_erreur = None
     for tentative in range(1, retries + 1):
+        # Chaque essai compte dans le débit vers l'hôte, réessais compris.
+        _attendre_tour(url)
         try:
-            return requests.get(url, timeout=timeout)
-        except requests.RequestException as err:
+            with span("http", methode="GET", url=url, tentative=tentative) as requete:
+                response = session_http().get(url, timeout=timeout)
+                if requete is not None:
+                    requete.attributs.update(statut=response.status_code, octets=len(response.content))
+            return response
+        except RequestException as err:
             derniere_erreur = err
             print(f"  ⚠ Tentative {tentative}/{retries} échouée pour {url}: {err}")
-            time.sleep(2)
+            with span("attente", motif="reessai_http"):
+                time.sleep(2)
     raise derniere_erreur
 
 def construire_url_base(commune: str, base_root: str = BASE_ROOT) -> str:
-    if commune == "anhee":
-        return ANHEE_PROJETS_URL
-    if commune == "beauraing":
-        return f"{BEAURAING_PROCES_VERBAUX_URL}/conseils-communaux-{datetime.now().year}"
-    return f"{base_root.rstrip('/')}/{commune}/decisions"
+    return source_pour_commune(commune).construire_url(commune, base_root)
+
+
+class LimiteurHote:
+    """
+    Seau à jetons d'un hôte : au plus `rafale` requêtes d'affilée, puis une
+    toutes les `delai` secondes. L'état du seau est partagé par tous les
+    processus de la machine (pipeline nocturne, --force manuel, extraction
+    ad hoc) via un fichier verrouillé par hôte, ou par tous les travailleurs
+    d'une file de travail via sa base : le débit cumulé reste sous le
+    plafond, quel que soit le nombre de tâches en cours.
+    """
+
+    def __init__(self, hote: str, delai: float, rafale: int = RAFALE_PAR_HOTE):
+        self.hote = hote
+        self.delai = delai
+        self.rafale = max(1, rafale)
+        self._verrou = threading.Lock()
+        self._jetons = float(self.rafale)
+        self._horodatage = time.time()
+
+    def _reserver(self, jetons: Optional[float], horodatage: float) -> Tuple[float, float, float]:
+        """Prend un jeton (quitte à s'endetter) ; retourne l'attente, les jetons restants et l'heure."""
+        maintenant = time.time()
+        if jetons is None:
+            jetons = float(self.rafale)
+        jetons = min(float(self.rafale), jetons + max(0.0, maintenant - horodatage) / self.delai) - 1
+        return max(0.0, -jetons * self.delai), jetons, maintenant
+
+    def _reserver_base(self, chemin: str) -> Optional[float]:
+        import sqlite3
+
+        try:
+            connexion = sqlite3.connect(chemin, timeout=60, isolation_level=None)
+        except sqlite3.Error:
+            return None
+        try:
+            connexion.execute("BEGIN IMMEDIATE")
+            ligne = connexion.execute("SELECT jetons, horodatage FROM hotes WHERE hote = ?", (self.hote,)).fetchone()
+            attente, jetons, horodatage = self._reserver(*(ligne or (None, 0.0)))
+            connexion.execute(
+                "INSERT OR REPLACE INTO hotes (hote, jetons, horodatage) VALUES (?, ?, ?)",
+                (self.hote, jetons, horodatage),
+            )
+            connexion.execute("COMMIT")
+            return attente
+        except sqlite3.Error:
+            return None
+        finally:
+            connexion.close()
+
+    def _reserver_partage(self) -> Optional[float]:
+        chemin_base = os.environ.get(VARIABLE_BASE_POLITESSE)
+        if chemin_base:
+            attente = self._reserver_base(chemin_base)
+            if attente is not None:
+                return attente
+        if fcntl is None:
+            return None
+        try:
+            DOSSIER_POLITESSE.mkdir(parents=True, exist_ok=True)
+            fichier = DOSSIER_POLITESSE / f"{re.sub(r'[^A-Za-z0-9.-]', '_', self.hote)}.json"
+            handle = open(fichier, "a+", encoding="utf-8")
+        except OSError:
+            return None
+        with handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            handle.seek(0)
+            try:
+                etat = json.loads(handle.read() or "{}")
+            except json.JSONDecodeError:
+                etat = {}
+            attente, jetons, horodatage = self._reserver(
+                float(etat.get("jetons", self.rafale)), float(etat.get("horodatage", 0.0))
+            )
+            handle.seek(0)
+            handle.truncate()
+            json.dump({"jetons": jetons, "horodatage": horodatage}, handle)
+            handle.flush()
+        return attente
+
+    def attendre(self) -> float:
+        """Bloque jusqu'au tour suivant ; retourne le temps attendu."""
+        if self.delai <= 0:
+            return 0.0
+        with self._verrou:
+            attente = self._reserver_partage()
+            if attente is None:
+                # Pas de verrou de fichier (Windows, dossier en lecture seule) : seau propre au processus.
+                attente, self._jetons, self._horodatage = self._reserver(self._jetons, self._horodatage)
+        if attente:
+            time.sleep(attente)
+        return attente
+
+
+_LIMITEURS: Dict[str, LimiteurHote] = {}
+
+
+def configurer_politesse(url_base: str, delai: float) -> None:
+    """Fixe le délai entre deux requêtes vers l'hôte de `url_base` (0 : aucune attente)."""
+    hote = urlparse(url_base).netloc
+    _LIMITEURS[hote] = LimiteurHote(hote, delai)
+
+
+def _attendre_tour(url: str) -> None:
+    """Attend son tour avant de solliciter l'hôte de `url`, pour ne pas surcharger le serveur."""
+    hote = urlparse(url).netloc
+    if hote not in _LIMITEURS:
+        _LIMITEURS[hote] = LimiteurHote(hote, DELAI_ENTRE_REQUETES)
+    attente = _LIMITEURS[hote].attendre()
+    if attente:
+        enregistrer_span("attente", attente, motif="politesse", hote=hote)
 
 
 def _mois_fr(numero: int) -> str:
@@ -185,16 +355,20 @@ def _mois_fr(numero: int) -> str:
     return labels.get(numero, str(numero))
 
 
-def _anhee_lister_pdfs(url_base: str) -> List[str]:
-    response = _get_with_retries(url_base)
-    soup = BeautifulSoup(response.content, "html.parser")
+def _lister_pdfs(url_page: str) -> List[str]:
+    """Liens vers des PDF publiés sur une page HTML, dédoublonnés et sans suffixe /view."""
+    from bs4 import BeautifulSoup
+
+    response = _get_with_retries(url_page)
+    with span("parsing_html", octets=len(response.content)):
+        soup = BeautifulSoup(response.content, "html.parser")
     pdfs = []
     vus = set()
     for lien in soup.find_all("a", href=True):
-        href = lien["href"].strip()
+        href = lien.get("href", "").strip()
         if ".pdf" not in href.lower():
             continue
-        url = urljoin(url_base, href)
+        url = urljoin(url_page, href)
         if "/view" in url:
             url = url.split("/view", 1)[0]
         if url not in vus:
@@ -203,6 +377,297 @@ def _anhee_lister_pdfs(url_base: str) -> List[str]:
     return pdfs
 
 
+@profiler("detection")
+def _detecter_pdf_le_plus_recent(
+    pages: List[str],
+    extraire_date: Callable[[str], Optional[datetime]],
+    filtre_url: Optional[str] = None,
+) -> SeanceDetectee:
+    """Séance du PDF le plus récent publié sur `pages`, daté d'après son URL."""
+    from requests import RequestException
+
+    candidats = []
+    for page_url in pages:
+        try:
+            pdfs = _lister_pdfs(page_url)
+        except RequestException as err:
+            print(f"  ⚠ Page inaccessible {page_url}: {err}")
+            continue
+        for pdf_url in pdfs:
+            if filtre_url and filtre_url not in pdf_url.lower():
+                continue
+            date_pdf = extraire_date(pdf_url)
+            if date_pdf is None:
+                continue
+            candidats.append((date_pdf, pdf_url))
+
+    if not candidats:
+        print("Impossible de détecter un PDF de séance récent.\n")
+        return None, None, None, None
+
+    date_seance, pdf_url = max(candidats, key=lambda item: item[0])
+    seance_nom = f"{date_seance.day:02d} {_mois_fr(date_seance.month)} {date_seance.year} (20:00) — Projet de décision"
+    seance_id = f"{date_seance:%d-%m-%Y}-20-00-projet-de-decision"
+    print(f"Séance détectée : {seance_nom}")
+    print(f"PDF : {pdf_url}\n")
+    return seance_id, seance_nom, None, pdf_url
+
+
+def _normaliser_ligne_pdf(ligne: str) -> str:
+    return " ".join((ligne or "").replace("\xa0", " ").split()).strip()
+
+
+def _extraire_points_pdf(
+    pdf_url: str,
+    decouper: Callable[[List[str], str], List[dict]],
+    libelle: str,
+    empreinte: Optional[Dict[str, Any]] = None,
+) -> List[dict]:
+    """Télécharge un PDF de séance et le découpe en points avec le parseur propre à la commune."""
+    print(f"📄 Extraction du PDF {libelle} : {pdf_url.split('/')[-1][:60]}...")
+    points = decouper(_telecharger_textes_pdf(pdf_url, empreinte), pdf_url)
+    if points:
+        print(f"✅ Extraction PDF réussie : {len(points)} point(s)\n")
+    return points
+
+
+def purger_cache_pdf(duree_jours: int, dossier_cache: str = DOSSIER_CACHE_PDF) -> None:
+    """Supprime les textes de PDF mis en cache il y a plus de `duree_jours` jours."""
+    racine = Path(dossier_cache)
+    if not racine.is_dir():
+        return
+    limite = time.time() - duree_jours * 86400
+    for dossier in racine.iterdir():
+        if dossier.is_dir() and dossier.stat().st_mtime < limite:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+
+def _extraire_textes_pages(contenu_pdf: bytes, indices: List[int]) -> List[Tuple[str, float, float]]:
+    """
+    Texte de quelques pages d'un PDF (exécuté dans un processus du pool),
+    avec l'horodatage et la durée de chaque extraction pour le journal.
+    """
+    from pypdf import PdfReader
+
+    lecteur = PdfReader(io.BytesIO(contenu_pdf))
+    resultats = []
+    for index in indices:
+        horodatage, debut = time.time(), time.perf_counter()
+        texte = lecteur.pages[index].extract_text() or ""
+        resultats.append((texte, horodatage, time.perf_counter() - debut))
+    return resultats
+
+
+@profiler("pdf")
+def textes_pages_pdf(contenu_pdf: bytes, dossier_cache: str = DOSSIER_CACHE_PDF) -> List[str]:
+    """
+    Texte de chaque page d'un PDF, extrait en parallèle sur plusieurs processus.
+
+    Les textes sont mis en cache dans `dossier_cache/<sha256 du PDF>/<page>.txt` :
+    un PDF inchangé n'est jamais ré-extrait, même après une modification du découpage.
+    """
+    with span("pdf", octets=len(contenu_pdf)) as courant:
+        textes = _textes_pages_pdf(contenu_pdf, dossier_cache)
+        if courant is not None:
+            courant.attributs["pages"] = len(textes)
+    return textes
+
+
+def _textes_pages_pdf(contenu_pdf: bytes, dossier_cache: str) -> List[str]:
+    dossier = Path(dossier_cache) / hashlib.sha256(contenu_pdf).hexdigest()
+    chemin_nombre = dossier / "pages.txt"
+    if chemin_nombre.exists():
+        nombre_pages = int(chemin_nombre.read_text(encoding="utf-8"))
+    else:
+        from pypdf import PdfReader
+
+        nombre_pages = len(PdfReader(io.BytesIO(contenu_pdf)).pages)
+
+    textes: List[Optional[str]] = [None] * nombre_pages
+    manquantes = []
+    for index in range(nombre_pages):
+        chemin = dossier / f"{index:04d}.txt"
+        if chemin.exists():
+            textes[index] = chemin.read_text(encoding="utf-8")
+        else:
+            manquantes.append(index)
+    if not manquantes:
+        print(f"✓ Texte des {nombre_pages} page(s) repris du cache")
+        return textes
+
+    lots = [manquantes[i:i + PAGES_PAR_LOT_PDF] for i in range(0, len(manquantes), PAGES_PAR_LOT_PDF)]
+    debut = time.perf_counter()
+    processus = min(len(lots), os.cpu_count() or 1)
+    if processus <= 1:
+        resultats = [_extraire_textes_pages(contenu_pdf, lot) for lot in lots]
+    else:
+        import multiprocessing
+
+        # spawn plutôt que fork : la pipeline appelle l'extraction depuis un processus
+        # qui fait tourner d'autres threads, dont un verrou pris au moment du fork
+        # resterait bloqué à jamais dans l'enfant.
+        with ProcessPoolExecutor(max_workers=processus, mp_context=multiprocessing.get_context("spawn")) as pool:
+            resultats = list(pool.map(_extraire_textes_pages, [contenu_pdf] * len(lots), lots))
+
+    dossier.mkdir(parents=True, exist_ok=True)
+    for lot, textes_lot in zip(lots, resultats):
+        for index, (texte, horodatage, duree) in zip(lot, textes_lot):
+            textes[index] = texte
+            (dossier / f"{index:04d}.txt").write_text(texte, encoding="utf-8")
+            enregistrer_span("pdf_page", duree, debut=horodatage, page=index + 1, caracteres=len(texte))
+    chemin_nombre.write_text(str(nombre_pages), encoding="utf-8")
+    print(f"✓ Texte de {len(manquantes)}/{nombre_pages} page(s) extrait en {time.perf_counter() - debut:.1f}s")
+    return textes
+
+
+def _empreinte_depuis_entetes(pdf_url: str, entetes) -> Dict[str, Any]:
+    taille = entetes.get("Content-Length")
+    return {
+        "url": pdf_url,
+        "taille": int(taille) if taille and taille.isdigit() else None,
+        "etag": entetes.get("ETag"),
+        "derniere_modification": entetes.get("Last-Modified"),
+    }
+
+
+def _empreinte_texte(texte: str) -> str:
+    return hashlib.sha256(" ".join(texte.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def _telecharger_textes_pdf(pdf_url: str, empreinte: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Télécharge un PDF complet et retourne le texte de ses pages ; remplit `empreinte` si fourni."""
+    response = _get_with_retries(pdf_url, timeout=60)
+    textes = textes_pages_pdf(response.content)
+    if empreinte is not None:
+        empreinte.update(_empreinte_depuis_entetes(pdf_url, response.headers))
+        empreinte["taille"] = len(response.content)
+        empreinte["premiere_page"] = _empreinte_texte(textes[0]) if textes else None
+    return textes
+
+
+class FichierHttpPlages(io.RawIOBase):
+    """
+    Fichier distant en lecture seule, lu par plages HTTP (en-tête Range) et
+    conservé en mémoire par blocs : pypdf ne télécharge que les objets qu'il lit.
+    """
+
+    def __init__(self, url: str, taille: int, taille_bloc: int = TAILLE_BLOC_PLAGE):
+        super().__init__()
+        self.url = url
+        self.taille = taille
+        self.taille_bloc = taille_bloc
+        self.position = 0
+        self.blocs: Dict[int, bytes] = {}
+        self.octets_telecharges = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, decalage: int, origine: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.taille}[origine]
+        self.position = max(0, base + decalage)
+        return self.position
+
+    def _bloc(self, numero: int) -> bytes:
+        if numero not in self.blocs:
+            debut = numero * self.taille_bloc
+            fin = min(self.taille, debut + self.taille_bloc) - 1
+            _attendre_tour(self.url)
+            with span("http", methode="GET", url=self.url, plage=f"{debut}-{fin}") as requete, session_http().get(
+                self.url, headers={"Range": f"bytes={debut}-{fin}"}, timeout=TIMEOUT_REQUETE, stream=True
+            ) as response:
+                if requete is not None:
+                    requete.attributs["statut"] = response.status_code
+                if response.status_code != 206:
+                    raise RuntimeError(f"Le serveur ne sert pas de plages d'octets ({response.status_code}).")
+                self.blocs[numero] = response.content
+                if requete is not None:
+                    requete.attributs["octets"] = len(self.blocs[numero])
+            self.octets_telecharges += len(self.blocs[numero])
+        return self.blocs[numero]
+
+    def read(self, taille: int = -1) -> bytes:
+        if taille is None or taille < 0:
+            taille = self.taille - self.position
+        fin = min(self.taille, self.position + taille)
+        morceaux = []
+        while self.position < fin:
+            numero, decalage = divmod(self.position, self.taille_bloc)
+            morceau = self._bloc(numero)[decalage:decalage + fin - self.position]
+            if not morceau:
+                break
+            morceaux.append(morceau)
+            self.position += len(morceau)
+        return b"".join(morceaux)
+
+
+def empreinte_pdf_distant(pdf_url: str) -> Dict[str, Any]:
+    """Taille, ETag et date de modification d'un PDF distant, via une requête HEAD."""
+    _attendre_tour(pdf_url)
+    with span("http", methode="HEAD", url=pdf_url) as requete:
+        response = session_http().head(pdf_url, timeout=TIMEOUT_REQUETE, allow_redirects=True)
+        if requete is not None:
+            requete.attributs.update(statut=response.status_code, octets=0)
+    response.raise_for_status()
+    empreinte = _empreinte_depuis_entetes(pdf_url, response.headers)
+    empreinte["plages"] = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    return empreinte
+
+
+def texte_premiere_page_distante(pdf_url: str, taille: int) -> str:
+    """Texte de la première page d'un PDF distant, lu par plages d'octets sans télécharger le document."""
+    from pypdf import PdfReader
+
+    fichier = FichierHttpPlages(pdf_url, taille)
+    # En mode strict, pypdf ne relit pas chaque objet de la table xref pour la valider.
+    texte = PdfReader(fichier, strict=True).pages[0].extract_text() or ""
+    print(f"  Première page lue par plages : {fichier.octets_telecharges // 1024} Ko sur {taille // 1024} Ko")
+    return texte
+
+
+def pdf_modifie(empreinte_connue: Optional[Dict[str, Any]], pdf_url: str) -> bool:
+    """
+    Indique si le PDF d'une séance a changé depuis la dernière extraction.
+
+    Compare d'abord l'ETag, puis la taille et la date de modification. Si ces
+    en-têtes ne suffisent pas et que le serveur accepte les plages d'octets,
+    compare le texte de la première page (l'ordre du jour) lu par plages.
+    Dans le doute, le PDF est considéré comme modifié.
+    """
+    if not empreinte_connue or empreinte_connue.get("url") != pdf_url:
+        return True
+    from pypdf.errors import PdfReadError
+    from requests import RequestException
+
+    try:
+        distante = empreinte_pdf_distant(pdf_url)
+    except RequestException as err:
+        print(f"  ⚠ Empreinte du PDF indisponible ({err}).")
+        return True
+
+    if empreinte_connue.get("etag") and distante["etag"]:
+        return empreinte_connue["etag"] != distante["etag"]
+    if empreinte_connue.get("taille") and distante["taille"] and empreinte_connue["taille"] != distante["taille"]:
+        return True
+    if empreinte_connue.get("derniere_modification") and distante["derniere_modification"]:
+        return empreinte_connue["derniere_modification"] != distante["derniere_modification"]
+
+    if distante["plages"] and distante["taille"] and empreinte_connue.get("premiere_page"):
+        try:
+            texte = texte_premiere_page_distante(pdf_url, distante["taille"])
+        except (RequestException, RuntimeError, PdfReadError) as err:
+            print(f"  ⚠ Lecture par plages impossible ({err}).")
+            return True
+        return _empreinte_texte(texte) != empreinte_connue["premiere_page"]
+    return True
+
+
 def _anhee_extraire_datetime_depuis_url(url: str) -> Optional[datetime]:
     correspondance = re.search(r"(\d{2})-(\d{2})-(\d{4})", url)
     if correspondance:
@@ -225,35 +690,9 @@ def _anhee_extraire_datetime_depuis_url(url: str) -> Optional[datetime]:
         return None
 
 
-def _anhee_detecter_pdf_le_plus_recent(url_base: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+def _anhee_detecter(url_base: str) -> SeanceDetectee:
     print("Détection de la séance la plus récente (source PDF Anhée)...")
-    pdfs = _anhee_lister_pdfs(url_base)
-    candidats = []
-    for pdf_url in pdfs:
-        date_pdf = _anhee_extraire_datetime_depuis_url(pdf_url)
-        if date_pdf is None:
-            continue
-        candidats.append((date_pdf, pdf_url))
-
-    if not candidats:
-        print("Impossible de détecter un PDF de séance récent.\n")
-        return None, None, None
-
-    date_seance, pdf_url = max(candidats, key=lambda item: item[0])
-    seance_nom = f"{date_seance.day:02d} {_mois_fr(date_seance.month)} {date_seance.year} (20:00) — Projet de décision"
-    seance_id = f"{date_seance:%d-%m-%Y}-20-00-projet-de-decision"
-    print(f"Séance détectée : {seance_nom}")
-    print(f"PDF : {pdf_url}\n")
-    return seance_id, seance_nom, pdf_url
-
-
-def _anhee_telecharger_pdf(pdf_url: str) -> PdfReader:
-    response = _get_with_retries(pdf_url, timeout=60)
-    return PdfReader(io.BytesIO(response.content))
-
-
-def _anhee_normaliser_ligne_pdf(ligne: str) -> str:
-    return " ".join((ligne or "").replace("\xa0", " ").split()).strip()
+    return _detecter_pdf_le_plus_recent([url_base], _anhee_extraire_datetime_depuis_url)
 
 
 def _anhee_ratio_majuscules(texte: str) -> float:
@@ -278,23 +717,20 @@ def _anhee_est_suite_titre(texte: str) -> bool:
     texte = texte.strip()
     if not texte:
         return False
-    if texte.startswith(("Vu ", "Attendu", "Considérant", "DECIDE", "DÉCIDE", "Sur proposition")):
+    if classer_ligne(texte) or texte.startswith("Sur proposition"):
         return False
     return _anhee_est_titre_point(texte)
 
 
-def _anhee_extraire_points_depuis_pdf(pdf_url: str) -> List[dict]:
-    print(f"📄 Extraction du PDF Anhée : {pdf_url.split('/')[-1][:60]}...")
-    time.sleep(DELAI_ENTRE_REQUETES)
-    lecteur = _anhee_telecharger_pdf(pdf_url)
+@profiler("pdf")
+def _anhee_decouper_points(textes_pages: List[str], pdf_url: str) -> List[dict]:
     points = []
     point_courant = None
     motif_point = re.compile(r"^(\d+)\.\s+(.+)$")
 
-    for numero_page, page in enumerate(lecteur.pages, start=1):
-        texte = page.extract_text() or ""
+    for numero_page, texte in enumerate(textes_pages, start=1):
         for brute in texte.splitlines():
-            ligne = _anhee_normaliser_ligne_pdf(brute)
+            ligne = _normaliser_ligne_pdf(brute)
             if not ligne:
                 continue
             if re.fullmatch(r"\d+\s*/\s*\d+", ligne):
@@ -327,8 +763,6 @@ def _anhee_extraire_points_depuis_pdf(pdf_url: str) -> List[dict]:
 
     if point_courant:
         points.append(point_courant)
-
-    print(f"✅ Extraction PDF réussie : {len(points)} point(s)\n")
     return points
 
 
@@ -336,24 +770,6 @@ def _beauraing_url_annee(annee: int) -> str:
     return f"{BEAURAING_PROCES_VERBAUX_URL}/conseils-communaux-{annee}"
 
 
-def _beauraing_lister_pdfs(url_base: str) -> List[str]:
-    response = _get_with_retries(url_base)
-    soup = BeautifulSoup(response.content, "html.parser")
-    pdfs = []
-    vus = set()
-    for lien in soup.find_all("a", href=True):
-        href = lien.get("href", "").strip()
-        if ".pdf" not in href.lower():
-            continue
-        url = urljoin(url_base, href)
-        if "/view" in url:
-            url = url.split("/view", 1)[0]
-        if url not in vus:
-            vus.add(url)
-            pdfs.append(url)
-    return pdfs
-
-
 def _beauraing_extraire_datetime_depuis_url(url: str) -> Optional[datetime]:
     correspondance = re.search(r"cc-(\d{2})-(\d{2})-(\d{2,4})", url.lower())
     if not correspondance:
@@ -369,51 +785,22 @@ def _beauraing_extraire_datetime_depuis_url(url: str) -> Optional[datetime]:
         return None
 
 
-def _beauraing_detecter_pdf_le_plus_recent(url_base: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+def _beauraing_detecter(url_base: str) -> SeanceDetectee:
     print("Détection de la séance la plus récente (source PDF Beauraing)...")
     pages_a_verifier = [url_base]
-    annee_courante = datetime.now().year
-    if not url_base.endswith(str(annee_courante - 1)):
-        pages_a_verifier.append(_beauraing_url_annee(annee_courante - 1))
-
-    candidats = []
-    for page_url in pages_a_verifier:
-        try:
-            pdfs = _beauraing_lister_pdfs(page_url)
-        except Exception:
-            continue
-        for pdf_url in pdfs:
-            if "projets-de-deliberations" not in pdf_url.lower():
-                continue
-            date_pdf = _beauraing_extraire_datetime_depuis_url(pdf_url)
-            if date_pdf is None:
-                continue
-            candidats.append((date_pdf, pdf_url))
-
-    if not candidats:
-        print("Impossible de détecter un PDF de projets récent.\n")
-        return None, None, None
-
-    date_seance, pdf_url = max(candidats, key=lambda item: item[0])
-    seance_nom = f"{date_seance.day:02d} {_mois_fr(date_seance.month)} {date_seance.year} (20:00) — Projet de décision"
-    seance_id = f"{date_seance:%d-%m-%Y}-20-00-projet-de-decision"
-    print(f"Séance détectée : {seance_nom}")
-    print(f"PDF : {pdf_url}\n")
-    return seance_id, seance_nom, pdf_url
-
-
-def _beauraing_telecharger_pdf(pdf_url: str) -> PdfReader:
-    response = _get_with_retries(pdf_url, timeout=60)
-    return PdfReader(io.BytesIO(response.content))
-
-
-def _beauraing_normaliser_ligne_pdf(ligne: str) -> str:
-    return " ".join((ligne or "").replace("\xa0", " ").split()).strip()
+    # En début d'année, la dernière séance est encore sur la page de l'année précédente.
+    page_precedente = re.sub(r"\d{4}$", str(datetime.now().year - 1), url_base)
+    if page_precedente != url_base:
+        pages_a_verifier.append(page_precedente)
+    return _detecter_pdf_le_plus_recent(
+        pages_a_verifier,
+        _beauraing_extraire_datetime_depuis_url,
+        filtre_url="projets-de-deliberations",
+    )
 
 
-def _beauraing_extraire_odj_premiere_page(lecteur: PdfReader) -> List[Tuple[int, str]]:
-    texte = lecteur.pages[0].extract_text() or ""
-    lignes = [_beauraing_normaliser_ligne_pdf(ligne) for ligne in texte.splitlines()]
+def _beauraing_extraire_odj_premiere_page(texte: str) -> List[Tuple[int, str]]:
+    lignes = [_normaliser_ligne_pdf(ligne) for ligne in texte.splitlines()]
     lignes = [ligne for ligne in lignes if ligne]
 
     try:
@@ -452,26 +839,12 @@ def _beauraing_extraire_odj_premiere_page(lecteur: PdfReader) -> List[Tuple[int,
 
 
 def _beauraing_est_ligne_contenu(texte: str) -> bool:
-    prefixes = (
-        "Vu ",
-        "Attendu",
-        "Considérant",
-        "Aucun avis",
-        "Ouï ",
-        "Sur proposition",
-        "PROPOSITION",
-        "Article",
-        "Art.",
-        "Néant",
-    )
-    return texte.startswith(prefixes)
+    return classer_ligne(texte) is not None or texte.startswith(("Aucun avis", "Sur proposition", "Néant"))
 
 
-def _beauraing_extraire_points_depuis_pdf(pdf_url: str) -> List[dict]:
-    print(f"📄 Extraction du PDF Beauraing : {pdf_url.split('/')[-1][:60]}...")
-    time.sleep(DELAI_ENTRE_REQUETES)
-    lecteur = _beauraing_telecharger_pdf(pdf_url)
-    ordre_du_jour = _beauraing_extraire_odj_premiere_page(lecteur)
+@profiler("pdf")
+def _beauraing_decouper_points(textes_pages: List[str], pdf_url: str) -> List[dict]:
+    ordre_du_jour = _beauraing_extraire_odj_premiere_page(textes_pages[0] if textes_pages else "")
     if not ordre_du_jour:
         print("⚠ Impossible d'extraire l'ordre du jour depuis la première page.\n")
         return []
@@ -483,10 +856,9 @@ def _beauraing_extraire_points_depuis_pdf(pdf_url: str) -> List[dict]:
     dans_details = False
     compteur_seance_publique = 0
 
-    for numero_page, page in enumerate(lecteur.pages, start=1):
-        texte = page.extract_text() or ""
+    for numero_page, texte in enumerate(textes_pages, start=1):
         for brute in texte.splitlines():
-            ligne = _beauraing_normaliser_ligne_pdf(brute)
+            ligne = _normaliser_ligne_pdf(brute)
             if not ligne:
                 continue
             if re.fullmatch(r"\d+\s*/\s*\d+", ligne):
@@ -534,8 +906,6 @@ def _beauraing_extraire_points_depuis_pdf(pdf_url: str) -> List[dict]:
     for point in points:
         if not point["contenu"]:
             point["contenu"] = point["titre"]
-
-    print(f"✅ Extraction PDF réussie : {len(points)} point(s)\n")
     return points
 
 
@@ -548,22 +918,19 @@ def _extraire_nombre_points_depuis_libelle_seance(libelle: Optional[str]) -> Opt
     return None
 
 
+@profiler("detection")
 def detecter_seance_la_plus_recente(url_base: str):
     """
     Cette fonction détecte automatiquement la séance la plus récente
     en analysant la première page des décisions
     """
-    if "anhee.be" in url_base:
-        seance_id, seance_nom, _ = _anhee_detecter_pdf_le_plus_recent(url_base)
-        return seance_id, seance_nom, None
-    if "beauraing.be" in url_base:
-        seance_id, seance_nom, _ = _beauraing_detecter_pdf_le_plus_recent(url_base)
-        return seance_id, seance_nom, None
+    from bs4 import BeautifulSoup
 
     print("Détection de la séance la plus récente...")
     
     response = _get_with_retries(url_base)
-    soup = BeautifulSoup(response.content, 'html.parser')
+    with span("parsing_html", octets=len(response.content)):
+        soup = BeautifulSoup(response.content, 'html.parser')
     
     # Chercher le sélecteur de séance
     select_seance = soup.find('select', {'id': 'seance'})
@@ -587,11 +954,14 @@ def detecter_seance_la_plus_recente(url_base: str):
     print("Impossible de détecter la séance. Utilisation de la liste par défaut...\n")
     return None, None, None
 
+@profiler("liste")
 def extraire_liens_deliberations(seance_id, url_base: str):
     """
     Étape 1 : Cette fonction va parcourir TOUTES les pages
     d'une séance spécifique et récupère tous les liens
     """
+    from bs4 import BeautifulSoup
+
     print("📥 Analyse de la pagination...")
     
     tous_les_liens = []
@@ -626,11 +996,13 @@ def extraire_liens_deliberations(seance_id, url_base: str):
                 url = f"{url_base}?b_start:int={page_actuelle}"
         
         print(f"  📄 Page {page_actuelle // 20 + 1}...")
-        
+        # La pause entre les pages est prise dans _get_with_retries, partagée
+        # avec les autres requêtes (et les autres processus) vers l'hôte.
         try:
             # On fait une demande pour récupérer la page web
             response = _get_with_retries(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with span("parsing_html", octets=len(response.content)):
+                soup = BeautifulSoup(response.content, 'html.parser')
             
             # On cherche toutes les cartes de délibérations
             cartes = soup.find_all('div', class_='item-card')
@@ -678,7 +1050,6 @@ def extraire_liens_deliberations(seance_id, url_base: str):
             
             # Passer à la page suivante
             page_actuelle += increment
-            time.sleep(1)  # Petite pause entre les pages
             
         except Exception as e:
             print(f"  ❌ Erreur sur cette page: {e}")
@@ -687,33 +1058,34 @@ def extraire_liens_deliberations(seance_id, url_base: str):
     print(f"\n✅ Trouvé {len(tous_les_liens)} délibérations au total\n")
     return tous_les_liens
 
+@profiler("detail")
 def extraire_contenu_deliberation(url):
     """
     Étape 2 : Cette fonction va chercher le contenu détaillé
     d'une délibération spécifique
     """
+    from bs4 import BeautifulSoup
+
     print(f"📄 Extraction de : {url.split('/')[-1][:50]}...")
     
-    # On attend un peu pour ne pas surcharger le serveur
-    time.sleep(DELAI_ENTRE_REQUETES)
-    
     try:
         response = _get_with_retries(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # On récupère le titre
-        titre = soup.find('h1')
-        titre_texte = titre.get_text(strip=True) if titre else "Titre non trouvé"
-        if "bad gateway" in titre_texte.casefold():
-            titre_texte = _titre_secours_depuis_url(url)
-        
-        # On récupère tout le contenu principal
-        contenu = soup.find('article', id='content')
-        if contenu:
-            # On enlève les balises HTML pour garder juste le texte
-            texte = contenu.get_text(separator='\n', strip=True)
-        else:
-            texte = "Contenu indisponible lors de l'extraction."
+        with span("parsing_html", octets=len(response.content)):
+            soup = BeautifulSoup(response.content, 'html.parser')
+
+            # On récupère le titre
+            titre = soup.find('h1')
+            titre_texte = titre.get_text(strip=True) if titre else "Titre non trouvé"
+            if "bad gateway" in titre_texte.casefold():
+                titre_texte = _titre_secours_depuis_url(url)
+
+            # On récupère tout le contenu principal
+            contenu = soup.find('article', id='content')
+            if contenu:
+                # On enlève les balises HTML pour garder juste le texte
+                texte = contenu.get_text(separator='\n', strip=True)
+            else:
+                texte = "Contenu indisponible lors de l'extraction."
 
         print(f"✅ Extraction réussie\n")
         
@@ -739,6 +1111,7 @@ def sauvegarder_resultats(
     nom_fichier="deliberations_wavre.json",
     commune_slug="wavre",
     commune_nom=None,
+    seance_pdf=None,
 ):
     """
     Étape 3 : Cette fonction sauvegarde tous les résultats
@@ -759,6 +1132,9 @@ def sauvegarder_resultats(
         },
         "deliberations": deliberations,
     }
+    if seance_pdf:
+        # Empreinte du PDF source, pour détecter une mise à jour sans le retélécharger
+        export["seance"]["pdf"] = seance_pdf
 
     with open(nom_fichier, 'w', encoding='utf-8') as f:
         json.dump(export, f, ensure_ascii=False, indent=2)
@@ -791,8 +1167,122 @@ def creer_resume_texte(deliberations, nom_fichier, seance_nom, commune_nom):
     
     print(f"✅ Résumé créé !\n")
 
+# ===== SOURCES DE DÉLIBÉRATIONS =====
+class SourceDeliberations(ABC):
+    """
+    Adaptateur d'une source de délibérations : détection de la dernière
+    séance, liste et extraction de ses points, et limites propres à l'hôte
+    (délai entre requêtes, requêtes simultanées, durée du cache). Un
+    adaptateur incomplet échoue dès sa création, pas en cours d'exécution.
+    """
+
+    nom = ""
+    delai_entre_requetes: float = DELAI_ENTRE_REQUETES
+    requetes_paralleles = 1
+    duree_cache_pdf_jours: Optional[int] = None
+
+    @abstractmethod
+    def construire_url(self, commune: str, base_root: str) -> str:
+        """URL de la page à surveiller pour la commune."""
+
+    @abstractmethod
+    def detecter(self, url_base: str) -> SeanceDetectee:
+        """Dernière séance publiée : identifiant, nom, nombre de points et URL du PDF éventuel."""
+
+    @abstractmethod
+    def extraire(self, url_base: str, seance: SeanceDetectee, empreinte: Dict[str, Any]) -> List[dict]:
+        """Points de la séance détectée."""
+
+
+class SourceDeliberationsBe(SourceDeliberations):
+    """Pages HTML de deliberations.be : une page par point, paginées par séance."""
+
+    nom = "deliberations.be"
+    # Deux requêtes en vol, mais jamais plus d'une nouvelle requête toutes les
+    # `delai_entre_requetes` secondes : le temps de réponse se recouvre avec l'attente.
+    requetes_paralleles = 2
+
+    def construire_url(self, commune: str, base_root: str) -> str:
+        return f"{base_root.rstrip('/')}/{commune}/decisions"
+
+    def detecter(self, url_base: str) -> SeanceDetectee:
+        seance_id, seance_nom, nombre_points = detecter_seance_la_plus_recente(url_base)
+        return seance_id, seance_nom, nombre_points, None
+
+    def extraire(self, url_base: str, seance: SeanceDetectee, empreinte: Dict[str, Any]) -> List[dict]:
+        # Étape 1 : Récupérer tous les liens de cette séance
+        liens = extraire_liens_deliberations(seance[0], url_base)
+        if not liens:
+            print("Aucune délibération trouvée. Vérifiez l'URL.")
+            return []
+
+        # Étape 2 : Extraire le contenu de chaque délibération
+        print(f"Début de l'extraction de {len(liens)} délibérations...")
+        print(f"Temps estimé : environ {len(liens) * self.delai_entre_requetes // 60:.0f} minutes\n")
+
+        def extraire_lien(rang_lien: Tuple[int, str]) -> dict:
+            rang, lien = rang_lien
+            print(f"[{rang}/{len(liens)}]")
+            return extraire_contenu_deliberation(lien)
+
+        with ThreadPoolExecutor(max_workers=self.requetes_paralleles) as pool:
+            return list(pool.map(avec_contexte(extraire_lien), enumerate(liens, 1)))
+
+
+class SourcePdf(SourceDeliberations):
+    """Projets ou procès-verbaux publiés en un seul PDF sur le site de la commune."""
+
+    duree_cache_pdf_jours = 60
+
+    def __init__(
+        self,
+        nom: str,
+        url_liste: Callable[[], str],
+        detecter: Callable[[str], SeanceDetectee],
+        decouper: Callable[[List[str], str], List[dict]],
+    ):
+        self.nom = nom
+        self._url_liste = url_liste
+        self._detecter = detecter
+        self._decouper = decouper
+
+    def construire_url(self, commune: str, base_root: str) -> str:
+        return self._url_liste()
+
+    def detecter(self, url_base: str) -> SeanceDetectee:
+        return self._detecter(url_base)
+
+    def extraire(self, url_base: str, seance: SeanceDetectee, empreinte: Dict[str, Any]) -> List[dict]:
+        pdf_url = seance[3]
+        if not pdf_url:
+            print("Aucun PDF de séance détecté. Vérifiez la page source.")
+            return []
+        points = _extraire_points_pdf(pdf_url, self._decouper, self.nom, empreinte)
+        if not points:
+            print("Aucun point n'a pu être extrait du PDF.")
+        return points
+
+
+SOURCE_PAR_DEFAUT = SourceDeliberationsBe()
+# Communes qui ne publient pas sur deliberations.be
+SOURCES_COMMUNES: Dict[str, SourceDeliberations] = {
+    "anhee": SourcePdf("Anhée", lambda: ANHEE_PROJETS_URL, _anhee_detecter, _anhee_decouper_points),
+    "beauraing": SourcePdf(
+        "Beauraing",
+        lambda: _beauraing_url_annee(datetime.now().year),
+        _beauraing_detecter,
+        _beauraing_decouper_points,
+    ),
+}
+
+
+def source_pour_commune(commune: str) -> SourceDeliberations:
+    """Adaptateur de source d'une commune (deliberations.be par défaut)."""
+    return SOURCES_COMMUNES.get(commune, SOURCE_PAR_DEFAUT)
+
+
 # ===== PROGRAMME PRINCIPAL =====
-def parser_arguments() -> argparse.Namespace:
+def parser_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Extraction des délibérations communales.")
     parser.add_argument("--commune", default="wavre", help="Slug de la commune (ex: wavre, incourt).")
     parser.add_argument(
@@ -802,14 +1292,39 @@ def parser_arguments() -> argparse.Namespace:
     )
     parser.add_argument("--output-json", default=None, help="Chemin du fichier JSON de sortie.")
     parser.add_argument("--output-text", default=None, help="Chemin du fichier texte de sortie.")
-    return parser.parse_args()
+    parser.add_argument(
+        "--journal",
+        default=chemin_journal_par_defaut("extraction"),
+        help="Journal JSON-lines des durées (requêtes HTTP, pages PDF, attentes) ; vide pour désactiver.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=dossier_profil_par_defaut("extraction"),
+        default="",
+        help="Profile chaque étape (cProfile, tracemalloc) et écrit les profils dans ce dossier.",
+    )
+    return parser.parse_args(argv)
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """
     C'est ici que tout commence !
+
+    `argv` permet d'appeler l'extraction depuis la pipeline, dans le même processus.
     """
-    args = parser_arguments()
+    args = parser_arguments(argv)
+    configurer_journal(args.journal)
+    configurer_profilage(args.profile)
+    try:
+        with span("script", script="extraire_deliberations", commune=args.commune.strip().lower()):
+            extraire_commune(args)
+    finally:
+        ecrire_profils()
+
+
+def extraire_commune(args: argparse.Namespace) -> None:
+    """Détecte la dernière séance de la commune, extrait ses points et écrit les fichiers de sortie."""
     commune_slug = args.commune.strip().lower()
     commune_nom = _nom_commune_affichage(commune_slug)
     url_base = construire_url_base(commune_slug, args.base_root)
@@ -832,16 +1347,14 @@ def main():
     print(f"EXTRACTION DES DÉLIBÉRATIONS DU CONSEIL COMMUNAL DE {commune_nom.upper()}")
     print("="*80 + "\n")
     
-    if commune_slug == "anhee":
-        seance_id, seance_nom, pdf_url = _anhee_detecter_pdf_le_plus_recent(url_base)
-        seance_nombre_points = None
-    elif commune_slug == "beauraing":
-        seance_id, seance_nom, pdf_url = _beauraing_detecter_pdf_le_plus_recent(url_base)
-        seance_nombre_points = None
-    else:
-        pdf_url = None
-        seance_id, seance_nom, seance_nombre_points = detecter_seance_la_plus_recente(url_base)
-    
+    source = source_pour_commune(commune_slug)
+    configurer_politesse(url_base, source.delai_entre_requetes)
+    if source.duree_cache_pdf_jours:
+        purger_cache_pdf(source.duree_cache_pdf_jours)
+
+    with span("etape", etape="detection"):
+        seance = source.detecter(url_base)
+    seance_id, seance_nom, seance_nombre_points, _ = seance
     if not seance_id:
         print(
             "⚠ Séance non détectée. Extraction annulée pour éviter de parcourir "
@@ -849,56 +1362,34 @@ def main():
         )
         print("   Utilisez --force via le pipeline si vous voulez vraiment tenter une extraction complète.")
         return
-    
-    if commune_slug == "anhee":
-        if not pdf_url:
-            print("Aucun PDF de séance détecté. Vérifiez la page source.")
-            return
-        deliberations = _anhee_extraire_points_depuis_pdf(pdf_url)
-        if not deliberations:
-            print("Aucun point n'a pu être extrait du PDF.")
-            return
-        seance_nombre_points = len(deliberations)
-    elif commune_slug == "beauraing":
-        if not pdf_url:
-            print("Aucun PDF de séance détecté. Vérifiez la page source.")
-            return
-        deliberations = _beauraing_extraire_points_depuis_pdf(pdf_url)
-        if not deliberations:
-            print("Aucun point n'a pu être extrait du PDF.")
-            return
+
+    seance_pdf: Dict[str, Any] = {}
+    with span("etape", etape="extraction"):
+        deliberations = source.extraire(url_base, seance, seance_pdf)
+    if not deliberations:
+        return
+    if seance_nombre_points is None:
         seance_nombre_points = len(deliberations)
-    else:
-        # Étape 1 : Récupérer tous les liens de cette séance
-        liens = extraire_liens_deliberations(seance_id, url_base)
-        
-        if not liens:
-            print("Aucune délibération trouvée. Vérifiez l'URL.")
-            return
-        
-        # Étape 2 : Extraire le contenu de chaque délibération
-        print(f"Début de l'extraction de {len(liens)} délibérations...")
-        print(f"Temps estimé : environ {len(liens) * DELAI_ENTRE_REQUETES // 60} minutes\n")
-        
-        deliberations = []
-        for i, lien in enumerate(liens, 1):
-            print(f"[{i}/{len(liens)}]")
-            delib = extraire_contenu_deliberation(lien)
-            deliberations.append(delib)
-        if seance_nombre_points is None:
-            seance_nombre_points = len(deliberations)
-    
+
+    # Relevé local des montants, dates, lieux et procédures de chaque point,
+    # puis découpage en sections (en-tête, synthèse, visas, considérants, dispositif, annexes)
+    with span("etape", etape="enrichissement"):
+        enrichir_deliberations(deliberations)
+        ajouter_sections(deliberations)
+
     # Étape 3 : Sauvegarder les résultats
-    sauvegarder_resultats(
-        deliberations,
-        seance_id,
-        seance_nom,
-        seance_nombre_points=seance_nombre_points,
-        nom_fichier=fichier_json,
-        commune_slug=commune_slug,
-        commune_nom=commune_nom,
-    )
-    creer_resume_texte(deliberations, fichier_texte, seance_nom, commune_nom)
+    with span("etape", etape="ecriture"):
+        sauvegarder_resultats(
+            deliberations,
+            seance_id,
+            seance_nom,
+            seance_nombre_points=seance_nombre_points,
+            nom_fichier=fichier_json,
+            commune_slug=commune_slug,
+            commune_nom=commune_nom,
+            seance_pdf=seance_pdf,
+        )
+        creer_resume_texte(deliberations, fichier_texte, seance_nom, commune_nom)
     
     print("\n" + "="*80)
     print("EXTRACTION TERMINÉE !")
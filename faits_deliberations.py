@@ -0,0 +1,251 @@
+import argparse
+import json
+import re
+import unicodedata
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+MOIS_FR = {
+    "janvier": 1,
+    "fevrier": 2,
+    "mars": 3,
+    "avril": 4,
+    "mai": 5,
+    "juin": 6,
+    "juillet": 7,
+    "aout": 8,
+    "septembre": 9,
+    "octobre": 10,
+    "novembre": 11,
+    "decembre": 12,
+}
+
+# Séparateurs de milliers rencontrés : point, espace, espace insécable (pas de retour à la ligne).
+_SEPARATEUR_MILLIERS = r"[.   ]"
+_NOMBRE = rf"\d{{1,3}}(?:{_SEPARATEUR_MILLIERS}\d{{3}})+(?:,\d{{1,2}})?|\d+(?:,\d{{1,2}})?"
+MOTIF_MONTANT = re.compile(
+    rf"(?:€|EUR)[  ]?(?P<avant>{_NOMBRE})(?![\d,])"
+    rf"|(?<![\d.,])(?P<apres>{_NOMBRE})[  ]?(?:€|EUR\b|euros?\b)",
+    re.IGNORECASE,
+)
+MOTIF_TVA = re.compile(
+    r"^[\s,(]*(?P<tva>HTVA|H\.T\.V\.A\.?|hors TVA|TVAC|T\.V\.A\.C\.?|TVA comprise|TTC|HT\b)",
+    re.IGNORECASE,
+)
+MOTIF_DATE_TEXTE = re.compile(
+    r"\b(\d{1,2})(?:er)?[  ]+(janvier|f[ée]vrier|mars|avril|mai|juin|juillet|ao[uû]t|septembre|octobre|"
+    r"novembre|d[ée]cembre)[  ]+(\d{4})\b",
+    re.IGNORECASE,
+)
+MOTIF_DATE_CHIFFRES = re.compile(r"\b(\d{1,2})[/.](\d{1,2})[/.](\d{4})\b")
+# Mots qui désignent aussi autre chose qu'une voirie ("mise en place", "exercice clos").
+VOIRIES_NOMS_COMMUNS = "place|route|parc|clos|chemin|sentier|allée|quai|square"
+MOTIF_RUE = re.compile(
+    r"\b(?:(?P<nom_commun>" + VOIRIES_NOMS_COMMUNS + r")"
+    r"|(?i:rue|avenue|chaussée|boulevard|drève|impasse|ruelle|venelle|rond-point)"
+    r"|(?=[A-ZÀ-Ý])(?i:" + VOIRIES_NOMS_COMMUNS + r"))"
+    r"(?P<particule>[  ]+(?:de la|de l'|de l’|des|du|de|d'|d’|aux|au|à la|la|le|les))?"
+    # Un tel mot en minuscule suivi d'un déterminant en majuscule n'est pas une voirie
+    # ("mise en place Des panneaux") ; "rue Le Brouc" et "place de La Roche" le sont.
+    r"[  ]*(?(nom_commun)(?(particule)|(?!(?:De|Du|Des|La|Le|Les|Un|Une|Au|Aux)\b|[LD]['’])))"
+    r"[A-ZÀ-Ý][\w'’\-]+(?:[  ]+(?:[A-ZÀ-Ý][\w'’\-]+|de|du|des|la|le|d'|d’)){0,4}",
+)
+MOTIF_DUREE = re.compile(
+    r"\b(?:pour une|d'une|sur une|durée de)[  ]+(?:durée[  ]+(?:de|d'))?[  ]*"
+    r"(\d+|un|une|deux|trois|quatre|cinq|six|dix)[  ]+(ans?|années?|mois|semaines?|jours?)\b",
+    re.IGNORECASE,
+)
+PROCEDURES_MARCHES = (
+    "procédure négociée sans publication préalable",
+    "procédure négociée directe avec publication préalable",
+    "procédure concurrentielle avec négociation",
+    "procédure ouverte",
+    "procédure restreinte",
+    "marché de faible montant",
+    "accord-cadre",
+    "centrale d'achat",
+    "centrale de marchés",
+    "concession de services",
+    "concession de travaux",
+    "adjudication",
+)
+MAX_FAITS_PAR_TYPE = 8
+
+
+def _sans_accents(texte: str) -> str:
+    decompose = unicodedata.normalize("NFD", texte)
+    return "".join(car for car in decompose if unicodedata.category(car) != "Mn")
+
+
+def _valeur_nombre(nombre: str) -> Optional[float]:
+    propre = re.sub(_SEPARATEUR_MILLIERS, "", nombre).replace(",", ".")
+    try:
+        return float(propre)
+    except ValueError:
+        return None
+
+
+def _ajouter_unique(liste: List[Any], element: Any) -> None:
+    if element not in liste and len(liste) < MAX_FAITS_PAR_TYPE:
+        liste.append(element)
+
+
+def extraire_montants(texte: str) -> List[Dict[str, Any]]:
+    """Montants en euros au format belge, avec la mention HTVA/TVAC qui les suit éventuellement."""
+    montants: List[Dict[str, Any]] = []
+    for correspondance in MOTIF_MONTANT.finditer(texte):
+        nombre = correspondance.group("avant") or correspondance.group("apres")
+        valeur = _valeur_nombre(nombre)
+        if valeur is None or valeur == 0:
+            continue
+        tva = MOTIF_TVA.match(texte[correspondance.end():correspondance.end() + 20])
+        mention = None
+        if tva:
+            mention = "TVAC" if re.search(r"TVAC|T\.V\.A\.C|comprise|TTC", tva.group("tva"), re.IGNORECASE) else "HTVA"
+        deja_vu = next((montant for montant in montants if montant["valeur"] == valeur), None)
+        if deja_vu:
+            deja_vu["tva"] = deja_vu["tva"] or mention
+            continue
+        _ajouter_unique(montants, {"valeur": valeur, "texte": " ".join(correspondance.group(0).split()), "tva": mention})
+    return montants
+
+
+def extraire_dates(texte: str) -> List[str]:
+    """Dates citées dans le texte, au format ISO, hors visas ("Vu le décret du ...")."""
+    texte = "\n".join(ligne for ligne in texte.splitlines() if not ligne.lstrip().startswith("Vu "))
+    dates: List[str] = []
+    for correspondance in MOTIF_DATE_TEXTE.finditer(texte):
+        mois = MOIS_FR.get(_sans_accents(correspondance.group(2)).casefold())
+        try:
+            _ajouter_unique(dates, date(int(correspondance.group(3)), mois, int(correspondance.group(1))).isoformat())
+        except (TypeError, ValueError):
+            continue
+    for correspondance in MOTIF_DATE_CHIFFRES.finditer(texte):
+        try:
+            jour, mois, annee = (int(groupe) for groupe in correspondance.groups())
+            _ajouter_unique(dates, date(annee, mois, jour).isoformat())
+        except ValueError:
+            continue
+    return dates
+
+
+def extraire_lieux(texte: str) -> List[str]:
+    """Noms de voiries (rue, avenue, chaussée, place...) cités dans le texte."""
+    lieux: List[str] = []
+    for correspondance in MOTIF_RUE.finditer(texte):
+        lieu = " ".join(correspondance.group(0).replace("’", "'").split()).rstrip(" ,;.")
+        lieu = re.sub(r"\s+(de|du|des|la|le|d'|d’)$", "", lieu)
+        _ajouter_unique(lieux, lieu[0].upper() + lieu[1:])
+    return lieux
+
+
+def extraire_procedures(texte: str) -> List[str]:
+    """Procédures de marché public reconnues par dictionnaire."""
+    texte_normalise = _sans_accents(texte).casefold()
+    return [
+        procedure
+        for procedure in PROCEDURES_MARCHES
+        if _sans_accents(procedure).casefold() in texte_normalise
+    ]
+
+
+def extraire_durees(texte: str) -> List[str]:
+    """Durées de contrat, de convention ou de mesure ("pour une durée de 3 ans")."""
+    durees: List[str] = []
+    for correspondance in MOTIF_DUREE.finditer(texte):
+        _ajouter_unique(durees, f"{correspondance.group(1)} {correspondance.group(2)}".lower())
+    return durees
+
+
+def extraire_faits(contenu: str) -> Dict[str, Any]:
+    """Faits structurés d'un point : montants, dates, lieux, procédures et durées."""
+    contenu = contenu or ""
+    return {
+        "montants": extraire_montants(contenu),
+        "dates": extraire_dates(contenu),
+        "lieux": extraire_lieux(contenu),
+        "procedures": extraire_procedures(contenu),
+        "durees": extraire_durees(contenu),
+    }
+
+
+def faits_du_point(deliberation: Dict[str, Any]) -> Dict[str, Any]:
+    """Faits stockés lors de l'extraction, ou recalculés pour les anciens fichiers."""
+    faits = deliberation.get("faits")
+    if isinstance(faits, dict):
+        return faits
+    return extraire_faits(deliberation.get("contenu", ""))
+
+
+def _formater_montant(montant: Dict[str, Any]) -> str:
+    entier, _, decimales = f"{montant['valeur']:,.2f}".partition(".")
+    texte = entier.replace(",", ".") + ("," + decimales if decimales != "00" else "") + " €"
+    return f"{texte} {montant['tva']}" if montant.get("tva") else texte
+
+
+def resumer_faits(faits: Dict[str, Any], max_elements: int = 4) -> str:
+    """Version compacte d'une ligne, à injecter dans les prompts."""
+    parties = []
+    if faits.get("montants"):
+        parties.append("montants " + " ; ".join(_formater_montant(m) for m in faits["montants"][:max_elements]))
+    if faits.get("procedures"):
+        parties.append(" ; ".join(faits["procedures"][:2]))
+    if faits.get("durees"):
+        parties.append("durée " + " ; ".join(faits["durees"][:2]))
+    if faits.get("lieux"):
+        parties.append("lieux " + " ; ".join(faits["lieux"][:max_elements]))
+    if faits.get("dates"):
+        parties.append("dates " + " ; ".join(faits["dates"][:max_elements]))
+    return " | ".join(parties)
+
+
+def enrichir_deliberations(deliberations: List[Dict[str, Any]]) -> None:
+    """Ajoute le champ `faits` à chaque point extrait."""
+    for deliberation in deliberations:
+        deliberation["faits"] = extraire_faits(deliberation.get("contenu", ""))
+
+
+# ===== STATISTIQUES SANS APPEL AU MODÈLE =====
+def statistiques_faits(deliberations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Agrège les faits d'une séance : volumes et montant maximal par point."""
+    total_max = 0.0
+    points_avec_montant = 0
+    procedures: Dict[str, int] = {}
+    for deliberation in deliberations:
+        faits = faits_du_point(deliberation)
+        if faits["montants"]:
+            points_avec_montant += 1
+            total_max += max(montant["valeur"] for montant in faits["montants"])
+        for procedure in faits["procedures"]:
+            procedures[procedure] = procedures.get(procedure, 0) + 1
+    return {
+        "points": len(deliberations),
+        "points_avec_montant": points_avec_montant,
+        "somme_montants_max": round(total_max, 2),
+        "procedures": procedures,
+    }
+
+
+def parser_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Statistiques locales des faits extraits des délibérations.")
+    parser.add_argument("fichiers", nargs="+", help="Fichiers deliberations_<commune>.json.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parser_arguments()
+    for fichier in args.fichiers:
+        with open(fichier, "r", encoding="utf-8") as handle:
+            donnees = json.load(handle)
+        deliberations = donnees.get("deliberations", []) if isinstance(donnees, dict) else donnees
+        stats = statistiques_faits(deliberations)
+        procedures = ", ".join(f"{nom} ({nombre})" for nom, nombre in sorted(stats["procedures"].items())) or "-"
+        print(
+            f"{fichier} : {stats['points']} point(s), {stats['points_avec_montant']} avec montant, "
+            f"somme des montants principaux {_formater_montant({'valeur': stats['somme_montants_max']})} ; "
+            f"procédures : {procedures}"
+        )
+
+
+if __name__ == "__main__":
+    main()
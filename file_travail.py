@@ -0,0 +1,331 @@
+import argparse
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cadence_publication import charger_historique, fusionner_observations, ordonner_par_imminence
+from extraire_deliberations import VARIABLE_BASE_POLITESSE
+from pipeline_journalistique import RACINE, analyser_regroupees, chemins_sortie, compiler_html, executer_etapes
+
+# Attente maximale entre deux tentatives de réservation quand toutes les
+# communes restantes sont prises par d'autres travailleurs.
+ATTENTE_RESERVATION_MAX = 5.0
+
+# Journal SQLite classique (pas de WAL) : la base peut se trouver sur un
+# partage réseau, où WAL n'est pas fiable. Les baux sont datés en temps Unix :
+# les horloges des machines doivent être synchronisées (NTP).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lots (
+    lot TEXT PRIMARY KEY,
+    communes TEXT NOT NULL,
+    groupes TEXT NOT NULL,
+    cree REAL NOT NULL,
+    fusion TEXT
+);
+CREATE TABLE IF NOT EXISTS taches (
+    lot TEXT NOT NULL,
+    commune TEXT NOT NULL,
+    rang INTEGER NOT NULL,
+    statut TEXT NOT NULL DEFAULT 'attente',
+    tentatives INTEGER NOT NULL DEFAULT 0,
+    travailleur TEXT,
+    bail_expire REAL,
+    erreur TEXT,
+    observations TEXT,
+    PRIMARY KEY (lot, commune)
+);
+CREATE TABLE IF NOT EXISTS resultats (
+    lot TEXT NOT NULL,
+    commune TEXT NOT NULL,
+    fichier TEXT NOT NULL,
+    contenu BLOB NOT NULL,
+    PRIMARY KEY (lot, commune, fichier)
+);
+-- Seaux à jetons des hôtes, communs à tous les travailleurs (LimiteurHote d'extraire_deliberations).
+CREATE TABLE IF NOT EXISTS hotes (
+    hote TEXT PRIMARY KEY,
+    jetons REAL NOT NULL,
+    horodatage REAL NOT NULL
+);
+"""
+
+
+def lot_par_defaut() -> str:
+    return f"{datetime.now(timezone.utc):%Y-%m-%d}"
+
+
+def travailleur_par_defaut() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class FileTravail:
+    """
+    File de communes d'un lot, partagée par plusieurs travailleurs via SQLite.
+
+    Chaque commune réservée l'est pour la durée d'un bail, que le travailleur
+    renouvelle tant qu'il vit ; un bail expiré rend la commune à la file
+    jusqu'à `tentatives_max` essais. Les requêtes vers un même site puisent
+    dans un seau à jetons commun (table `hotes`) : les travailleurs extraient
+    en même temps, sous le débit maximal du site.
+    """
+
+    def __init__(self, chemin: str, lot: str, travailleur: str, bail_s: float, tentatives_max: int) -> None:
+        self.chemin = chemin
+        self.lot = lot
+        self.travailleur = travailleur
+        self.bail_s = bail_s
+        self.tentatives_max = max(1, tentatives_max)
+        self._local = threading.local()
+        self._connexion().executescript(SCHEMA)
+
+    def _connexion(self) -> sqlite3.Connection:
+        # Une connexion par thread : l'extraction, l'analyse et le battement
+        # de cœur accèdent à la base depuis des threads différents.
+        connexion = getattr(self._local, "connexion", None)
+        if connexion is None:
+            connexion = sqlite3.connect(self.chemin, timeout=60, isolation_level=None)
+            self._local.connexion = connexion
+        return connexion
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connexion = self._connexion()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield connexion
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        connexion.execute("COMMIT")
+
+    def preparer_lot(self, communes: List[str], groupes: List[str], rangs: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Crée le lot s'il n'existe pas encore (communes prises dans l'ordre de
+        `rangs`) ; sinon le travailleur rejoint le lot existant. Retourne les
+        communes et groupes du lot, dans l'ordre de la page HTML.
+        """
+        with self._transaction() as connexion:
+            ligne = connexion.execute("SELECT communes, groupes FROM lots WHERE lot = ?", (self.lot,)).fetchone()
+            if ligne is not None:
+                return json.loads(ligne[0]), json.loads(ligne[1])
+            connexion.execute(
+                "INSERT INTO lots (lot, communes, groupes, cree) VALUES (?, ?, ?, ?)",
+                (self.lot, json.dumps(communes), json.dumps(groupes), time.time()),
+            )
+            connexion.executemany(
+                "INSERT INTO taches (lot, commune, rang) VALUES (?, ?, ?)",
+                [(self.lot, commune, rang) for rang, commune in enumerate(rangs)],
+            )
+        return communes, groupes
+
+    def reserver(self) -> Optional[str]:
+        """Réserve la prochaine commune libre (ou dont le bail a expiré), la plus imminente d'abord."""
+        maintenant = time.time()
+        with self._transaction() as connexion:
+            connexion.execute(
+                "UPDATE taches SET statut = 'echec', erreur = COALESCE(erreur, 'bail expiré') "
+                "WHERE lot = ? AND statut = 'en_cours' AND bail_expire < ? AND tentatives >= ?",
+                (self.lot, maintenant, self.tentatives_max),
+            )
+            # Une commune qui vient d'échouer chez ce travailleur passe après les autres :
+            # un autre travailleur a plus de chances de la réussir.
+            ligne = connexion.execute(
+                "SELECT commune FROM taches WHERE lot = ? "
+                "AND (statut = 'attente' OR (statut = 'en_cours' AND bail_expire < ?)) "
+                "ORDER BY (erreur IS NOT NULL AND travailleur = ?), rang LIMIT 1",
+                (self.lot, maintenant, self.travailleur),
+            ).fetchone()
+            if ligne is None:
+                return None
+            connexion.execute(
+                "UPDATE taches SET statut = 'en_cours', travailleur = ?, bail_expire = ?, tentatives = tentatives + 1 "
+                "WHERE lot = ? AND commune = ?",
+                (self.travailleur, maintenant + self.bail_s, self.lot, ligne[0]),
+            )
+        return ligne[0]
+
+    def prolonger(self) -> None:
+        """Battement de cœur : renouvelle les baux des communes de ce travailleur."""
+        with self._transaction() as connexion:
+            connexion.execute(
+                "UPDATE taches SET bail_expire = ? WHERE lot = ? AND statut = 'en_cours' AND travailleur = ?",
+                (time.time() + self.bail_s, self.lot, self.travailleur),
+            )
+
+    def terminer(self, commune: str, fichiers: Dict[str, bytes], observations: List[Dict[str, Any]]) -> None:
+        """Enregistre les sorties de la commune dans la base et la marque terminée."""
+        with self._transaction() as connexion:
+            connexion.executemany(
+                "INSERT OR REPLACE INTO resultats (lot, commune, fichier, contenu) VALUES (?, ?, ?, ?)",
+                [(self.lot, commune, fichier, contenu) for fichier, contenu in fichiers.items()],
+            )
+            connexion.execute(
+                "UPDATE taches SET statut = 'terminee', erreur = NULL, observations = ?, bail_expire = NULL "
+                "WHERE lot = ? AND commune = ? AND travailleur = ?",
+                (json.dumps(observations, ensure_ascii=False), self.lot, commune, self.travailleur),
+            )
+
+    def echouer(self, commune: str, erreur: str) -> str:
+        """Rend la commune à la file, ou l'abandonne après `tentatives_max` essais ; retourne le nouveau statut."""
+        with self._transaction() as connexion:
+            connexion.execute(
+                "UPDATE taches SET statut = CASE WHEN tentatives >= ? THEN 'echec' ELSE 'attente' END, "
+                "erreur = ?, bail_expire = NULL WHERE lot = ? AND commune = ? AND travailleur = ?",
+                (self.tentatives_max, erreur, self.lot, commune, self.travailleur),
+            )
+            ligne = connexion.execute(
+                "SELECT statut FROM taches WHERE lot = ? AND commune = ?", (self.lot, commune)
+            ).fetchone()
+        return ligne[0]
+
+    def etat(self) -> Dict[str, int]:
+        """Nombre de communes du lot par statut (attente, en_cours, terminee, echec)."""
+        lignes = self._connexion().execute(
+            "SELECT statut, COUNT(*) FROM taches WHERE lot = ? GROUP BY statut", (self.lot,)
+        ).fetchall()
+        return {"attente": 0, "en_cours": 0, "terminee": 0, "echec": 0, **dict(lignes)}
+
+    def echecs(self) -> List[Tuple[str, str]]:
+        return self._connexion().execute(
+            "SELECT commune, COALESCE(erreur, '') FROM taches WHERE lot = ? AND statut = 'echec' ORDER BY rang",
+            (self.lot,),
+        ).fetchall()
+
+    def prochaine_expiration(self) -> Optional[float]:
+        ligne = self._connexion().execute(
+            "SELECT MIN(bail_expire) FROM taches WHERE lot = ? AND statut = 'en_cours'", (self.lot,)
+        ).fetchone()
+        return ligne[0] if ligne else None
+
+    def revendiquer_fusion(self) -> bool:
+        """Vrai pour un seul travailleur, une fois toutes les communes du lot terminées ou abandonnées."""
+        with self._transaction() as connexion:
+            restantes = connexion.execute(
+                "SELECT COUNT(*) FROM taches WHERE lot = ? AND statut IN ('attente', 'en_cours')", (self.lot,)
+            ).fetchone()[0]
+            if restantes:
+                return False
+            curseur = connexion.execute(
+                "UPDATE lots SET fusion = ? WHERE lot = ? AND fusion IS NULL", (self.travailleur, self.lot)
+            )
+            return curseur.rowcount == 1
+
+    def abandonner_fusion(self) -> None:
+        with self._transaction() as connexion:
+            connexion.execute(
+                "UPDATE lots SET fusion = NULL WHERE lot = ? AND fusion = ?", (self.lot, self.travailleur)
+            )
+
+    def resultats(self) -> Iterator[Tuple[str, str, bytes]]:
+        yield from self._connexion().execute(
+            "SELECT commune, fichier, contenu FROM resultats WHERE lot = ? ORDER BY commune, fichier", (self.lot,)
+        )
+
+    def observations(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        for commune, observations in self._connexion().execute(
+            "SELECT commune, observations FROM taches WHERE lot = ? AND observations IS NOT NULL", (self.lot,)
+        ):
+            yield commune, json.loads(observations)
+
+
+def fichiers_resultat(commune: str) -> Dict[str, bytes]:
+    """Délibérations extraites et analyse de la commune, par chemin relatif au dépôt."""
+    fichiers = {}
+    for chemin in chemins_sortie(commune)[:3]:
+        if chemin.exists():
+            fichiers[chemin.relative_to(RACINE).as_posix()] = chemin.read_bytes()
+    return fichiers
+
+
+def fusionner_lot(file: FileTravail, args: argparse.Namespace, communes: List[str], groupes: List[str]) -> None:
+    """Recopie localement les sorties de tous les travailleurs, puis compile la page HTML du lot."""
+    ecrits = 0
+    for _, fichier, contenu in file.resultats():
+        chemin = RACINE / fichier
+        if not chemin.exists() or chemin.read_bytes() != contenu:
+            chemin.write_bytes(contenu)
+            ecrits += 1
+    for commune, observations in file.observations():
+        fusionner_observations(commune, observations)
+    print(f"✓ Fusion du lot {file.lot} : {ecrits} fichier(s) mis à jour depuis la file de travail")
+    compiler_html(args, communes, groupes)
+
+
+def executer_travailleur(args: argparse.Namespace, communes: List[str], groupes: List[str]) -> None:
+    """
+    Mode travailleur : réserve une à une les communes du lot dans la file
+    partagée, les extrait et les analyse comme une exécution classique, puis
+    dépose leurs sorties dans la file. Le dernier travailleur à terminer
+    fusionne les sorties de tous et compile la page HTML.
+    """
+    file = FileTravail(
+        args.file_travail,
+        args.lot or lot_par_defaut(),
+        args.travailleur or travailleur_par_defaut(),
+        args.bail * 60,
+        args.tentatives_max,
+    )
+    communes, groupes = file.preparer_lot(communes, groupes, ordonner_par_imminence(communes))
+    # Hérité par les étapes lancées en sous-processus (--sous-processus).
+    os.environ[VARIABLE_BASE_POLITESSE] = os.path.abspath(args.file_travail)
+    print("=" * 80)
+    print(f"Travailleur {file.travailleur} : lot {file.lot} de {len(communes)} commune(s) ({args.file_travail})")
+    print("=" * 80)
+
+    arret = threading.Event()
+
+    def battre() -> None:
+        while not arret.wait(file.bail_s / 3):
+            file.prolonger()
+
+    battement = threading.Thread(target=battre, name="battement", daemon=True)
+    battement.start()
+    traitees = 0
+    try:
+        while True:
+            commune = file.reserver()
+            if commune is None:
+                etat = file.etat()
+                if not etat["attente"] and not etat["en_cours"]:
+                    break
+                # Communes prises par d'autres travailleurs : on attend leur fin,
+                # ou l'expiration d'un bail abandonné pour reprendre la commune.
+                expiration = file.prochaine_expiration() or time.time()
+                time.sleep(min(ATTENTE_RESERVATION_MAX, max(0.1, expiration - time.time())))
+                continue
+            resultats = executer_etapes([commune], args, len(communes))
+            analyser_regroupees(args, resultats)
+            if commune in resultats.echecs:
+                statut = file.echouer(commune, resultats.erreurs.get(commune, "erreur inconnue"))
+                print(f"⚠ {commune} : échec, commune {'abandonnée' if statut == 'echec' else 'rendue à la file'}")
+                continue
+            file.terminer(commune, fichiers_resultat(commune), charger_historique([commune])[commune])
+            traitees += 1
+    finally:
+        arret.set()
+        battement.join()
+
+    etat = file.etat()
+    print("=" * 80)
+    print(
+        f"Travailleur {file.travailleur} : {traitees} commune(s) traitée(s) ; lot {file.lot} : "
+        f"{etat['terminee']} terminée(s), {etat['echec']} abandonnée(s)"
+    )
+    for commune, erreur in file.echecs():
+        print(f"- {commune} : {erreur}")
+    print("=" * 80)
+    if file.revendiquer_fusion():
+        try:
+            fusionner_lot(file, args, communes, groupes)
+        except Exception:
+            # Un autre travailleur (ou une relance) pourra refaire la fusion.
+            file.abandonner_fusion()
+            raise
+    if not etat["terminee"]:
+        raise RuntimeError("Aucune commune du lot n'a pu être traitée avec succès.")
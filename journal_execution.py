@@ -0,0 +1,317 @@
+import argparse
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DOSSIER_JOURNAUX = "journaux"
+# Variable d'environnement transmise aux sous-processus : span parent de leurs spans.
+VARIABLE_PARENT = "JOURNAL_EXECUTION_PARENT"
+# Spans dont le nom seul ne suffit pas à lire le rapport : on y ajoute cet attribut.
+ATTRIBUT_DETAIL = {"commune": "etape", "etape": "etape", "http": "methode", "attente": "motif"}
+
+_SPAN_COURANT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span_courant", default=None)
+_JOURNAL: Optional["JournalExecution"] = None
+_VERROU_JOURNAL = threading.Lock()
+
+
+class JournalExecution:
+    """Fichier JSON-lines partagé par les threads (et, en ajout, par les sous-processus)."""
+
+    def __init__(self, chemin: Path) -> None:
+        self.chemin = chemin
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._fichier = self.chemin.open("a", encoding="utf-8")
+        self._verrou = threading.Lock()
+        self._compteur = itertools.count(1)
+        self.parent_racine = os.environ.get(VARIABLE_PARENT)
+
+    def nouvel_identifiant(self) -> str:
+        return f"{os.getpid()}-{next(self._compteur)}"
+
+    def ecrire(self, enregistrement: Dict[str, Any]) -> None:
+        ligne = json.dumps(enregistrement, ensure_ascii=False, default=str) + "\n"
+        with self._verrou:
+            self._fichier.write(ligne)
+            self._fichier.flush()
+
+    def fermer(self) -> None:
+        with self._verrou:
+            self._fichier.close()
+
+
+class Span:
+    """Intervalle de temps mesuré ; `attributs` peut être complété avant la fin (statut, octets, tokens...)."""
+
+    def __init__(self, nom: str, identifiant: str, parent: Optional[str], attributs: Dict[str, Any]) -> None:
+        self.nom = nom
+        self.identifiant = identifiant
+        self.parent = parent
+        self.attributs = attributs
+        self.debut = time.time()
+        self._debut_mesure = time.perf_counter()
+
+    def enregistrement(self) -> Dict[str, Any]:
+        return {
+            **self.attributs,
+            "nom": self.nom,
+            "id": self.identifiant,
+            "parent": self.parent,
+            "debut": round(self.debut, 6),
+            "duree_s": round(time.perf_counter() - self._debut_mesure, 6),
+            "thread": threading.current_thread().name,
+        }
+
+
+def chemin_journal_par_defaut(script: str) -> str:
+    """Chemin horodaté d'un nouveau journal, dans DOSSIER_JOURNAUX."""
+    return str(Path(DOSSIER_JOURNAUX) / f"{script}-{datetime.now():%Y%m%d-%H%M%S}.jsonl")
+
+
+def configurer_journal(chemin: Optional[str]) -> Optional[JournalExecution]:
+    """
+    Ouvre le journal de l'exécution. Un journal déjà ouvert sur le même
+    fichier est conservé (scripts appelés dans le processus de la pipeline) ;
+    un chemin vide désactive la journalisation.
+    """
+    global _JOURNAL
+    with _VERROU_JOURNAL:
+        if not chemin:
+            return _JOURNAL
+        cible = Path(chemin).resolve()
+        if _JOURNAL is not None and _JOURNAL.chemin == cible:
+            return _JOURNAL
+        if _JOURNAL is not None:
+            _JOURNAL.fermer()
+        _JOURNAL = JournalExecution(cible)
+        return _JOURNAL
+
+
+def span_courant() -> Optional[Span]:
+    return _SPAN_COURANT.get()
+
+
+@contextlib.contextmanager
+def span(nom: str, **attributs: Any) -> Iterator[Optional[Span]]:
+    """
+    Mesure un bloc et l'écrit dans le journal à sa sortie, avec son parent.
+    L'attribut `commune` est hérité du span englobant. Sans journal actif,
+    ne fait rien et produit None.
+    """
+    journal = _JOURNAL
+    if journal is None:
+        yield None
+        return
+    parent = _SPAN_COURANT.get()
+    if "commune" not in attributs and parent is not None and "commune" in parent.attributs:
+        attributs["commune"] = parent.attributs["commune"]
+    courant = Span(
+        nom,
+        journal.nouvel_identifiant(),
+        parent.identifiant if parent else journal.parent_racine,
+        attributs,
+    )
+    jeton = _SPAN_COURANT.set(courant)
+    try:
+        yield courant
+    except BaseException as exc:
+        courant.attributs.setdefault("erreur", f"{exc.__class__.__name__}: {exc}")
+        raise
+    finally:
+        _SPAN_COURANT.reset(jeton)
+        journal.ecrire(courant.enregistrement())
+
+
+def enregistrer_span(nom: str, duree: float, debut: Optional[float] = None, **attributs: Any) -> None:
+    """
+    Écrit un span mesuré ailleurs (ex. une page de PDF lue dans un processus
+    du pool) ; `debut` (horodatage) vaut par défaut maintenant moins `duree`.
+    """
+    journal = _JOURNAL
+    if journal is None:
+        return
+    parent = _SPAN_COURANT.get()
+    if "commune" not in attributs and parent is not None and "commune" in parent.attributs:
+        attributs["commune"] = parent.attributs["commune"]
+    journal.ecrire(
+        {
+            **attributs,
+            "nom": nom,
+            "id": journal.nouvel_identifiant(),
+            "parent": parent.identifiant if parent else journal.parent_racine,
+            "debut": round(time.time() - duree if debut is None else debut, 6),
+            "duree_s": round(duree, 6),
+            "thread": threading.current_thread().name,
+        }
+    )
+
+
+def avec_contexte(fonction: Callable[..., Any]) -> Callable[..., Any]:
+    """Enveloppe `fonction` pour qu'elle s'exécute, dans un autre thread, sous le span courant."""
+    contexte = contextvars.copy_context()
+
+    def executer(*arguments: Any, **options: Any) -> Any:
+        return contexte.copy().run(fonction, *arguments, **options)
+
+    return executer
+
+
+def environnement_enfant() -> Dict[str, str]:
+    """Environnement d'un sous-processus : ses spans se rattachent au span courant."""
+    environnement = dict(os.environ)
+    courant = span_courant()
+    if courant is not None:
+        environnement[VARIABLE_PARENT] = courant.identifiant
+    return environnement
+
+
+# ===== RAPPORT =====
+def lire_journal(chemin: str) -> List[Dict[str, Any]]:
+    spans = []
+    with open(chemin, "r", encoding="utf-8") as handle:
+        for ligne in handle:
+            ligne = ligne.strip()
+            if ligne:
+                try:
+                    spans.append(json.loads(ligne))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def _cle_rapport(enregistrement: Dict[str, Any]) -> str:
+    detail = ATTRIBUT_DETAIL.get(enregistrement["nom"])
+    if detail and enregistrement.get(detail):
+        return f"{enregistrement['nom']}:{enregistrement[detail]}"
+    return enregistrement["nom"]
+
+
+def _duree_couverte(intervalles: List[Tuple[float, float]]) -> float:
+    """Durée de l'union d'intervalles : des enfants parallèles ne comptent qu'une fois."""
+    total = 0.0
+    fin_courante = float("-inf")
+    for debut, fin in sorted(intervalles):
+        debut = max(debut, fin_courante)
+        if fin > debut:
+            total += fin - debut
+        fin_courante = max(fin_courante, fin)
+    return total
+
+
+def resumer_journal(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Agrège les spans : temps total et temps propre (hors sous-spans, y compris
+    ceux exécutés dans d'autres threads) par type, volumes HTTP et tokens du
+    modèle, durée par commune.
+    """
+    enfants: Dict[str, List[Tuple[float, float]]] = {}
+    for enregistrement in spans:
+        if enregistrement.get("parent"):
+            enfants.setdefault(enregistrement["parent"], []).append(
+                (enregistrement["debut"], enregistrement["debut"] + enregistrement["duree_s"])
+            )
+
+    par_type: Dict[str, Dict[str, float]] = {}
+    for enregistrement in spans:
+        debut, fin = enregistrement["debut"], enregistrement["debut"] + enregistrement["duree_s"]
+        couverte = _duree_couverte(
+            [(max(debut, a), min(fin, b)) for a, b in enfants.get(enregistrement["id"], [])]
+        )
+        propre = enregistrement["duree_s"] - couverte
+        stats = par_type.setdefault(_cle_rapport(enregistrement), {"nombre": 0, "total_s": 0.0, "propre_s": 0.0})
+        stats["nombre"] += 1
+        stats["total_s"] += enregistrement["duree_s"]
+        stats["propre_s"] += max(0.0, propre)
+
+    http = [enregistrement for enregistrement in spans if enregistrement["nom"] == "http"]
+    statuts: Dict[str, int] = {}
+    for requete in http:
+        statut = str(requete.get("statut", "erreur"))
+        statuts[statut] = statuts.get(statut, 0) + 1
+    appels = [enregistrement for enregistrement in spans if enregistrement["nom"] == "appel_modele"]
+    communes: Dict[str, float] = {}
+    for enregistrement in spans:
+        if enregistrement["nom"] == "commune":
+            communes[enregistrement["commune"]] = communes.get(enregistrement["commune"], 0.0) + enregistrement["duree_s"]
+
+    racines = [enregistrement for enregistrement in spans if enregistrement["nom"] in ("pipeline", "script")]
+    return {
+        "spans": len(spans),
+        "duree_s": max((racine["duree_s"] for racine in racines), default=0.0),
+        "par_type": par_type,
+        "http": {
+            "requetes": len(http),
+            "octets": sum(requete.get("octets", 0) or 0 for requete in http),
+            "latence_moyenne_s": sum(requete["duree_s"] for requete in http) / len(http) if http else 0.0,
+            "statuts": statuts,
+        },
+        "modele": {
+            "appels": len(appels),
+            "tokens_entree": sum(appel.get("tokens_entree", 0) or 0 for appel in appels),
+            "tokens_sortie": sum(appel.get("tokens_sortie", 0) or 0 for appel in appels),
+            "latence_moyenne_s": sum(appel["duree_s"] for appel in appels) / len(appels) if appels else 0.0,
+        },
+        "communes": communes,
+    }
+
+
+def afficher_resume(resume: Dict[str, Any], nombre: int = 10) -> None:
+    print("=" * 80)
+    print("BILAN DU JOURNAL D'EXÉCUTION")
+    print("=" * 80)
+    print(f"Spans              : {resume['spans']} (exécution de {resume['duree_s']:.1f} s)")
+    print("Plus gros consommateurs (temps propre, hors sous-spans) :")
+    classement = sorted(resume["par_type"].items(), key=lambda item: item[1]["propre_s"], reverse=True)
+    for cle, stats in classement[:nombre]:
+        print(f"  {cle:<32} {stats['propre_s']:>8.1f} s propres, {stats['total_s']:>8.1f} s au total, x{int(stats['nombre'])}")
+    http = resume["http"]
+    if http["requetes"]:
+        statuts = ", ".join(f"{statut}: {nombre}" for statut, nombre in sorted(http["statuts"].items()))
+        print(
+            f"HTTP               : {http['requetes']} requête(s), {http['octets'] // 1024} Ko, "
+            f"latence moyenne {http['latence_moyenne_s']:.2f} s ({statuts})"
+        )
+    modele = resume["modele"]
+    if modele["appels"]:
+        print(
+            f"Modèle             : {modele['appels']} appel(s), {modele['tokens_entree']} tokens en entrée, "
+            f"{modele['tokens_sortie']} en sortie, latence moyenne {modele['latence_moyenne_s']:.2f} s"
+        )
+    if resume["communes"]:
+        lentes = sorted(resume["communes"].items(), key=lambda item: item[1], reverse=True)[:5]
+        print("Communes les plus longues : " + ", ".join(f"{commune} ({duree:.1f} s)" for commune, duree in lentes))
+    print("=" * 80)
+
+
+def parser_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Résume un journal d'exécution JSON-lines.")
+    parser.add_argument("journal", nargs="?", default=None, help="Fichier .jsonl (par défaut : le plus récent).")
+    parser.add_argument("--nombre", type=int, default=10, help="Nombre de types de spans affichés.")
+    return parser.parse_args()
+
+
+def _journal_le_plus_recent() -> Optional[str]:
+    journaux: List[Tuple[float, str]] = [
+        (chemin.stat().st_mtime, str(chemin)) for chemin in Path(DOSSIER_JOURNAUX).glob("*.jsonl")
+    ]
+    return max(journaux)[1] if journaux else None
+
+
+def main() -> None:
+    args = parser_arguments()
+    chemin = args.journal or _journal_le_plus_recent()
+    if not chemin:
+        print(f"Aucun journal trouvé dans {DOSSIER_JOURNAUX}/.")
+        return
+    print(f"Journal : {chemin}")
+    afficher_resume(resumer_journal(lire_journal(chemin)), args.nombre)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+import contextvars
+import itertools
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from journal_execution import enregistrer_span, span
+from profilage import profiler
+
+PRIORITE_GLOBALE = 0
+PRIORITE_DETAIL = 10
+APPELS_PARALLELES_PAR_DEFAUT = 4
+TENTATIVES_MAX = 5
+DELAI_BASE_REESSAI = 1.0
+DELAI_MAX_REESSAI = 60.0
+STATUTS_REESSAYABLES = {408, 409, 429, 500, 502, 503, 504}
+MOTIF_DUREE_RESET = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+
+def _duree_depuis_entete(valeur: Optional[str]) -> Optional[float]:
+    """Convertit une durée d'en-tête OpenAI ("1s", "6m0s", "20ms") en secondes."""
+    if not valeur:
+        return None
+    total = 0.0
+    trouve = False
+    for nombre, unite in MOTIF_DUREE_RESET.findall(valeur):
+        trouve = True
+        facteur = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}[unite]
+        total += float(nombre) * facteur
+    if not trouve:
+        try:
+            return float(valeur)
+        except ValueError:
+            return None
+    return total
+
+
+def _entier_depuis_entete(valeur: Optional[str]) -> Optional[int]:
+    if valeur is None:
+        return None
+    try:
+        return int(float(valeur))
+    except ValueError:
+        return None
+
+
+def estimer_tokens(parametres: Dict[str, Any]) -> int:
+    """Estimation grossière du nombre de tokens d'entrée (≈ 4 caractères par token)."""
+    caracteres = sum(len(str(message.get("content") or "")) for message in parametres.get("messages") or [])
+    return max(1, caracteres // 4)
+
+
+class OrdonnanceurModele:
+    """
+    File unique par laquelle passent tous les appels au modèle.
+
+    Les appels sont servis par priorité (les analyses globales avant les
+    analyses détaillées), dans la limite des budgets de requêtes et de tokens
+    annoncés par les en-têtes x-ratelimit-* de l'API. Les erreurs 429/5xx et
+    les coupures réseau sont réessayées avec un délai exponentiel.
+    """
+
+    def __init__(
+        self,
+        appels_paralleles: int = APPELS_PARALLELES_PAR_DEFAUT,
+        tentatives_max: int = TENTATIVES_MAX,
+        delai_base: float = DELAI_BASE_REESSAI,
+        delai_max: float = DELAI_MAX_REESSAI,
+    ) -> None:
+        self.appels_paralleles = max(1, appels_paralleles)
+        self.tentatives_max = max(1, tentatives_max)
+        self.delai_base = delai_base
+        self.delai_max = delai_max
+        self._file: "queue.PriorityQueue[Any]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._verrou = threading.Lock()
+        self._workers_demarres = False
+
+        self._requetes_restantes: Optional[int] = None
+        self._tokens_restants: Optional[int] = None
+        self._reset_requetes = 0.0
+        self._reset_tokens = 0.0
+        self._pause_jusqua = 0.0
+
+        self.statistiques: Dict[str, float] = {
+            "appels": 0,
+            "tentatives": 0,
+            "reessais": 0,
+            "echecs": 0,
+            "attente_file_s": 0.0,
+            "attente_budget_s": 0.0,
+            "attente_reessai_s": 0.0,
+            "latence_modele_s": 0.0,
+            "tokens_entree": 0,
+            "tokens_entree_caches": 0,
+            "tokens_sortie": 0,
+        }
+
+    # ----- Soumission -----
+    def soumettre(self, client: Any, parametres: Dict[str, Any], priorite: int = PRIORITE_GLOBALE) -> Future:
+        """Place un appel dans la file et retourne un Future sur la réponse."""
+        self._demarrer_workers()
+        future: Future = Future()
+        # Le contexte de l'appelant suit l'appel : ses spans se rattachent à la commune en cours.
+        contexte = contextvars.copy_context()
+        self._file.put((priorite, next(self._sequence), time.monotonic(), contexte, client, parametres, future))
+        return future
+
+    def executer(self, client: Any, parametres: Dict[str, Any], priorite: int = PRIORITE_GLOBALE) -> Any:
+        """Soumet un appel et attend sa réponse."""
+        return self.soumettre(client, parametres, priorite).result()
+
+    def _demarrer_workers(self) -> None:
+        with self._verrou:
+            if self._workers_demarres:
+                return
+            for index in range(self.appels_paralleles):
+                thread = threading.Thread(target=self._boucle_worker, name=f"ordonnanceur-modele-{index}", daemon=True)
+                thread.start()
+            self._workers_demarres = True
+
+    # ----- Budgets -----
+    def _attendre_budget(self, tokens_estimes: int) -> float:
+        """Bloque tant que les budgets connus sont épuisés ; retourne le temps attendu."""
+        attente_totale = 0.0
+        while True:
+            with self._verrou:
+                maintenant = time.monotonic()
+                attente = max(0.0, self._pause_jusqua - maintenant)
+                if self._requetes_restantes is not None and self._requetes_restantes <= 0:
+                    if maintenant < self._reset_requetes:
+                        attente = max(attente, self._reset_requetes - maintenant)
+                    else:
+                        self._requetes_restantes = None
+                if self._tokens_restants is not None and self._tokens_restants < tokens_estimes:
+                    if maintenant < self._reset_tokens:
+                        attente = max(attente, self._reset_tokens - maintenant)
+                    else:
+                        self._tokens_restants = None
+                if attente <= 0:
+                    # Réservation optimiste pour éviter que tous les workers partent en même temps.
+                    if self._requetes_restantes is not None:
+                        self._requetes_restantes -= 1
+                    if self._tokens_restants is not None:
+                        self._tokens_restants -= tokens_estimes
+                    return attente_totale
+            time.sleep(attente)
+            attente_totale += attente
+
+    def _mettre_a_jour_budgets(self, entetes: Any) -> None:
+        if entetes is None:
+            return
+        maintenant = time.monotonic()
+        requetes = _entier_depuis_entete(entetes.get("x-ratelimit-remaining-requests"))
+        tokens = _entier_depuis_entete(entetes.get("x-ratelimit-remaining-tokens"))
+        reset_requetes = _duree_depuis_entete(entetes.get("x-ratelimit-reset-requests"))
+        reset_tokens = _duree_depuis_entete(entetes.get("x-ratelimit-reset-tokens"))
+        with self._verrou:
+            if requetes is not None:
+                self._requetes_restantes = requetes
+            if tokens is not None:
+                self._tokens_restants = tokens
+            if reset_requetes is not None:
+                self._reset_requetes = maintenant + reset_requetes
+            if reset_tokens is not None:
+                self._reset_tokens = maintenant + reset_tokens
+
+    def _delai_reessai(self, tentative: int, erreur: Exception) -> float:
+        reponse = getattr(erreur, "response", None)
+        entetes = getattr(reponse, "headers", None)
+        if entetes is not None:
+            retry_after_ms = entetes.get("retry-after-ms")
+            if retry_after_ms:
+                try:
+                    return min(self.delai_max, float(retry_after_ms) / 1000)
+                except ValueError:
+                    pass
+            retry_after = _duree_depuis_entete(entetes.get("retry-after"))
+            if retry_after is not None:
+                return min(self.delai_max, retry_after)
+        delai = self.delai_base * (2 ** (tentative - 1))
+        return min(self.delai_max, delai * random.uniform(0.8, 1.2))
+
+    @staticmethod
+    def _est_reessayable(erreur: Exception) -> bool:
+        from openai import APIConnectionError, APIStatusError, RateLimitError
+
+        if isinstance(erreur, (RateLimitError, APIConnectionError)):
+            return True
+        if isinstance(erreur, APIStatusError):
+            return erreur.status_code in STATUTS_REESSAYABLES
+        return False
+
+    # ----- Exécution -----
+    @profiler("appel_modele")
+    def _appeler(self, client: Any, parametres: Dict[str, Any]) -> Any:
+        completions = client.chat.completions
+        brut = getattr(completions, "with_raw_response", None)
+        if brut is None:
+            return completions.create(**parametres)
+        reponse_brute = brut.create(**parametres)
+        self._mettre_a_jour_budgets(reponse_brute.headers)
+        return reponse_brute.parse()
+
+    def _boucle_worker(self) -> None:
+        while True:
+            _, _, soumis_a, contexte, client, parametres, future = self._file.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(contexte.run(self._traiter, client, parametres, soumis_a))
+            except BaseException as exc:  # transmis tel quel à l'appelant
+                future.set_exception(exc)
+
+    def _traiter(self, client: Any, parametres: Dict[str, Any], soumis_a: float) -> Any:
+        # Import différé : le SDK n'est chargé qu'au premier appel réel au modèle.
+        from openai import OpenAIError, RateLimitError
+
+        tokens_estimes = estimer_tokens(parametres)
+        attente_file = time.monotonic() - soumis_a
+        enregistrer_span("attente", attente_file, motif="file_modele")
+        with self._verrou:
+            self.statistiques["appels"] += 1
+            self.statistiques["attente_file_s"] += attente_file
+
+        for tentative in range(1, self.tentatives_max + 1):
+            attente_budget = self._attendre_budget(tokens_estimes)
+            if attente_budget:
+                enregistrer_span("attente", attente_budget, motif="budget_modele")
+            debut = time.monotonic()
+            try:
+                with span("appel_modele", modele=parametres.get("model"), tentative=tentative) as appel:
+                    reponse = self._appeler(client, parametres)
+                    usage = getattr(reponse, "usage", None)
+                    if appel is not None and usage is not None:
+                        appel.attributs["tokens_entree"] = getattr(usage, "prompt_tokens", 0) or 0
+                        appel.attributs["tokens_sortie"] = getattr(usage, "completion_tokens", 0) or 0
+                        details = getattr(usage, "prompt_tokens_details", None)
+                        appel.attributs["tokens_caches"] = getattr(details, "cached_tokens", 0) or 0
+            except OpenAIError as exc:
+                duree = time.monotonic() - debut
+                with self._verrou:
+                    self.statistiques["tentatives"] += 1
+                    self.statistiques["attente_budget_s"] += attente_budget
+                    self.statistiques["latence_modele_s"] += duree
+                self._mettre_a_jour_budgets(getattr(getattr(exc, "response", None), "headers", None))
+                if not self._est_reessayable(exc) or tentative == self.tentatives_max:
+                    with self._verrou:
+                        self.statistiques["echecs"] += 1
+                    raise
+                delai = self._delai_reessai(tentative, exc)
+                if isinstance(exc, RateLimitError):
+                    # Un 429 concerne tout le compte : on suspend toute la file.
+                    with self._verrou:
+                        self._pause_jusqua = max(self._pause_jusqua, time.monotonic() + delai)
+                print(f"  ⚠ Appel modèle en échec ({exc.__class__.__name__}), nouvel essai dans {delai:.1f} s...")
+                with self._verrou:
+                    self.statistiques["reessais"] += 1
+                    self.statistiques["attente_reessai_s"] += delai
+                with span("attente", motif="reessai_modele"):
+                    time.sleep(delai)
+                continue
+
+            duree = time.monotonic() - debut
+            with self._verrou:
+                self.statistiques["tentatives"] += 1
+                self.statistiques["attente_budget_s"] += attente_budget
+                self.statistiques["latence_modele_s"] += duree
+                if usage is not None:
+                    self.statistiques["tokens_entree"] += getattr(usage, "prompt_tokens", 0) or 0
+                    self.statistiques["tokens_sortie"] += getattr(usage, "completion_tokens", 0) or 0
+                    details = getattr(usage, "prompt_tokens_details", None)
+                    self.statistiques["tokens_entree_caches"] += getattr(details, "cached_tokens", 0) or 0
+            return reponse
+        raise RuntimeError("Nombre maximal de tentatives atteint.")  # pragma: no cover - boucle toujours conclue
+
+    # ----- Rapport -----
+    def resume(self) -> Dict[str, float]:
+        with self._verrou:
+            return dict(self.statistiques)
+
+
+_ORDONNANCEUR: Optional[OrdonnanceurModele] = None
+_OPTIONS_ORDONNANCEUR: Dict[str, Any] = {}
+_VERROU_ORDONNANCEUR = threading.Lock()
+# Bilan cumulé d'analyses partageant l'ordonnanceur : affiché une seule fois, par l'appelant.
+_BILAN_DIFFERE = False
+
+
+def configurer_ordonnanceur(reutiliser: bool = False, **options: Any) -> OrdonnanceurModele:
+    """
+    Remplace l'ordonnanceur global (à appeler avant le premier appel au modèle).
+
+    Avec `reutiliser`, un ordonnanceur déjà configuré avec les mêmes options est
+    conservé : des analyses lancées en parallèle dans un même processus
+    partagent alors sa file et ses limites de débit.
+    """
+    global _ORDONNANCEUR, _OPTIONS_ORDONNANCEUR
+    with _VERROU_ORDONNANCEUR:
+        if reutiliser and _ORDONNANCEUR is not None and _OPTIONS_ORDONNANCEUR == options:
+            return _ORDONNANCEUR
+        _ORDONNANCEUR = OrdonnanceurModele(**options)
+        _OPTIONS_ORDONNANCEUR = dict(options)
+        return _ORDONNANCEUR
+
+
+def obtenir_ordonnanceur() -> OrdonnanceurModele:
+    """Retourne l'ordonnanceur global, créé à la demande."""
+    global _ORDONNANCEUR
+    with _VERROU_ORDONNANCEUR:
+        if _ORDONNANCEUR is None:
+            _ORDONNANCEUR = OrdonnanceurModele()
+        return _ORDONNANCEUR
+
+
+def differer_resume_ordonnanceur() -> None:
+    """
+    Les analyses suivantes partagent l'ordonnanceur (pipeline en un seul
+    processus) : leurs bilans seraient les totaux de toutes, pas les leurs.
+    Seul l'appel avec `final=True` affichera le bilan.
+    """
+    global _BILAN_DIFFERE
+    _BILAN_DIFFERE = True
+
+
+def afficher_resume_ordonnanceur(final: bool = False) -> None:
+    """Affiche le bilan des appels : attente en file distincte de la latence du modèle."""
+    ordonnanceur = _ORDONNANCEUR
+    if ordonnanceur is None or (_BILAN_DIFFERE and not final):
+        return
+    stats = ordonnanceur.resume()
+    if not stats["appels"]:
+        return
+    print("=" * 80)
+    print("BILAN DES APPELS AU MODÈLE")
+    print("=" * 80)
+    print(f"Appels            : {int(stats['appels'])} ({int(stats['tentatives'])} tentative(s), "
+          f"{int(stats['reessais'])} réessai(s), {int(stats['echecs'])} échec(s))")
+    print(f"Attente en file   : {stats['attente_file_s']:.1f} s")
+    print(f"Attente de budget : {stats['attente_budget_s']:.1f} s (limites API)")
+    print(f"Attente réessais  : {stats['attente_reessai_s']:.1f} s")
+    print(f"Latence du modèle : {stats['latence_modele_s']:.1f} s")
+    print(f"Tokens            : {int(stats['tokens_entree'])} en entrée, {int(stats['tokens_sortie'])} en sortie")
+    part_cache = stats["tokens_entree_caches"] / stats["tokens_entree"] if stats["tokens_entree"] else 0.0
+    print(f"cached_tokens     : {int(stats['tokens_entree_caches'])} ({part_cache:.0%} des tokens d'entrée)")
+    print("=" * 80)
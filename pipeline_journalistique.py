@@ -1,14 +1,33 @@
 import argparse
+import importlib
+import io
 import json
+import os
+import queue
 import re
 import subprocess
 import sys
+import threading
+import time
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
-from typing import List, Optional, Tuple
-
-from extraire_deliberations import construire_url_base, detecter_seance_la_plus_recente
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from cadence_publication import enregistrer_detection, ordonner_par_imminence
+from journal_execution import (
+    afficher_resume,
+    avec_contexte,
+    chemin_journal_par_defaut,
+    configurer_journal,
+    environnement_enfant,
+    lire_journal,
+    resumer_journal,
+    span,
+)
+from profilage import configurer_profilage, dossier_profil_par_defaut, ecrire_profils
 
 
 RACINE = Path(__file__).resolve().parent
@@ -119,24 +138,171 @@ GROUPES_LABELS = {
     "namur": "Namur",
     "lux": "Luxembourg",
 }
+_VERROU_AFFICHAGE = threading.Lock()
+# Scripts appelables dans le processus de la pipeline, avec la même ligne de commande.
+# Les modules ne sont importés qu'au lancement de l'étape (requests, bs4, pypdf, openai).
+POINTS_ENTREE = {
+    "extraire_deliberations.py": "extraire_deliberations",
+    "analyser_sujets.py": "analyser_sujets",
+}
+# Étapes lancées dans le processus pendant l'exécution en cours (bilan du démarrage économisé).
+_ETAPES_EN_PROCESSUS = 0
+_VERROU_ETAPES = threading.Lock()
+ANALYSES_PARALLELES_PAR_DEFAUT = 2
+HOTES_PARALLELES_PAR_DEFAUT = 4
 
 
-def executer(description: str, commande: List[str]) -> None:
-    """Exécute une commande externe avec affichage lisible."""
-    print("=" * 80)
-    print(description)
-    print("=" * 80)
+class SortieParThread(io.TextIOBase):
+    """
+    Remplaçant de sys.stdout qui envoie les print() d'un thread vers son
+    propre tampon lorsqu'il en a ouvert un : les étapes lancées en parallèle
+    dans le processus n'entremêlent pas leurs journaux.
+    """
+
+    def __init__(self, sortie: Any) -> None:
+        self.sortie = sortie
+        self._local = threading.local()
+
+    def write(self, texte: str) -> int:
+        tampon = getattr(self._local, "tampon", None)
+        return (tampon if tampon is not None else self.sortie).write(texte)
+
+    def flush(self) -> None:
+        self.sortie.flush()
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        return self.sortie.encoding
+
+    def isatty(self) -> bool:
+        return self.sortie.isatty()
+
+    def fileno(self) -> int:
+        return self.sortie.fileno()
+
+    def ouvrir_tampon(self) -> None:
+        self._local.tampon = io.StringIO()
+
+    def fermer_tampon(self) -> str:
+        tampon = getattr(self._local, "tampon", None)
+        self._local.tampon = None
+        return tampon.getvalue() if tampon is not None else ""
+
+
+def _afficher_bloc(*parties: str) -> None:
+    with _VERROU_AFFICHAGE:
+        print("\n".join(parties))
+
+
+def _en_bloc(fonction: Callable[..., Any], *arguments: Any) -> Any:
+    """
+    Appelle `fonction` en retenant ses print() jusqu'à la fin, pour afficher
+    d'un bloc le journal d'une commune traitée en parallèle d'autres.
+    """
+    sortie = sys.stdout
+    if not isinstance(sortie, SortieParThread):
+        return fonction(*arguments)
+    sortie.ouvrir_tampon()
+    try:
+        return fonction(*arguments)
+    finally:
+        journal = sortie.fermer_tampon()
+        if journal:
+            _afficher_bloc(journal.rstrip("\n"))
+
+
+def executer(description: str, commande: List[str], capturer: bool = False) -> None:
+    """
+    Exécute une commande externe avec affichage lisible.
+
+    Avec `capturer`, la sortie est affichée d'un bloc à la fin, pour ne pas
+    entremêler les journaux de commandes lancées en parallèle.
+    """
+    entete = "\n".join(["=" * 80, description, "=" * 80])
+    if not capturer:
+        print(entete)
     try:
         resultat = subprocess.run(
             commande,
             cwd=RACINE,
+            env=environnement_enfant(),
             check=True,
+            stdout=subprocess.PIPE if capturer else None,
+            stderr=subprocess.STDOUT if capturer else None,
+            text=capturer,
         )
     except subprocess.CalledProcessError as err:
+        if capturer:
+            _afficher_bloc(entete, err.stdout or "")
         raise RuntimeError(f"Échec de l'étape '{description}' (code {err.returncode})") from err
+    if capturer:
+        _afficher_bloc(entete, resultat.stdout)
     print(f"✓ {description} terminée.\n")
 
 
+
+def lancer_script(
+    args: argparse.Namespace,
+    description: str,
+    script: str,
+    arguments: List[str],
+    capturer: bool = False,
+) -> None:
+    """
+    Lance une étape de la pipeline : dans le processus courant par défaut
+    (session HTTP, client du modèle et modules déjà importés réutilisés),
+    ou dans un nouvel interpréteur avec --sous-processus. Une erreur reste
+    confinée à l'étape et remonte en RuntimeError.
+    """
+    global _ETAPES_EN_PROCESSUS
+    # Les scripts écrivent dans le journal de la pipeline (ou n'en écrivent aucun).
+    arguments = [*arguments, "--journal", args.journal]
+    if args.profile:
+        arguments += ["--profile", args.profile]
+    if args.sous_processus:
+        executer(description, [sys.executable, script, *arguments], capturer=capturer)
+        return
+    print("\n".join(["=" * 80, description, "=" * 80]))
+    try:
+        importlib.import_module(POINTS_ENTREE[script]).main(arguments)
+    except SystemExit as exc:
+        # Sortie d'argparse ou sys.exit d'un script : comme en sous-processus,
+        # seul un code non nul est un échec, et il ne doit pas quitter la pipeline.
+        if exc.code not in (None, 0):
+            raise RuntimeError(f"Échec de l'étape '{description}' (code {exc.code})") from exc
+    except Exception as exc:
+        raise RuntimeError(f"Échec de l'étape '{description}' : {exc}") from exc
+    with _VERROU_ETAPES:
+        _ETAPES_EN_PROCESSUS += 1
+    print(f"✓ {description} terminée.\n")
+
+
+def mesurer_demarrage_sous_processus() -> float:
+    """Durée d'un démarrage d'interpréteur qui importe les scripts de la pipeline."""
+    debut = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import extraire_deliberations, analyser_sujets"],
+        cwd=RACINE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return time.perf_counter() - debut
+
+
+def afficher_bilan_execution(args: argparse.Namespace, debut: float) -> None:
+    """Durée totale et, en processus unique, temps de démarrage économisé par rapport aux sous-processus."""
+    print("=" * 80)
+    print(f"Durée totale de la pipeline : {time.perf_counter() - debut:.1f}s")
+    if not args.sous_processus and _ETAPES_EN_PROCESSUS:
+        demarrage = mesurer_demarrage_sous_processus()
+        print(
+            f"{_ETAPES_EN_PROCESSUS} étape(s) exécutée(s) dans le processus courant ; "
+            f"un sous-processus mettrait {demarrage:.2f}s à démarrer, "
+            f"soit environ {demarrage * _ETAPES_EN_PROCESSUS:.1f}s économisées."
+        )
+    print("=" * 80)
+
 def charger_derniere_seance(path: Path) -> Tuple[Optional[str], Optional[str], Optional[int]]:
     """Lit le fichier JSON des délibérations pour récupérer la séance enregistrée."""
     if not path.exists():
@@ -160,6 +326,20 @@ def charger_derniere_seance(path: Path) -> Tuple[Optional[str], Optional[str], O
     return None, None, None
 
 
+def charger_empreinte_pdf(path: Path) -> Optional[Dict[str, Any]]:
+    """Empreinte du PDF source enregistrée lors de la dernière extraction (communes en PDF)."""
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            donnees = json.load(handle)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if isinstance(donnees, dict):
+        return (donnees.get("seance") or {}).get("pdf")
+    return None
+
+
 def seance_identique(
     seance_a_id: Optional[str],
     seance_a_nom: Optional[str],
@@ -173,7 +353,8 @@ def seance_identique(
 
     Si la date du conseil est la même, on considère la séance inchangée et
     on court-circuite l'extraction/analyse, sauf si le type/statut a évolué
-    (ex: "Projet de décision" -> "Décision").
+    (ex: "Projet de décision" -> "Décision"). Dans ce cas, analyser_sujets.py
+    ne réanalyse que les points dont le texte a changé.
     """
     date_a, type_a = decrire_seance(seance_a_id, seance_a_nom)
     date_b, type_b = decrire_seance(seance_b_id, seance_b_nom)
@@ -339,6 +520,322 @@ def chemins_sortie(commune: str) -> Tuple[Path, Path, Path, Path]:
     )
 
 
+def options_analyse(args: argparse.Namespace, plusieurs_communes: bool, parts_budget: int = 1) -> List[str]:
+    """
+    Options transmises à analyser_sujets.py, communes aux analyses individuelles et groupées.
+
+    `parts_budget` répartit le budget de sélection des détails entre des analyses lancées séparément.
+    """
+    options: List[str] = []
+    if args.modele:
+        options.extend(["--modele", args.modele])
+    if args.backend:
+        options.extend(["--backend", args.backend])
+    if args.url_factice:
+        options.extend(["--url-factice", args.url_factice])
+    if args.routage:
+        options.append("--routage")
+        if args.modele_leger:
+            options.extend(["--modele-leger", args.modele_leger])
+    if args.analyse_complete:
+        options.append("--analyse-complete")
+    if args.skip_html or plusieurs_communes:
+        options.append("--skip-html")
+    if args.skip_json:
+        options.append("--skip-json")
+    if args.details_auto:
+        budget = args.budget_tokens_selection
+        if budget is None:
+            # Importé ici : le défaut reste celui d'analyser_sujets.py sans alourdir le démarrage de la pipeline.
+            from analyser_sujets import BUDGET_TOKENS_SELECTION_PAR_DEFAUT
+
+            budget = BUDGET_TOKENS_SELECTION_PAR_DEFAUT
+        options.extend(["--details-auto", str(args.details_auto)])
+        options.extend(["--budget-tokens-selection", str(budget // max(1, parts_budget))])
+    if args.details:
+        options.append("--details")
+        options.extend(str(num) for num in args.details)
+    return options
+
+
+def mettre_a_jour_deliberations(commune: str, args: argparse.Namespace, capturer: bool = False) -> bool:
+    """
+    Détecte la dernière séance d'une commune et relance l'extraction si elle
+    a changé. Retourne False si la commune doit être ignorée pour cette exécution.
+    """
+    from extraire_deliberations import construire_url_base, pdf_modifie, source_pour_commune
+
+    fichier_delib = chemins_sortie(commune)[0]
+    url_base = construire_url_base(commune)
+    seance_vue_id, seance_vue_nom, seance_vue_nombre_points = charger_derniere_seance(fichier_delib)
+    nouvelle_seance_id, nouvelle_seance_nom, nouvelle_seance_nombre_points, pdf_url = (
+        source_pour_commune(commune).detecter(url_base)
+    )
+    enregistrer_detection(commune, *decrire_seance(nouvelle_seance_id, nouvelle_seance_nom))
+
+    inchangee = not args.force and seance_identique(
+        seance_vue_id,
+        seance_vue_nom,
+        seance_vue_nombre_points,
+        nouvelle_seance_id,
+        nouvelle_seance_nom,
+        nouvelle_seance_nombre_points,
+    )
+    if inchangee and pdf_url and pdf_modifie(charger_empreinte_pdf(fichier_delib), pdf_url):
+        print(f"Le PDF de la séance de {commune} a changé depuis la dernière extraction.")
+        inchangee = False
+
+    if inchangee:
+        print("=" * 80)
+        print(f"Aucune nouvelle séance détectée pour {commune}, extraction ignorée.")
+        print(
+            f"Séance connue    : "
+            f"{formater_resume_seance(seance_vue_id, seance_vue_nom, seance_vue_nombre_points)}"
+        )
+        print(
+            f"Séance détectée  : "
+            f"{formater_resume_seance(nouvelle_seance_id, nouvelle_seance_nom, nouvelle_seance_nombre_points)}"
+        )
+        print("=" * 80)
+        return True
+
+    if nouvelle_seance_id is None and not args.force:
+        print("=" * 80)
+        print(
+            f"⚠ Séance la plus récente indétectable pour {commune}, "
+            "commune ignorée pour éviter d'extraire tout l'historique."
+        )
+        print("=" * 80)
+        return False
+    if nouvelle_seance_id is None:
+        print(
+            f"⚠ Séance la plus récente inconnue pour {commune}. "
+            "L'extraction complète est forcée (--force)."
+        )
+    elif not args.force:
+        print(f"Comparaison extraction {commune}:")
+        print(
+            f"  connue   -> "
+            f"{formater_resume_seance(seance_vue_id, seance_vue_nom, seance_vue_nombre_points)}"
+        )
+        print(
+            f"  détectée -> "
+            f"{formater_resume_seance(nouvelle_seance_id, nouvelle_seance_nom, nouvelle_seance_nombre_points)}"
+        )
+
+    lancer_script(
+        args,
+        f"Étape 1/2 - Extraction des délibérations ({commune})",
+        "extraire_deliberations.py",
+        ["--commune", commune],
+        capturer=capturer,
+    )
+    return True
+
+
+class ResultatsEtapes:
+    """Bilan partagé par les threads des deux étapes de la pipeline."""
+
+    def __init__(self) -> None:
+        self.traitees = 0
+        self.echecs: List[str] = []
+        self.erreurs: Dict[str, str] = {}
+        self.a_regrouper: List[str] = []
+        # Temps passé dans chaque étape, cumulé sur ses threads.
+        self.durees: Dict[str, float] = {"extraction": 0.0, "analyse": 0.0}
+        self._verrou = threading.Lock()
+
+    def ajouter_duree(self, etape: str, duree: float) -> None:
+        with self._verrou:
+            self.durees[etape] += duree
+
+    def compter_traitee(self) -> None:
+        with self._verrou:
+            self.traitees += 1
+
+    def signaler_echec(self, commune: str, erreur: str) -> None:
+        with self._verrou:
+            self.echecs.append(commune)
+            self.erreurs[commune] = erreur
+        _afficher_bloc(
+            "=" * 80,
+            f"⚠ Erreur pour {commune}: {erreur}",
+            "La pipeline continue avec les autres communes.",
+            "=" * 80,
+        )
+
+    def reporter(self, commune: str) -> None:
+        with self._verrou:
+            self.a_regrouper.append(commune)
+
+
+def analyser_commune(commune: str, args: argparse.Namespace, nombre_communes: int, capturer: bool = False) -> str:
+    """
+    Lance l'analyse d'une commune si sa séance a changé depuis la dernière analyse.
+
+    Retourne "traitee", ou "regroupee" si l'analyse est reportée à l'étape groupée.
+    """
+    fichier_delib, fichier_texte, fichier_json, fichier_html = chemins_sortie(commune)
+    if args.skip_extraction:
+        print(f"Extraction ignorée (--skip-extraction) pour {commune}.\n")
+
+    seance_analyse_id, seance_analyse_nom, seance_analyse_nombre_points = charger_derniere_seance(fichier_json)
+    seance_delib_id, seance_delib_nom, seance_delib_nombre_points = charger_derniere_seance(fichier_delib)
+
+    sorties_analyse_presentes = (
+        fichier_json.exists()
+        and fichier_texte.exists()
+        and (args.skip_html or nombre_communes > 1 or fichier_html.exists())
+    )
+
+    analyse_a_jour = sorties_analyse_presentes and seance_identique(
+        seance_delib_id,
+        seance_delib_nom,
+        seance_delib_nombre_points,
+        seance_analyse_id,
+        seance_analyse_nom,
+        seance_analyse_nombre_points,
+    )
+
+    if not args.force and analyse_a_jour:
+        print("=" * 80)
+        print(f"Séance inchangée pour {commune}, analyse existante conservée.")
+        print(
+            f"Délibérations : "
+            f"{formater_resume_seance(seance_delib_id, seance_delib_nom, seance_delib_nombre_points)}"
+        )
+        print(
+            f"Analyse      : "
+            f"{formater_resume_seance(seance_analyse_id, seance_analyse_nom, seance_analyse_nombre_points)}"
+        )
+        print("=" * 80)
+        return "traitee"
+
+    if not args.force and not fichier_json.exists():
+        print(f"Analyse absente pour {commune}, génération nécessaire.")
+    elif not args.force and seance_delib_nom:
+        print(f"Nouvelle séance à analyser pour {commune} : {seance_delib_nom}")
+        print(
+            f"Délibérations : "
+            f"{formater_resume_seance(seance_delib_id, seance_delib_nom, seance_delib_nombre_points)}"
+        )
+        print(
+            f"Analyse      : "
+            f"{formater_resume_seance(seance_analyse_id, seance_analyse_nom, seance_analyse_nombre_points)}"
+        )
+
+    if args.skip_analyse:
+        print(f"Analyse journalistique ignorée (--skip-analyse) pour {commune}.\n")
+        return "traitee"
+    if not fichier_deliberations_disponible(fichier_delib):
+        print(f"⚠ Aucune délibération disponible pour {commune}, analyse ignorée.")
+        return "traitee"
+
+    if args.regrouper_petites:
+        print(f"Analyse de {commune} reportée à l'étape groupée.\n")
+        return "regroupee"
+
+    lancer_script(
+        args,
+        f"Étape 2/2 - Analyse journalistique et génération des sorties ({commune})",
+        "analyser_sujets.py",
+        ["--auto", "--commune", commune, *options_analyse(args, nombre_communes > 1, nombre_communes)],
+        capturer=capturer,
+    )
+    return "traitee"
+
+
+def executer_etapes(
+    communes: List[str],
+    args: argparse.Namespace,
+    nombre_communes: Optional[int] = None,
+) -> ResultatsEtapes:
+    """
+    Extraction et analyse en chaîne producteur-consommateur.
+
+    Les extracteurs (un thread par hôte, les communes d'un même hôte l'une
+    après l'autre) déposent chaque commune extraite dans une file bornée ;
+    les analyseurs la prennent pendant que l'extraction des suivantes se
+    poursuit. Chaque étape a sa propre limite de concurrence, et la file
+    bornée freine l'extraction quand l'analyse prend du retard.
+
+    `nombre_communes` est la taille de l'exécution quand `communes` n'en est
+    qu'une partie (modes veille et file de travail) : il décide de la page
+    HTML individuelle.
+    """
+    nombre_communes = nombre_communes or len(communes)
+    from extraire_deliberations import construire_url_base
+
+    resultats = ResultatsEtapes()
+    analyseurs = max(1, args.analyses_paralleles)
+    file_analyses: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max(1, args.file_analyses or 2 * analyseurs))
+
+    par_hote: Dict[str, List[str]] = {}
+    for commune in communes:
+        hote = "" if args.skip_extraction else urlparse(construire_url_base(commune)).netloc
+        par_hote.setdefault(hote, []).append(commune)
+    capturer = len(par_hote) > 1 or analyseurs > 1
+
+    def extraire_hote(hote: str) -> None:
+        for commune in par_hote[hote]:
+            if not args.skip_extraction:
+                debut_extraction = time.perf_counter()
+                try:
+                    with span("commune", commune=commune, etape="extraction"):
+                        extraite = _en_bloc(mettre_a_jour_deliberations, commune, args, capturer)
+                    if not extraite:
+                        continue
+                except Exception as exc:
+                    resultats.signaler_echec(commune, str(exc))
+                    continue
+                finally:
+                    resultats.ajouter_duree("extraction", time.perf_counter() - debut_extraction)
+            file_analyses.put(commune)
+
+    def analyser_file() -> None:
+        while True:
+            commune = file_analyses.get()
+            if commune is None:
+                return
+            debut_analyse = time.perf_counter()
+            try:
+                with span("commune", commune=commune, etape="analyse"):
+                    statut = _en_bloc(analyser_commune, commune, args, nombre_communes, capturer)
+            except Exception as exc:
+                resultats.signaler_echec(commune, str(exc))
+                continue
+            finally:
+                resultats.ajouter_duree("analyse", time.perf_counter() - debut_analyse)
+            if statut == "regroupee":
+                resultats.reporter(commune)
+            else:
+                resultats.compter_traitee()
+
+    debut = time.perf_counter()
+    threads_analyse = [
+        threading.Thread(target=avec_contexte(analyser_file), name=f"analyse-{index}", daemon=True)
+        for index in range(analyseurs)
+    ]
+    for thread in threads_analyse:
+        thread.start()
+    with ThreadPoolExecutor(max_workers=max(1, min(len(par_hote), args.hotes_paralleles))) as pool:
+        list(pool.map(avec_contexte(extraire_hote), par_hote))
+    for _ in threads_analyse:
+        file_analyses.put(None)
+    for thread in threads_analyse:
+        thread.join()
+    print("=" * 80)
+    print(
+        f"Extraction et analyse : {time.perf_counter() - debut:.1f}s réelles pour "
+        f"{resultats.durees['extraction']:.1f}s d'extraction et {resultats.durees['analyse']:.1f}s d'analyse cumulées"
+    )
+    print("=" * 80)
+    # Ordre des communes demandé, quel que soit l'ordre de fin des analyses.
+    resultats.a_regrouper.sort(key=communes.index)
+    resultats.echecs.sort(key=communes.index)
+    return resultats
+
+
 def parser_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Chaîne d'automatisation quotidienne pour extraire, analyser et publier les délibérations.",
@@ -346,12 +843,146 @@ def parser_arguments() -> argparse.Namespace:
     parser.add_argument("--skip-extraction", action="store_true", help="Ne pas relancer l'extraction des délibérations.")
     parser.add_argument("--skip-analyse", action="store_true", help="Ne pas relancer l'analyse journalistique.")
     parser.add_argument("--modele", default=None, help="Identifiant du modèle OpenAI transmis à analyser_sujets.py.")
+    parser.add_argument(
+        "--backend",
+        default=None,
+        help="Backend du modèle transmis à analyser_sujets.py (openai, enregistrement, rejeu, factice).",
+    )
+    parser.add_argument(
+        "--url-factice",
+        default=None,
+        help="URL du serveur factice compatible OpenAI transmise à analyser_sujets.py.",
+    )
+    parser.add_argument(
+        "--routage",
+        action="store_true",
+        help="Envoie les points routiniers vers un gabarit local ou un modèle léger.",
+    )
+    parser.add_argument("--modele-leger", default=None, help="Modèle léger transmis à analyser_sujets.py avec --routage.")
+    parser.add_argument(
+        "--analyse-complete",
+        action="store_true",
+        help="Réanalyse tous les points au lieu de réutiliser ceux dont le texte n'a pas changé.",
+    )
     parser.add_argument(
         "--details",
         nargs="*",
         type=int,
         help="Numéros de délibérations à analyser en détail malgré le mode automatique.",
     )
+    parser.add_argument(
+        "--details-auto",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Analyse en détail jusqu'à N points par commune, choisis automatiquement.",
+    )
+    parser.add_argument(
+        "--budget-tokens-selection",
+        type=int,
+        default=None,
+        help=(
+            "Budget global de tokens pour --details-auto, réparti entre les communes analysées séparément "
+            "(défaut : celui d'analyser_sujets.py)."
+        ),
+    )
+    parser.add_argument(
+        "--regrouper-petites",
+        action="store_true",
+        help="Analyse toutes les communes en une étape qui regroupe les petites séances dans des appels partagés.",
+    )
+    parser.add_argument(
+        "--sous-processus",
+        action="store_true",
+        help="Lance chaque extraction et analyse dans un nouvel interpréteur Python (ancien fonctionnement).",
+    )
+    parser.add_argument(
+        "--analyses-paralleles",
+        type=int,
+        default=ANALYSES_PARALLELES_PAR_DEFAUT,
+        help="Analyses de communes menées en même temps que l'extraction des suivantes.",
+    )
+    parser.add_argument(
+        "--hotes-paralleles",
+        type=int,
+        default=HOTES_PARALLELES_PAR_DEFAUT,
+        help="Hôtes extraits simultanément (toujours une commune à la fois par hôte).",
+    )
+    parser.add_argument(
+        "--file-analyses",
+        type=int,
+        default=None,
+        help="Communes extraites en attente d'analyse au maximum (par défaut : 2 par analyseur).",
+    )
+    parser.add_argument(
+        "--journal",
+        default=chemin_journal_par_defaut("pipeline"),
+        help="Journal JSON-lines des durées de l'exécution, partagé avec les scripts ; vide pour désactiver.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=dossier_profil_par_defaut("pipeline"),
+        default="",
+        help="Profile chaque étape des scripts (cProfile, tracemalloc) et écrit les profils dans ce dossier.",
+    )
+    parser.add_argument(
+        "--veille",
+        action="store_true",
+        help="Mode démon : surveille chaque commune selon son propre calendrier et traite les changements au fil de l'eau.",
+    )
+    parser.add_argument(
+        "--intervalle-min",
+        type=float,
+        default=15,
+        help="Mode veille : minutes entre deux vérifications d'une commune qui vient de changer.",
+    )
+    parser.add_argument(
+        "--intervalle-max",
+        type=float,
+        default=360,
+        help="Mode veille : minutes entre deux vérifications au plus, après des vérifications sans changement.",
+    )
+    parser.add_argument(
+        "--delai-html",
+        type=float,
+        default=2,
+        help="Mode veille : minutes sans nouveau changement avant de recompiler la page HTML.",
+    )
+    parser.add_argument(
+        "--duree-veille",
+        type=float,
+        default=0,
+        help="Mode veille : arrêt après ce nombre de minutes (0 : jusqu'à SIGTERM ou Ctrl+C).",
+    )
+    parser.add_argument(
+        "--file-travail",
+        default=None,
+        metavar="CHEMIN",
+        help="Mode travailleur : base SQLite partagée d'où plusieurs machines prennent les communes à traiter.",
+    )
+    parser.add_argument(
+        "--lot",
+        default=None,
+        help="File de travail : nom du lot partagé par les travailleurs (par défaut la date du jour, UTC).",
+    )
+    parser.add_argument(
+        "--travailleur",
+        default=None,
+        help="File de travail : nom de ce travailleur (par défaut machine-pid).",
+    )
+    parser.add_argument(
+        "--bail",
+        type=float,
+        default=10,
+        help="File de travail : minutes de validité d'une réservation, renouvelée tant que le travailleur vit.",
+    )
+    parser.add_argument(
+        "--tentatives-max",
+        type=int,
+        default=3,
+        help="File de travail : essais d'une commune (échecs et réservations expirées) avant abandon.",
+    )
     parser.add_argument("--skip-html", action="store_true", help="Ne pas générer la page HTML.")
     parser.add_argument("--skip-json", action="store_true", help="Ne pas générer le fichier JSON.")
     parser.add_argument(
@@ -379,7 +1010,23 @@ def parser_arguments() -> argparse.Namespace:
 
 def main() -> None:
     args = parser_arguments()
+    journal = configurer_journal(str(RACINE / args.journal) if args.journal else "")
+    # Chemin absolu, transmis tel quel aux scripts et aux sous-processus.
+    args.journal = str(journal.chemin) if journal else ""
+    profilage = configurer_profilage(str(RACINE / args.profile) if args.profile else "")
+    args.profile = str(profilage.dossier) if profilage else ""
+    try:
+        with span("pipeline"):
+            executer_pipeline(args)
+    finally:
+        ecrire_profils()
+        if journal:
+            afficher_resume(resumer_journal(lire_journal(args.journal)))
+            print(f"Journal d'exécution : {args.journal}")
 
+
+def communes_demandees(args: argparse.Namespace) -> Tuple[List[str], List[str]]:
+    """Communes à traiter et groupes demandés ; aucune commune si un groupe est inconnu."""
     groupes = []
     if args.groupes:
         groupes = [g.strip().lower() for g in args.groupes if g.strip()]
@@ -392,182 +1039,124 @@ def main() -> None:
             communes_groupe = GROUPES_COMMUNES.get(groupe, [])
             if not communes_groupe:
                 print(f"Groupe inconnu: {groupe}")
-                return
+                return [], groupes
             communes.extend(communes_groupe)
     else:
         communes = [commune.strip().lower() for commune in args.communes if commune.strip()]
+    return communes, groupes
+
+
+def analyser_regroupees(args: argparse.Namespace, resultats: ResultatsEtapes) -> None:
+    """Analyse groupée des communes reportées par les analyseurs ; les échecs rejoignent `resultats.echecs`."""
+    communes_a_regrouper = resultats.a_regrouper
+    if not communes_a_regrouper:
+        return
+    try:
+        lancer_script(
+            args,
+            f"Étape 2/2 - Analyse groupée de {len(communes_a_regrouper)} commune(s)",
+            "analyser_sujets.py",
+            [
+                "--auto",
+                "--regrouper",
+                "--communes",
+                *communes_a_regrouper,
+                *options_analyse(args, True),
+            ],
+        )
+        resultats.traitees += len(communes_a_regrouper)
+    except RuntimeError as exc:
+        print("=" * 80)
+        print(f"⚠ Erreur pendant l'analyse groupée : {exc}")
+        print("=" * 80)
+        # Dans le processus courant, l'analyse groupée précise les communes en
+        # échec (EchecsAnalyseGroupee) ; en sous-processus, toutes le sont.
+        erreurs = getattr(exc.__cause__, "erreurs", None) or {commune: str(exc) for commune in communes_a_regrouper}
+        resultats.traitees += len(communes_a_regrouper) - len(erreurs)
+        resultats.echecs.extend(erreurs)
+        resultats.erreurs.update(erreurs)
+
+
+def compiler_html(args: argparse.Namespace, communes: List[str], groupes: List[str]) -> None:
+    """Page HTML multi-communes (les analyses individuelles n'en produisent pas)."""
+    if len(communes) <= 1 or args.skip_html:
+        return
+    arguments_html = ["--merge-html", "--communes", *communes]
+    if groupes:
+        group_labels = [GROUPES_LABELS.get(g, g.title()) for g in groupes]
+        group_sizes = [len(GROUPES_COMMUNES[g]) for g in groupes]
+        arguments_html.extend(["--group-labels", *group_labels])
+        arguments_html.extend(["--group-sizes", *[str(n) for n in group_sizes]])
+    lancer_script(args, "Compilation HTML multi-communes", "analyser_sujets.py", arguments_html)
+
+
+def executer_pipeline(args: argparse.Namespace) -> None:
+    """Extraction, analyse et compilation des communes demandées."""
+    global _ETAPES_EN_PROCESSUS
+    debut = time.perf_counter()
+    _ETAPES_EN_PROCESSUS = 0
+    if not args.sous_processus:
+        # Les scripts appelés en processus écrivent leurs sorties en chemins relatifs.
+        os.chdir(RACINE)
+
+    communes, groupes = communes_demandees(args)
     if not communes:
-        print("Aucune commune fournie.")
+        if not groupes:
+            print("Aucune commune fournie.")
         return
 
-    communes_en_echec: List[str] = []
-    communes_traitees = 0
+    if not isinstance(sys.stdout, SortieParThread):
+        sys.stdout = SortieParThread(sys.stdout)
+    if args.sous_processus:
+        executer_mode(args, communes, groupes, debut)
+        return
+    # Les analyses menées dans ce processus partagent l'ordonnanceur du modèle :
+    # son bilan, cumulé, est affiché une fois en fin d'exécution.
+    from ordonnanceur_modele import afficher_resume_ordonnanceur, differer_resume_ordonnanceur
 
-    for commune in communes:
-        try:
-            fichier_delib, fichier_texte, fichier_json, fichier_html = chemins_sortie(commune)
-            url_base = construire_url_base(commune)
+    differer_resume_ordonnanceur()
+    try:
+        executer_mode(args, communes, groupes, debut)
+    finally:
+        afficher_resume_ordonnanceur(final=True)
 
-            if not args.skip_extraction:
-                seance_vue_id, seance_vue_nom, seance_vue_nombre_points = charger_derniere_seance(fichier_delib)
-                nouvelle_seance_id, nouvelle_seance_nom, nouvelle_seance_nombre_points = (
-                    detecter_seance_la_plus_recente(url_base)
-                )
-
-                if (
-                    not args.force
-                    and seance_identique(
-                        seance_vue_id,
-                        seance_vue_nom,
-                        seance_vue_nombre_points,
-                        nouvelle_seance_id,
-                        nouvelle_seance_nom,
-                        nouvelle_seance_nombre_points,
-                    )
-                ):
-                    print("=" * 80)
-                    print(f"Aucune nouvelle séance détectée pour {commune}, extraction ignorée.")
-                    print(
-                        f"Séance connue    : "
-                        f"{formater_resume_seance(seance_vue_id, seance_vue_nom, seance_vue_nombre_points)}"
-                    )
-                    print(
-                        f"Séance détectée  : "
-                        f"{formater_resume_seance(nouvelle_seance_id, nouvelle_seance_nom, nouvelle_seance_nombre_points)}"
-                    )
-                    print("=" * 80)
-                else:
-                    if nouvelle_seance_id is None and not args.force:
-                        print("=" * 80)
-                        print(
-                            f"⚠ Séance la plus récente indétectable pour {commune}, "
-                            "commune ignorée pour éviter d'extraire tout l'historique."
-                        )
-                        print("=" * 80)
-                        continue
-                    if nouvelle_seance_id is None:
-                        print(
-                            f"⚠ Séance la plus récente inconnue pour {commune}. "
-                            "L'extraction complète est forcée (--force)."
-                        )
-                    elif not args.force:
-                        print(f"Comparaison extraction {commune}:")
-                        print(
-                            f"  connue   -> "
-                            f"{formater_resume_seance(seance_vue_id, seance_vue_nom, seance_vue_nombre_points)}"
-                        )
-                        print(
-                            f"  détectée -> "
-                            f"{formater_resume_seance(nouvelle_seance_id, nouvelle_seance_nom, nouvelle_seance_nombre_points)}"
-                        )
-
-                    executer(
-                        f"Étape 1/2 - Extraction des délibérations ({commune})",
-                        [sys.executable, "extraire_deliberations.py", "--commune", commune],
-                    )
-            else:
-                print(f"Extraction ignorée (--skip-extraction) pour {commune}.\n")
-
-            seance_analyse_id, seance_analyse_nom, seance_analyse_nombre_points = charger_derniere_seance(fichier_json)
-            seance_delib_id, seance_delib_nom, seance_delib_nombre_points = charger_derniere_seance(fichier_delib)
-
-            sorties_analyse_presentes = (
-                fichier_json.exists()
-                and fichier_texte.exists()
-                and (args.skip_html or len(communes) > 1 or fichier_html.exists())
-            )
-
-            analyse_a_jour = sorties_analyse_presentes and seance_identique(
-                seance_delib_id,
-                seance_delib_nom,
-                seance_delib_nombre_points,
-                seance_analyse_id,
-                seance_analyse_nom,
-                seance_analyse_nombre_points,
-            )
-
-            if not args.force and analyse_a_jour:
-                print("=" * 80)
-                print(f"Séance inchangée pour {commune}, analyse existante conservée.")
-                print(
-                    f"Délibérations : "
-                    f"{formater_resume_seance(seance_delib_id, seance_delib_nom, seance_delib_nombre_points)}"
-                )
-                print(
-                    f"Analyse      : "
-                    f"{formater_resume_seance(seance_analyse_id, seance_analyse_nom, seance_analyse_nombre_points)}"
-                )
-                print("=" * 80)
-                communes_traitees += 1
-                continue
 
-            if not args.force and not fichier_json.exists():
-                print(f"Analyse absente pour {commune}, génération nécessaire.")
-            elif not args.force and seance_delib_nom:
-                print(f"Nouvelle séance à analyser pour {commune} : {seance_delib_nom}")
-                print(
-                    f"Délibérations : "
-                    f"{formater_resume_seance(seance_delib_id, seance_delib_nom, seance_delib_nombre_points)}"
-                )
-                print(
-                    f"Analyse      : "
-                    f"{formater_resume_seance(seance_analyse_id, seance_analyse_nom, seance_analyse_nombre_points)}"
-                )
-
-            if args.skip_analyse:
-                print(f"Analyse journalistique ignorée (--skip-analyse) pour {commune}.\n")
-                communes_traitees += 1
-                continue
-            if not fichier_deliberations_disponible(fichier_delib):
-                print(f"⚠ Aucune délibération disponible pour {commune}, analyse ignorée.")
-                communes_traitees += 1
-                continue
+def executer_mode(args: argparse.Namespace, communes: List[str], groupes: List[str], debut: float) -> None:
+    """Exécution classique, mode veille ou mode travailleur."""
+    if args.veille:
+        from veille_deliberations import executer_veille
 
-            commande = [sys.executable, "analyser_sujets.py", "--auto", "--commune", commune]
-            if args.modele:
-                commande.extend(["--modele", args.modele])
-            if args.skip_html or len(communes) > 1:
-                commande.append("--skip-html")
-            if args.skip_json:
-                commande.append("--skip-json")
-            if args.details:
-                commande.append("--details")
-                commande.extend(str(num) for num in args.details)
-
-            executer(
-                f"Étape 2/2 - Analyse journalistique et génération des sorties ({commune})",
-                commande,
-            )
-            communes_traitees += 1
-        except Exception as exc:
-            print("=" * 80)
-            print(f"⚠ Erreur pour {commune}: {exc}")
-            print("La pipeline continue avec les autres communes.")
-            print("=" * 80)
-            communes_en_echec.append(commune)
-            continue
-
-    if len(communes) > 1 and not args.skip_html:
-        commande_html = [sys.executable, "analyser_sujets.py", "--merge-html", "--communes", *communes]
-        if groupes:
-            group_labels = [GROUPES_LABELS.get(g, g.title()) for g in groupes]
-            group_sizes = [len(GROUPES_COMMUNES[g]) for g in groupes]
-            commande_html.extend(["--group-labels", *group_labels])
-            commande_html.extend(["--group-sizes", *[str(n) for n in group_sizes]])
-        executer("Compilation HTML multi-communes", commande_html)
-
-    if communes_en_echec:
+        executer_veille(args, communes, groupes)
+        return
+    if args.file_travail:
+        from file_travail import executer_travailleur
+
+        executer_travailleur(args, communes, groupes)
+        return
+
+    # Les communes dont une publication est attendue passent en tête : l'ordre
+    # du jour d'un conseil imminent est publié avant les autres.
+    resultats = executer_etapes(ordonner_par_imminence(communes), args)
+    analyser_regroupees(args, resultats)
+    compiler_html(args, communes, groupes)
+
+    if resultats.echecs:
         print("=" * 80)
         print("Communes en échec ignorées pour cette exécution :")
-        for commune in communes_en_echec:
+        for commune in resultats.echecs:
             print(f"- {commune}")
         print("=" * 80)
 
-    if communes_traitees == 0:
+    afficher_bilan_execution(args, debut)
+
+    if resultats.traitees == 0:
         raise RuntimeError("Aucune commune n'a pu être traitée avec succès.")
 
 
 if __name__ == "__main__":
+    # veille_deliberations importe ce module par son nom : il doit retrouver
+    # celui-ci (sys.stdout par thread, verrous) plutôt qu'une seconde copie.
+    sys.modules.setdefault("pipeline_journalistique", sys.modules[__name__])
     try:
         main()
     except Exception as exc:  # pragma: no cover
@@ -0,0 +1,236 @@
+import contextlib
+import functools
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+# cProfile, pstats et tracemalloc ne sont importés que si le profilage est activé :
+# sans --profile, ce module ne coûte rien au démarrage.
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+    import tracemalloc
+
+DOSSIER_PROFILS = "profils"
+# Paires d'instantanés tracemalloc comparées par étape : leur comparaison parcourt
+# tout le tas (plusieurs secondes pendant l'analyse). Les appels suivants ne
+# mesurent que la mémoire nette allouée, via get_traced_memory.
+MAX_INSTANTANES_PAR_ETAPE = 1
+CADRES_TRACEMALLOC = 1
+LIGNES_TOP_MEMOIRE = 25
+
+_PROFILAGE: Optional["Profilage"] = None
+_VERROU_PROFILAGE = threading.Lock()
+# Profileurs actifs du thread courant, du plus englobant au plus interne.
+_PILE_THREAD = threading.local()
+# Allocations du profilage lui-même, exclues des tops mémoire.
+_FICHIERS_IGNORES = (
+    __file__,
+    "<frozen importlib",
+    *(str(Path(contextlib.__file__).parent / module) for module in ("tracemalloc.py", "cProfile.py", "pstats.py")),
+)
+
+
+class EtapeProfilee:
+    """Profil CPU et allocations cumulés de tous les appels d'une étape."""
+
+    def __init__(self, nom: str) -> None:
+        self.nom = nom
+        self.appels = 0
+        self.duree_s = 0.0
+        self.instantanes = 0
+        self.instantanes_reserves = 0
+        self.memoire_nette_max = 0
+        self.memoire_nette_cumul = 0
+        self.stats: Optional["pstats.Stats"] = None
+        self.allocations: Dict[str, List[int]] = {}
+
+    def ajouter_profil(self, profil: "cProfile.Profile", duree: float, memoire_nette: int) -> None:
+        import pstats
+
+        self.appels += 1
+        self.duree_s += duree
+        self.memoire_nette_max = max(self.memoire_nette_max, memoire_nette)
+        self.memoire_nette_cumul += memoire_nette
+        if self.stats is None:
+            self.stats = pstats.Stats(profil)
+        else:
+            self.stats.add(profil)
+
+    def ajouter_allocations(self, avant: "tracemalloc.Snapshot", apres: "tracemalloc.Snapshot") -> None:
+        self.instantanes += 1
+        for difference in apres.compare_to(avant, "lineno"):
+            ligne = str(difference.traceback[0])
+            if not difference.size_diff or ligne.startswith(_FICHIERS_IGNORES):
+                continue
+            cumul = self.allocations.setdefault(ligne, [0, 0])
+            cumul[0] += difference.size_diff
+            cumul[1] += difference.count_diff
+
+    def top_memoire(self) -> str:
+        lignes = [
+            f"Étape {self.nom} : {self.appels} appel(s), {self.duree_s:.3f} s cumulées, "
+            f"{self.instantanes} instantané(s) mémoire",
+            f"Mémoire nette par appel (tous threads) : max {self.memoire_nette_max / 1024:+.1f} Kio, "
+            f"cumul {self.memoire_nette_cumul / 1024:+.1f} Kio",
+            "Allocations nettes par ligne (différence avant/après les appels instantanés) :",
+        ]
+        tries = sorted(self.allocations.items(), key=lambda item: abs(item[1][0]), reverse=True)
+        for ligne, (taille, blocs) in tries[:LIGNES_TOP_MEMOIRE]:
+            lignes.append(f"  {taille / 1024:+10.1f} Kio {blocs:+8d} blocs  {ligne}")
+        return "\n".join(lignes) + "\n"
+
+
+class Profilage:
+    """Profils par étape d'un processus, écrits dans un dossier d'exécution."""
+
+    def __init__(self, dossier: Path) -> None:
+        self.dossier = dossier
+        self.etapes: Dict[str, EtapeProfilee] = {}
+        self._verrou = threading.Lock()
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(CADRES_TRACEMALLOC)
+
+    def _etape(self, nom: str) -> EtapeProfilee:
+        if nom not in self.etapes:
+            self.etapes[nom] = EtapeProfilee(nom)
+        return self.etapes[nom]
+
+    def instantane_initial(self, nom: str) -> Optional["tracemalloc.Snapshot"]:
+        """Instantané avant l'appel, tant que le quota de l'étape n'est pas réservé (appels concurrents compris)."""
+        with self._verrou:
+            etape = self._etape(nom)
+            if etape.instantanes_reserves >= MAX_INSTANTANES_PAR_ETAPE:
+                return None
+            etape.instantanes_reserves += 1
+        return _instantane()
+
+    def terminer(
+        self,
+        nom: str,
+        profil: "cProfile.Profile",
+        duree: float,
+        memoire_nette: int,
+        avant: Optional["tracemalloc.Snapshot"],
+    ) -> None:
+        apres = _instantane() if avant is not None else None
+        with self._verrou:
+            etape = self._etape(nom)
+            etape.ajouter_profil(profil, duree, memoire_nette)
+            if avant is not None:
+                etape.ajouter_allocations(avant, apres)
+
+    def ecrire(self) -> List[Path]:
+        """Écrit `<étape>-<pid>.pstats` et `<étape>-<pid>.memoire.txt` pour chaque étape profilée."""
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        fichiers = []
+        with self._verrou:
+            for nom, etape in sorted(self.etapes.items()):
+                base = self.dossier / f"{nom}-{os.getpid()}"
+                if etape.stats is not None:
+                    etape.stats.dump_stats(str(base) + ".pstats")
+                    fichiers.append(Path(str(base) + ".pstats"))
+                Path(str(base) + ".memoire.txt").write_text(etape.top_memoire(), encoding="utf-8")
+                fichiers.append(Path(str(base) + ".memoire.txt"))
+        return fichiers
+
+
+def _instantane() -> "tracemalloc.Snapshot":
+    import tracemalloc
+
+    # Pas de filter_traces : il parcourt chaque trace en Python. Les lignes à
+    # ignorer sont écartées après regroupement, dans ajouter_allocations.
+    return tracemalloc.take_snapshot()
+
+
+def dossier_profil_par_defaut(script: str) -> str:
+    """Dossier horodaté d'une nouvelle exécution profilée, dans DOSSIER_PROFILS."""
+    return str(Path(DOSSIER_PROFILS) / f"{script}-{datetime.now():%Y%m%d-%H%M%S}")
+
+
+def configurer_profilage(dossier: Optional[str]) -> Optional[Profilage]:
+    """
+    Active le profilage des étapes vers `dossier`. Un profilage déjà actif
+    sur le même dossier est conservé (scripts appelés dans le processus de
+    la pipeline) ; un dossier vide laisse le profilage tel quel (inactif par défaut).
+    """
+    global _PROFILAGE
+    with _VERROU_PROFILAGE:
+        if not dossier:
+            return _PROFILAGE
+        cible = Path(dossier).resolve()
+        if _PROFILAGE is not None and _PROFILAGE.dossier == cible:
+            return _PROFILAGE
+        if _PROFILAGE is not None:
+            _PROFILAGE.ecrire()
+        _PROFILAGE = Profilage(cible)
+        return _PROFILAGE
+
+
+@contextlib.contextmanager
+def etape_profilee(nom: str) -> Iterator[None]:
+    """
+    Profile un bloc avec cProfile (thread courant) et deux instantanés
+    tracemalloc. Une étape imbriquée suspend le profil de l'étape englobante :
+    chaque fonction est comptée dans l'étape la plus interne. Sans profilage
+    actif, ne fait rien.
+    """
+    profilage = _PROFILAGE
+    if profilage is None:
+        yield
+        return
+    import cProfile
+    import tracemalloc
+
+    pile = getattr(_PILE_THREAD, "profils", None)
+    if pile is None:
+        pile = _PILE_THREAD.profils = []
+    if pile:
+        pile[-1].disable()
+    avant = profilage.instantane_initial(nom)
+    profil = cProfile.Profile()
+    pile.append(profil)
+    memoire_initiale = tracemalloc.get_traced_memory()[0]
+    debut = time.perf_counter()
+    profil.enable()
+    try:
+        yield
+    finally:
+        profil.disable()
+        duree = time.perf_counter() - debut
+        memoire_nette = tracemalloc.get_traced_memory()[0] - memoire_initiale
+        pile.pop()
+        profilage.terminer(nom, profil, duree, memoire_nette, avant)
+        if pile:
+            pile[-1].enable()
+
+
+def profiler(nom: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Décorateur : chaque appel de la fonction est une occurrence de l'étape `nom`."""
+
+    def decorateur(fonction: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fonction)
+        def enveloppe(*args: Any, **kwargs: Any) -> Any:
+            # Profilage inactif : un simple test, sans gestionnaire de contexte.
+            if _PROFILAGE is None:
+                return fonction(*args, **kwargs)
+            with etape_profilee(nom):
+                return fonction(*args, **kwargs)
+
+        return enveloppe
+
+    return decorateur
+
+
+def ecrire_profils() -> None:
+    """Écrit les profils cumulés jusqu'ici (réécrits à chaque appel)."""
+    profilage = _PROFILAGE
+    if profilage is None or not profilage.etapes:
+        return
+    fichiers = profilage.ecrire()
+    print(f"✓ Profils de {len(profilage.etapes)} étape(s) écrits dans {profilage.dossier} ({len(fichiers)} fichier(s))")
@@ -0,0 +1,199 @@
+import html
+import math
+import re
+from collections import Counter
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sections_deliberations import CLES_METADONNEES, MOTIF_AVERTISSEMENT_PROJET
+
+MOTIF_TERME = re.compile(r"[a-zà-ÿ0-9]{3,}")
+MOTIF_FIN_PHRASE = re.compile(r"(?<=[.;!?])\s+(?=[A-ZÀ-Ý0-9«\"(])")
+# Navigation de la page deliberations.be ("2 sur 21", "Précédent", "Suivant").
+LIGNES_NAVIGATION = {"sur", "précédent", "suivant"}
+LONGUEUR_MAX_NAVIGATION = 9
+LONGUEUR_MIN_LIGNE = 25
+# Une ligne plus courte ne peut pas être une ligne de PDF coupée en pleine phrase.
+LONGUEUR_LIGNE_PLEINE = 70
+LONGUEUR_MIN_PHRASE = 40
+# Les visas ("Vu le Code...") sont nécessaires juridiquement mais pauvres en information.
+PONDERATION_VISA = 0.4
+
+MOTS_VIDES = frozenset(
+    """les des une que qui dans pour par sur avec aux est sont été être ont fait ainsi cette ces son ses leur
+    leurs plus pas elle ils nous vous mais donc car comme tout tous toute toutes entre dont lors afin sans
+    sous vers chez notamment également article conseil communal commune considérant vu attendu décide
+    délibération séance""".split()
+)
+
+# Une phrase et la liste de ses termes (avec répétitions : la fréquence est implicite).
+PhraseVectorisee = Tuple[str, List[str]]
+
+
+def termes(texte: str) -> List[str]:
+    """Découpe un texte en termes (minuscules, trois caractères au moins)."""
+    return MOTIF_TERME.findall(texte.lower())
+
+
+def lignes_du_corps(texte: str, titre: str = "") -> List[str]:
+    """
+    Lignes du corps du texte, sans navigation, URLs, en-tête de métadonnées,
+    avertissement de projet ni répétition du titre.
+    """
+    if "&" in texte:
+        texte = html.unescape(texte)
+    if "projet de délibération" in texte:
+        texte = MOTIF_AVERTISSEMENT_PROJET.sub(" ", texte)
+    titre = " ".join(html.unescape(titre).split()).casefold()
+    lignes: List[str] = []
+    valeur_attendue = False
+    for ligne in texte.splitlines():
+        ligne = ligne.strip()
+        if not ligne:
+            continue
+        if valeur_attendue:
+            valeur_attendue = False
+            continue
+        if ligne in CLES_METADONNEES:
+            valeur_attendue = True
+            continue
+        if ligne.startswith("http"):
+            continue
+        if len(ligne) <= LONGUEUR_MAX_NAVIGATION and (ligne.isdigit() or ligne.casefold() in LIGNES_NAVIGATION):
+            continue
+        # casefold() ne raccourcit jamais une chaîne : une ligne plus longue que le titre ne le répète pas.
+        if len(ligne) <= len(titre) and ligne.casefold() == titre:
+            continue
+        lignes.append(ligne)
+    return lignes
+
+
+def phrases_candidates(texte: str, titre: str = "") -> List[str]:
+    """
+    Phrases du corps du texte (voir lignes_du_corps). Un retour à la ligne
+    après une ligne courte ou ponctuée termine la phrase ; sinon (PDF), la
+    phrase continue.
+    """
+    blocs: List[str] = []
+    courant: List[str] = []
+    for ligne in lignes_du_corps(texte, titre):
+        if len(ligne) < LONGUEUR_MIN_LIGNE:
+            continue
+        courant.append(ligne)
+        if len(ligne) < LONGUEUR_LIGNE_PLEINE or ligne[-1] in ".;:!?":
+            blocs.append(" ".join(courant))
+            courant = []
+    if courant:
+        blocs.append(" ".join(courant))
+    return [
+        phrase
+        for bloc in blocs
+        for phrase in MOTIF_FIN_PHRASE.split(bloc)
+        if len(phrase) >= LONGUEUR_MIN_PHRASE
+    ]
+
+
+def vectoriser(
+    textes: Iterable[str],
+    titres: Optional[Iterable[str]] = None,
+) -> Tuple[List[List[PhraseVectorisee]], Counter]:
+    """
+    Découpe chaque texte en phrases et compte leurs termes en une seule passe.
+
+    Retourne les phrases vectorisées par texte et la fréquence documentaire des termes.
+    """
+    documents: List[List[PhraseVectorisee]] = []
+    frequences: Counter = Counter()
+    titres = titres if titres is not None else repeat("")
+    for texte, titre in zip(textes, titres):
+        phrases = [(phrase, termes(phrase)) for phrase in phrases_candidates(texte, titre)]
+        frequences.update(set().union(*(liste for _, liste in phrases)))
+        documents.append(phrases)
+    return documents, frequences
+
+
+def calculer_idf(frequences: Counter, nombre_documents: int) -> Dict[str, float]:
+    """IDF lissé à partir des fréquences documentaires ; les mots vides pèsent zéro."""
+    idf = {terme: math.log((nombre_documents + 1) / (frequence + 1)) + 1.0 for terme, frequence in frequences.items()}
+    for terme in MOTS_VIDES:
+        idf[terme] = 0.0
+    return idf
+
+
+def score_phrase(phrase: str, liste: List[str], idf: Dict[str, float], termes_titre: set) -> float:
+    """Poids TF-IDF de la phrase normalisé par sa longueur, pénalisé pour les visas et les redites du titre."""
+    if not liste:
+        return 0.0
+    if termes_titre and not termes_titre.isdisjoint(liste):
+        uniques = set(liste) - MOTS_VIDES
+        if uniques and len(uniques & termes_titre) / len(uniques) > 0.8:
+            return 0.0
+    score = sum(map(idf.get, liste, repeat(1.0))) / math.sqrt(len(liste))
+    if phrase.startswith("Vu "):
+        score *= PONDERATION_VISA
+    return score
+
+
+def selectionner_phrases(
+    phrases: List[PhraseVectorisee],
+    idf: Dict[str, float],
+    max_caracteres: int,
+    titre: str = "",
+) -> str:
+    """Meilleures phrases remises dans l'ordre du texte, jusqu'à remplir `max_caracteres`."""
+    if not phrases:
+        return ""
+    termes_titre = set(termes(titre)) - MOTS_VIDES
+    # Une phrase plus longue que l'allocation ne peut pas être retenue : on ne
+    # la note que si aucune autre ne tient (elle sera alors coupée).
+    candidates = [index for index, (phrase, _) in enumerate(phrases) if len(phrase) < max_caracteres]
+    if not candidates:
+        scores = [score_phrase(phrase, liste, idf, termes_titre) for phrase, liste in phrases]
+        meilleure = max(range(len(phrases)), key=scores.__getitem__)
+        return phrases[meilleure][0][: max_caracteres - 1].rstrip() + "…"
+    scores = {index: score_phrase(*phrases[index], idf, termes_titre) for index in candidates}
+    classement = sorted(candidates, key=scores.__getitem__, reverse=True)
+
+    retenues: List[int] = []
+    longueur = 0
+    for index in classement:
+        taille = len(phrases[index][0]) + 1
+        if longueur + taille <= max_caracteres:
+            retenues.append(index)
+            longueur += taille
+    return " ".join(phrases[index][0] for index in sorted(retenues))
+
+
+def resumer_corpus(
+    groupes: List[Tuple[List[str], List[str]]],
+    max_caracteres: int,
+) -> List[List[str]]:
+    """
+    Résumé extractif TF-IDF de groupes de textes (textes, titres), par exemple
+    une séance par commune. Chaque texte est découpé et vectorisé une seule
+    fois ; l'IDF est calculé une fois sur l'ensemble des groupes.
+    """
+    textes = [texte for groupe, _ in groupes for texte in groupe]
+    titres = [titre for _, liste in groupes for titre in liste]
+    documents, frequences = vectoriser(textes, titres)
+    idf = calculer_idf(frequences, len(textes))
+    resumes = []
+    for texte, phrases, titre in zip(textes, documents, titres):
+        resume = selectionner_phrases(phrases, idf, max_caracteres, titre)
+        resumes.append(resume or " ".join(lignes_du_corps(texte, titre))[:max_caracteres])
+
+    par_groupe: List[List[str]] = []
+    debut = 0
+    for groupe, _ in groupes:
+        par_groupe.append(resumes[debut : debut + len(groupe)])
+        debut += len(groupe)
+    return par_groupe
+
+
+def resumer_textes(
+    textes: List[str],
+    max_caracteres: int,
+    titres: Optional[List[str]] = None,
+) -> List[str]:
+    """Résumé extractif TF-IDF de chaque texte, l'IDF étant calculé sur les textes fournis."""
+    return resumer_corpus([(textes, titres or [""] * len(textes))], max_caracteres)[0]
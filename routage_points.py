@@ -0,0 +1,122 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+
+ROUTE_GABARIT = "gabarit"
+ROUTE_LEGER = "leger"
+ROUTE_PRINCIPAL = "principal"
+ROUTES = (ROUTE_GABARIT, ROUTE_LEGER, ROUTE_PRINCIPAL)
+SEUIL_SCORE_PRINCIPAL = 2.0
+
+# Points de pure forme : description rédigée localement, sans appel au modèle.
+# Les formulations restent neutres pour convenir aux projets comme aux décisions.
+REGLES_GABARIT: List[Tuple[re.Pattern, str, str]] = [
+    (
+        re.compile(
+            r"^(?!.*(caisse|verification|carence|constat|audition)).*proces[- ]verbal.*(approb|approuve|seance)"
+            r"|^(?!.*(caisse|verification|carence|constat|audition)).*(approb|approuve|seance).*proces[- ]verbal",
+            re.IGNORECASE,
+        ),
+        "Approbation du procès-verbal de la séance précédente",
+        "Formalité de début de séance : approbation du procès-verbal de la réunion précédente, sans autre objet.",
+    ),
+]
+
+# Points routiniers dont le contenu mérite une reformulation, mais par un petit modèle.
+# Les retours de tutelle restent ici : l'objet de la décision (budget, taxe...) doit apparaître.
+REGLES_LEGER: List[re.Pattern] = [
+    re.compile(r"\btutelle\b", re.IGNORECASE),
+    re.compile(r"assemblee generale (ordinaire|extraordinaire|statutaire)", re.IGNORECASE),
+    re.compile(r"arretes? de police", re.IGNORECASE),
+    re.compile(r"\bcommunications?\b", re.IGNORECASE),
+    re.compile(r"\b(questions? orales?|questions? d'actualite)\b", re.IGNORECASE),
+    re.compile(r"(ratification|prise d'acte).{0,40}(decision|college)", re.IGNORECASE),
+]
+
+MOTS_SUBSTANTIELS = (
+    "marche public",
+    "travaux",
+    "budget",
+    "modification budgetaire",
+    "compte",
+    "emprunt",
+    "taxe",
+    "redevance",
+    "reglement",
+    "acquisition",
+    "vente",
+    "expropriation",
+    "subside",
+    "subvention",
+    "permis",
+    "urbanisme",
+    "convention",
+    "plan",
+    "cahier des charges",
+)
+MOTIF_MONTANT = re.compile(r"\d[\d .]*(?:,\d+)?\s*(?:€|eur\b|euros?\b)", re.IGNORECASE)
+
+
+def _normaliser(texte: str) -> str:
+    decompose = unicodedata.normalize("NFD", texte or "")
+    return "".join(car for car in decompose if unicodedata.category(car) != "Mn").casefold()
+
+
+def composantes_score(deliberation: Dict[str, Any]) -> Dict[str, float]:
+    """Détail du score local d'un point : montants, mots-clés du titre et du texte, longueur."""
+    titre = _normaliser(deliberation.get("titre", ""))
+    contenu = deliberation.get("contenu", "") or ""
+    texte = _normaliser(contenu)
+    return {
+        "montants": min(3, len(MOTIF_MONTANT.findall(contenu))) * 1.0,
+        "mots_titre": sum(1.0 for mot in MOTS_SUBSTANTIELS if mot in titre),
+        "mots_texte": min(2.0, sum(0.25 for mot in MOTS_SUBSTANTIELS if mot in texte)),
+        "longueur": min(2.0, len(contenu) / 4000),
+    }
+
+
+def score_substance(deliberation: Dict[str, Any]) -> float:
+    """
+    Score local d'importance d'un point : montants, vocabulaire de fond et
+    longueur du texte. Au-dessus de SEUIL_SCORE_PRINCIPAL, le point part
+    vers le modèle principal.
+    """
+    return sum(composantes_score(deliberation).values())
+
+
+def router_point(deliberation: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, str]]]:
+    """
+    Détermine la route d'un point.
+
+    Retourne la route et, pour la route gabarit, le sujet déjà rédigé.
+    """
+    titre = _normaliser(deliberation.get("titre", ""))
+    for motif, titre_gabarit, description in REGLES_GABARIT:
+        if motif.search(titre):
+            return ROUTE_GABARIT, {"titre": titre_gabarit, "description": description}
+
+    score = score_substance(deliberation)
+    if any(motif.search(titre) for motif in REGLES_LEGER) and score < SEUIL_SCORE_PRINCIPAL * 2:
+        return ROUTE_LEGER, None
+    if score < SEUIL_SCORE_PRINCIPAL:
+        return ROUTE_LEGER, None
+    return ROUTE_PRINCIPAL, None
+
+
+def router_points(deliberations: List[Dict[str, Any]]) -> List[Tuple[str, Optional[Dict[str, str]]]]:
+    """Route chaque point d'une séance, dans l'ordre."""
+    return [router_point(deliberation) for deliberation in deliberations]
+
+
+def repartition_routes(routes: List[Tuple[str, Optional[Dict[str, str]]]]) -> Dict[str, int]:
+    """Compte les points par route."""
+    compte = {route: 0 for route in ROUTES}
+    for route, _ in routes:
+        compte[route] += 1
+    return compte
+
+
+def formater_repartition(compte: Dict[str, int]) -> str:
+    total = sum(compte.values()) or 1
+    return ", ".join(f"{route} {compte.get(route, 0)} ({compte.get(route, 0) / total:.0%})" for route in ROUTES)
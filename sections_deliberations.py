@@ -0,0 +1,182 @@
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SECTION_METADONNEES = "metadonnees"
+SECTION_SYNTHESE = "synthese"
+SECTION_VISAS = "visas"
+SECTION_CONSIDERANTS = "considerants"
+SECTION_DISPOSITIF = "dispositif"
+SECTION_ANNEXES = "annexes"
+
+PREFIXES_VISAS = ("Vu ", "Vu,", "Ouï ")
+PREFIXES_CONSIDERANTS = ("Considérant", "Attendu")
+PREFIXES_DISPOSITIF = ("DECIDE", "DÉCIDE", "Décide", "ARRÊTE", "ARRETE", "Arrête", "PROPOSITION", "Article", "Art.")
+# Subdivisions d'un règlement ou d'un dispositif long, hors visas et considérants.
+PREFIXES_SUBDIVISIONS = ("Article", "Art.", "Chapitre", "CHAPITRE", "Section ", "TITRE ")
+FINS_SYNTHESE = {"Projet de délibération", "Projet de décision", "Délibération", "Décision"}
+MOTIF_FIN_AVERTISSEMENT = re.compile(r"^par l'autorité communale\.$")
+# Avertissement des projets de délibération, absent du texte une fois la décision publiée.
+MOTIF_AVERTISSEMENT_PROJET = re.compile(
+    r"Ce\s+projet de délibération.*?par l'autorité communale\.",
+    re.IGNORECASE | re.DOTALL,
+)
+# Libellés de l'en-tête deliberations.be suivis de leur valeur sur la ligne suivante.
+CLES_METADONNEES = {
+    "Point N°": "point",
+    "State": "type_document",
+    "Matière": "matiere",
+    "Séance publique du Conseil": "seance",
+}
+
+Intervalle = List[int]
+
+
+def classer_ligne(ligne: str) -> Optional[str]:
+    """Section ouverte par une ligne (visas, considérants, dispositif), ou None pour une ligne de suite."""
+    if ligne.startswith(PREFIXES_VISAS):
+        return SECTION_VISAS
+    if ligne.startswith(PREFIXES_CONSIDERANTS):
+        return SECTION_CONSIDERANTS
+    if ligne.startswith(PREFIXES_DISPOSITIF):
+        return SECTION_DISPOSITIF
+    return None
+
+
+def _lignes_avec_positions(contenu: str) -> Iterator[Tuple[int, int, str]]:
+    debut = 0
+    for brute in contenu.split("\n"):
+        fin = debut + len(brute)
+        yield debut, fin, brute.strip()
+        debut = fin + 1
+
+
+def decouper_sections(contenu: str) -> Dict[str, Any]:
+    """
+    Découpe le texte d'un point en sections typées.
+
+    Les sections textuelles sont des intervalles [début, fin) dans `contenu`
+    (une liste d'intervalles pour les visas et considérants, un par alinéa),
+    pour ne pas dupliquer le texte dans les fichiers JSON.
+    """
+    sections: Dict[str, Any] = {
+        SECTION_METADONNEES: {},
+        SECTION_SYNTHESE: None,
+        SECTION_VISAS: [],
+        SECTION_CONSIDERANTS: [],
+        SECTION_DISPOSITIF: None,
+        SECTION_ANNEXES: None,
+    }
+    metadonnees = sections[SECTION_METADONNEES]
+    cle_attendue: Optional[str] = None
+    courante: Optional[str] = None
+    intervalle: Optional[Intervalle] = None
+
+    for debut, fin, ligne in _lignes_avec_positions(contenu):
+        if not ligne:
+            continue
+        if cle_attendue:
+            metadonnees[cle_attendue] = ligne
+            cle_attendue = None
+            continue
+        if ligne in CLES_METADONNEES and courante in (None, SECTION_METADONNEES):
+            cle_attendue = CLES_METADONNEES[ligne]
+            courante = SECTION_METADONNEES
+            continue
+        if MOTIF_FIN_AVERTISSEMENT.match(ligne):
+            courante = None
+            continue
+
+        if ligne.lower().startswith("note de synthèse") and courante != SECTION_DISPOSITIF:
+            courante = SECTION_SYNTHESE
+            intervalle = None
+            continue
+        if courante == SECTION_SYNTHESE and ligne in FINS_SYNTHESE:
+            courante = None
+            continue
+        if courante == SECTION_SYNTHESE and sections[SECTION_SYNTHESE] is None and ligne.startswith("Taille"):
+            # "Note de synthèse" était le nom d'une pièce jointe, pas un titre de section.
+            courante = SECTION_ANNEXES
+            if sections[SECTION_ANNEXES] is None:
+                sections[SECTION_ANNEXES] = [debut, fin]
+            continue
+        if ligne.rstrip(" :") == "Annexes":
+            courante = SECTION_ANNEXES
+            sections[SECTION_ANNEXES] = [fin + 1, fin + 1]
+            continue
+
+        if courante not in (SECTION_SYNTHESE, SECTION_DISPOSITIF, SECTION_ANNEXES):
+            nouvelle = classer_ligne(ligne)
+            if nouvelle in (SECTION_VISAS, SECTION_CONSIDERANTS):
+                intervalle = [debut, fin]
+                sections[nouvelle].append(intervalle)
+                courante = nouvelle
+                continue
+            if nouvelle == SECTION_DISPOSITIF:
+                courante = SECTION_DISPOSITIF
+                sections[SECTION_DISPOSITIF] = [debut, fin]
+                continue
+            if courante in (SECTION_VISAS, SECTION_CONSIDERANTS) and intervalle and ligne[0].islower():
+                # Ligne de PDF coupée en pleine phrase : suite de l'alinéa courant.
+                intervalle[1] = fin
+                continue
+            if courante == SECTION_METADONNEES:
+                continue
+
+        if courante == SECTION_SYNTHESE:
+            if sections[SECTION_SYNTHESE] is None:
+                sections[SECTION_SYNTHESE] = [debut, fin]
+            sections[SECTION_SYNTHESE][1] = fin
+        elif courante in (SECTION_DISPOSITIF, SECTION_ANNEXES):
+            sections[courante][1] = fin
+    return sections
+
+
+def sections_du_point(deliberation: Dict[str, Any]) -> Dict[str, Any]:
+    """Sections stockées lors de l'extraction, ou recalculées pour les anciens fichiers."""
+    sections = deliberation.get("sections")
+    if isinstance(sections, dict):
+        return sections
+    return decouper_sections(deliberation.get("contenu", "") or "")
+
+
+def texte_section(deliberation: Dict[str, Any], nom: str) -> str:
+    """Texte d'une section d'un point (alinéas séparés par des retours à la ligne)."""
+    contenu = deliberation.get("contenu", "") or ""
+    valeur = sections_du_point(deliberation).get(nom)
+    if not valeur:
+        return ""
+    intervalles = valeur if isinstance(valeur[0], list) else [valeur]
+    return "\n".join(contenu[debut:fin].strip() for debut, fin in intervalles)
+
+
+def debuts_sections(contenu: str, sections: Dict[str, Any]) -> List[int]:
+    """
+    Positions où commence une section stockée (synthèse, chaque visa et
+    considérant, dispositif, annexes) ou, hors visas et considérants, un
+    article ou un chapitre ; dans l'ordre du texte.
+    """
+    debuts = set()
+    alineas: List[Intervalle] = []
+    for nom in (SECTION_SYNTHESE, SECTION_VISAS, SECTION_CONSIDERANTS, SECTION_DISPOSITIF, SECTION_ANNEXES):
+        valeur = sections.get(nom)
+        if not valeur:
+            continue
+        intervalles = valeur if isinstance(valeur[0], list) else [valeur]
+        debuts.update(debut for debut, _ in intervalles)
+        if nom in (SECTION_VISAS, SECTION_CONSIDERANTS):
+            alineas.extend(intervalles)
+    for debut, _, ligne in _lignes_avec_positions(contenu):
+        if ligne.startswith(PREFIXES_SUBDIVISIONS) and not any(a <= debut < b for a, b in alineas):
+            debuts.add(debut)
+    return sorted(debuts)
+
+
+def metadonnees_du_point(deliberation: Dict[str, Any]) -> Dict[str, str]:
+    """Métadonnées de l'en-tête (point, type de document, matière, séance)."""
+    return sections_du_point(deliberation).get(SECTION_METADONNEES) or {}
+
+
+def ajouter_sections(deliberations: List[Dict[str, Any]]) -> None:
+    """Ajoute le champ `sections` à chaque point extrait."""
+    for deliberation in deliberations:
+        deliberation["sections"] = decouper_sections(deliberation.get("contenu", "") or "")
@@ -0,0 +1,220 @@
+import argparse
+import random
+import signal
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from cadence_publication import Cadence, estimer_cadences, ordonner_par_imminence
+from pipeline_journalistique import (
+    analyser_regroupees,
+    chemins_sortie,
+    compiler_html,
+    executer_etapes,
+)
+
+FACTEUR_ESPACEMENT = 2.0
+# Écart aléatoire appliqué à chaque intervalle, pour que les communes vérifiées
+# ensemble au démarrage ne restent pas synchronisées.
+GIGUE_INTERVALLE = 0.1
+# La page HTML attend au plus ce multiple de --delai-html pendant une rafale de changements.
+ATTENTE_HTML_MAX = 5
+
+
+def _date_modification(chemin) -> Optional[float]:
+    try:
+        return chemin.stat().st_mtime
+    except OSError:
+        return None
+
+
+class EtatCommune:
+    """Calendrier de vérification d'une commune, conservé en mémoire par le démon."""
+
+    def __init__(self, commune: str, force: bool = False) -> None:
+        self.commune = commune
+        # --force vaut jusqu'à la première vérification réussie de la commune.
+        self.force = force
+        self.prochaine = 0.0
+        self.intervalle = 0.0
+        self.verifications = 0
+        self.changements = 0
+        self.echecs_consecutifs = 0
+
+    def sorties(self) -> Tuple[Optional[float], Optional[float]]:
+        """Dates de modification des délibérations extraites et de l'analyse."""
+        fichier_delib, _, fichier_json, _ = chemins_sortie(self.commune)
+        return _date_modification(fichier_delib), _date_modification(fichier_json)
+
+
+class PlanificateurVeille:
+    """
+    Intervalle avant la vérification suivante d'une commune. Selon sa cadence
+    de publication apprise : court tant qu'une publication est attendue,
+    sinon long, sans dépasser l'ouverture de la prochaine fenêtre. Sans
+    cadence exploitable : court juste après un changement (les décisions
+    suivent les projets), puis espacé tant que rien ne change. Toujours
+    espacé après un échec.
+    """
+
+    def __init__(self, intervalle_min: float, intervalle_max: float) -> None:
+        self.intervalle_min = intervalle_min
+        self.intervalle_max = max(intervalle_min, intervalle_max)
+
+    def suivant(self, etat: EtatCommune, change: bool, echec: bool, cadence: Optional[Cadence] = None) -> float:
+        ecart = cadence.ecart() if cadence is not None else None
+        if ecart is not None:
+            intervalle = min(self.intervalle_max, max(self.intervalle_min, ecart))
+        elif change:
+            intervalle = self.intervalle_min
+        elif etat.intervalle:
+            intervalle = min(self.intervalle_max, etat.intervalle * FACTEUR_ESPACEMENT)
+        else:
+            intervalle = self.intervalle_min
+        if echec:
+            intervalle = min(self.intervalle_max, self.intervalle_min * FACTEUR_ESPACEMENT ** etat.echecs_consecutifs)
+        etat.intervalle = intervalle
+        return intervalle * random.uniform(1 - GIGUE_INTERVALLE, 1 + GIGUE_INTERVALLE)
+
+
+class DelaiHtml:
+    """Recompilation de la page HTML différée jusqu'à la fin d'une rafale de changements."""
+
+    def __init__(self, delai: float) -> None:
+        self.delai = delai
+        self.premier_changement: Optional[float] = None
+        self.dernier_changement: Optional[float] = None
+
+    def signaler(self, maintenant: float) -> None:
+        if self.premier_changement is None:
+            self.premier_changement = maintenant
+        self.dernier_changement = maintenant
+
+    def echeance(self) -> Optional[float]:
+        if self.premier_changement is None:
+            return None
+        return min(self.dernier_changement + self.delai, self.premier_changement + self.delai * ATTENTE_HTML_MAX)
+
+    def reinitialiser(self) -> None:
+        self.premier_changement = None
+        self.dernier_changement = None
+
+
+def _recompiler_html(args: argparse.Namespace, communes: List[str], groupes: List[str], html: DelaiHtml) -> None:
+    try:
+        compiler_html(args, communes, groupes)
+        html.reinitialiser()
+    except RuntimeError as exc:
+        print(f"⚠ Compilation HTML impossible ({exc}) ; nouvel essai après le prochain délai.")
+        html.signaler(time.monotonic())
+
+
+def verifier_communes(
+    args: argparse.Namespace,
+    dues: List[EtatCommune],
+    communes: List[str],
+    planificateur: PlanificateurVeille,
+) -> List[str]:
+    """
+    Détecte, extrait et analyse les communes dues (en chaîne, comme une
+    exécution classique) et planifie leur vérification suivante. Retourne
+    les communes dont l'analyse a changé. Les cadences sont estimées sur
+    toutes les communes veillées (`communes`), dont les mesures communes
+    servent aux communes à l'historique trop court.
+    """
+    avant = {etat.commune: etat.sorties() for etat in dues}
+    ordre = ordonner_par_imminence([etat.commune for etat in dues], estimer_cadences(communes))
+    forcees = {etat.commune for etat in dues if etat.force}
+    echecs = set()
+    for force in (True, False):
+        groupe = [commune for commune in ordre if (commune in forcees) == force]
+        if not groupe:
+            continue
+        args_groupe = argparse.Namespace(**{**vars(args), "force": force})
+        resultats = executer_etapes(groupe, args_groupe, len(communes))
+        analyser_regroupees(args_groupe, resultats)
+        echecs.update(resultats.echecs)
+    # Les détections de cette vérification viennent d'enrichir l'historique.
+    cadences = estimer_cadences(communes)
+
+    maintenant = time.monotonic()
+    analyses_modifiees = []
+    for etat in dues:
+        apres = etat.sorties()
+        echec = etat.commune in echecs
+        if not echec:
+            etat.force = False
+        change = apres != avant[etat.commune]
+        etat.verifications += 1
+        etat.echecs_consecutifs = etat.echecs_consecutifs + 1 if echec else 0
+        if change:
+            etat.changements += 1
+        if apres[1] != avant[etat.commune][1]:
+            analyses_modifiees.append(etat.commune)
+        etat.prochaine = maintenant + planificateur.suivant(etat, change, echec, cadences[etat.commune])
+    return analyses_modifiees
+
+
+def executer_veille(args: argparse.Namespace, communes: List[str], groupes: List[str]) -> None:
+    """
+    Mode démon : chaque commune est vérifiée selon son propre calendrier, et
+    une séance publiée est extraite et analysée dès sa détection. La session
+    HTTP, le client du modèle et les modules importés restent en mémoire entre
+    deux vérifications. La page HTML multi-communes est recompilée une fois
+    la rafale de changements passée. S'arrête sur SIGTERM, Ctrl+C ou après
+    --duree-veille minutes, en recompilant la page si un changement attend.
+    """
+    arret = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: arret.set())
+    planificateur = PlanificateurVeille(args.intervalle_min * 60, args.intervalle_max * 60)
+    html = DelaiHtml(args.delai_html * 60)
+    etats: Dict[str, EtatCommune] = {commune: EtatCommune(commune, args.force) for commune in communes}
+    fin = time.monotonic() + args.duree_veille * 60 if args.duree_veille else None
+
+    print("=" * 80)
+    print(
+        f"Veille de {len(communes)} commune(s) : vérifications espacées de {args.intervalle_min:g} "
+        f"à {args.intervalle_max:g} min selon la cadence de publication de chaque commune, "
+        f"page HTML recompilée {args.delai_html:g} min après le dernier changement"
+    )
+    print("=" * 80)
+    try:
+        while not arret.is_set():
+            maintenant = time.monotonic()
+            if fin is not None and maintenant >= fin:
+                break
+            dues = [etat for etat in etats.values() if etat.prochaine <= maintenant]
+            if dues:
+                modifiees = verifier_communes(args, dues, communes, planificateur)
+                for commune in modifiees:
+                    print(f"✓ Nouvelle analyse pour {commune}")
+                    html.signaler(time.monotonic())
+                suivante = min(etats.values(), key=lambda etat: etat.prochaine)
+                print(
+                    f"Veille : {len(dues)} commune(s) vérifiée(s), {len(modifiees)} analyse(s) mise(s) à jour ; "
+                    f"prochaine vérification ({suivante.commune}) dans "
+                    f"{max(0.0, suivante.prochaine - time.monotonic()) / 60:.1f} min"
+                )
+                continue
+
+            echeance_html = html.echeance()
+            if echeance_html is not None and echeance_html <= maintenant:
+                _recompiler_html(args, communes, groupes, html)
+                continue
+
+            reveil = min(etat.prochaine for etat in etats.values())
+            if echeance_html is not None:
+                reveil = min(reveil, echeance_html)
+            if fin is not None:
+                reveil = min(reveil, fin)
+            arret.wait(max(0.0, reveil - maintenant))
+    except KeyboardInterrupt:
+        print("\nArrêt de la veille demandé.")
+    finally:
+        if html.echeance() is not None:
+            _recompiler_html(args, communes, groupes, html)
+        verifications = sum(etat.verifications for etat in etats.values())
+        changements = sum(etat.changements for etat in etats.values())
+        print("=" * 80)
+        print(f"Veille terminée : {verifications} vérification(s), {changements} changement(s) détecté(s)")
+        print("=" * 80)